@@ -14,7 +14,7 @@ import json
 
 from core.logger import logger
 from core.config import get_openai_key
-from core import post_store, memory
+from core import post_archive, post_store, memory
 from core.lead_store import list_leads
 
 try:
@@ -55,7 +55,15 @@ def get_published_posts(client: str, platform: str, period_days: int) -> List[di
     since = datetime.now(timezone.utc) - timedelta(days=period_days)
     posts: List[dict] = []
 
-    for p in post_store.get_posts(client):
+    # Hot-Store + Cold-Archiv (ältere published Posts liegen dort)
+    hot = post_store.get_posts(client, sync=False)
+    hot_ids = {p.get("id") for p in hot}
+    archived = [
+        p for p in post_archive.iter_archived_posts(client, since=since)
+        if p.get("id") not in hot_ids
+    ]
+
+    for p in hot + archived:
         if p.get("status") != "published":
             continue
 
@@ -6,70 +6,50 @@ from __future__ import annotations
 - KEIN Caption-Builder
 - Enforced Status-Flow: preview → approved → scheduled → published
 - publish_post(post_id, publish_at) als Haupt-API
-- Plattform-Adapter optional (aktuell Simulation)
+- Plattform-Adapter aus der Registry (agents/publish_agent/platforms),
+  fehlt einer → Simulation
+- Fehlgeschlagene Plattformen → core/publish_queue.py (Retry / Dead-Letter),
+  Post-Status: published | retrying | failed
+- Plattformen gestaffelt nach platform_times: spätere Plattformen bleiben
+  offen (Post bleibt "scheduled"), manuelle → mark_manual_required,
+  Abschluss über finalize_post_if_done
+- Benachrichtigungen nur über die Outbox (core/notify_outbox.py)
 - Exakt angepasst an reales PostStore-Interface
 """
 
 
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timezone
-import os
-import smtplib
-from email.mime.text import MIMEText
-import requests
+import time
 
 from core.logger import logger
+from core.platform_times import (
+    build_platform_times,
+    is_manual_platform,
+    pending_platforms,
+    platform_done,
+    post_platforms,
+    scheduled_platforms,
+)
+from core.publish_executor import run_platforms
+from core import notify_outbox, publish_queue, scheduler_metrics
+from core.publish_queue import PublishStateUnknown
+from agents.publish_agent import platforms as platform_registry
 
 
 # ------------------------------------------------------------
 # 🔔 Benachrichtigungen (optional)
 # ------------------------------------------------------------
 def _notify_client(client: str, platforms: List[str], message: str) -> None:
+    """
+    Nur in die Outbox (core/notify_outbox.py) – E-Mail/Teams verschickt
+    der Dispatcher gebündelt, der Publish-Pfad wartet nicht darauf.
+    """
     logger.info(f"[PublishAgent] 🔔 Benachrichtigung: {message}")
-
-    smtp_host = os.getenv("SMTP_HOST")
-    smtp_user = os.getenv("SMTP_USER")
-    smtp_pass = os.getenv("SMTP_PASS")
-    smtp_to = os.getenv("NOTIFY_EMAIL")
-
-    if smtp_host and smtp_user and smtp_pass and smtp_to:
-        try:
-            msg = MIMEText(
-                f"Hallo {client},\n\n{message}\n\n"
-                f"Plattformen: {', '.join(platforms)}\n\n"
-                f"— IntelliAgent Solutions"
-            )
-            msg["Subject"] = f"Content-Update ({', '.join(platforms)})"
-            msg["From"] = smtp_user
-            msg["To"] = smtp_to
-
-            with smtplib.SMTP(smtp_host, 587, timeout=10) as server:
-                server.starttls()
-                server.login(smtp_user, smtp_pass)
-                server.send_message(msg)
-
-            logger.info("[PublishAgent] 📧 E-Mail gesendet.")
-        except Exception as e:
-            logger.error(f"[PublishAgent] ❌ E-Mail-Fehler: {e}")
-
-    teams_url = os.getenv("TEAMS_WEBHOOK")
-    if teams_url:
-        try:
-            payload = {
-                "text": (
-                    f"📢 *Content veröffentlicht*\n\n{message}\n\n"
-                    f"Plattformen: {', '.join(platforms)}"
-                )
-            }
-            r = requests.post(teams_url, json=payload, timeout=10)
-            if r.status_code in (200, 201):
-                logger.info("[PublishAgent] 💬 Teams-Benachrichtigung gesendet.")
-            else:
-                logger.warning(
-                    f"[PublishAgent] ⚠ Teams-Webhook Fehler: {r.status_code} {r.text}"
-                )
-        except Exception as e:
-            logger.error(f"[PublishAgent] ❌ Teams-Fehler: {e}")
+    try:
+        notify_outbox.enqueue(client, platforms, message)
+    except OSError as e:
+        logger.error(f"[PublishAgent] ❌ Outbox nicht beschreibbar: {e}")
 
 
 # ------------------------------------------------------------
@@ -99,25 +79,8 @@ def _utcnow_iso() -> str:
 
 
 def _normalize_platforms(post: Dict[str, Any]) -> List[str]:
-    """
-    Prefer explicit 'platforms' list.
-    Else allow comma-separated 'platform'.
-    Else default to instagram/facebook/linkedin if results exist, otherwise instagram.
-    """
-    if isinstance(post.get("platforms"), list) and post["platforms"]:
-        return [str(p).strip().lower() for p in post["platforms"] if str(p).strip()]
-
-    if isinstance(post.get("platform"), str) and post["platform"].strip():
-        return [p.strip().lower() for p in post["platform"].split(",") if p.strip()]
-
-    # fallback: if results already contain platforms, use those
-    if isinstance(post.get("results"), dict) and post["results"]:
-        keys = [str(k).strip().lower() for k in post["results"].keys()]
-        keys = [k for k in keys if k]
-        if keys:
-            return keys
-
-    return ["instagram"]
+    # gleiche Regeln wie der Due-Index im Store (core/platform_times.py)
+    return post_platforms(post)
 
 
 def _get_client(post: Dict[str, Any]) -> str:
@@ -128,48 +91,134 @@ def _get_status(post: Dict[str, Any]) -> str:
     return str(post.get("status") or "").strip().lower()
 
 
-def _safe_import_platform_adapter(platform: str):
+def _publish_platform(post_id: str, post: Dict[str, Any], platform: str) -> None:
+    """
+    Läuft im Executor-Thread – KEIN Store-Zugriff hier (Transaktion ist
+    thread-lokal und gehört dem aufrufenden Thread).
+    """
+    entry = platform_registry.get_adapter(platform)
+    if entry is None:
+        logger.info(f"[PublishAgent] 🧪 Simuliere Publish auf {platform} ({post_id})")
+        return
+
+    started = time.monotonic()
     try:
-        if platform == "instagram":
-            from agents.publish_agent.platforms.instagram import publish
-            return publish
-        if platform == "facebook":
-            from agents.publish_agent.platforms.facebook import publish
-            return publish
-        if platform == "linkedin":
-            from agents.publish_agent.platforms.linkedin import publish
-            return publish
-        if platform == "tiktok":
-            from agents.publish_agent.platforms.tiktok import publish
-            return publish
-    except Exception as e:
-        logger.warning(f"[PublishAgent] ⚠ Adapter Import fehlgeschlagen ({platform}): {e}")
+        return entry["publish"](post)
+    finally:
+        scheduler_metrics.observe_publish(platform, time.monotonic() - started)
+
+
+# ------------------------------------------------------------
+# ⏩ Vorarbeit pro Tick (z.B. Instagram-Container)
+# ------------------------------------------------------------
+def _prepare_hooks(platform: str):
+    """
+    -> (prepare, discard) des Adapters oder None.
+    """
+    entry = platform_registry.get_adapter(platform)
+    if entry is None or (entry["prepare"] is None and entry["discard"] is None):
         return None
-    return None
+    return entry["prepare"], entry["discard"]
+
+
+def prepare_platforms(posts: List[Dict[str, Any]], jobs: Dict[str, List[str]]) -> None:
+    """
+    Vor publish_many: Adapter mit prepare() bearbeiten ALLE Posts des
+    Ticks gemeinsam (Instagram: Container parallel, Facebook: Batch API);
+    publish() holt dann nur noch das eigene Ergebnis ab.
+    """
+    by_platform: Dict[str, List[Dict[str, Any]]] = {}
+    for post in posts:
+        for pf in jobs.get(post.get("id"), []):
+            by_platform.setdefault(pf, []).append(post)
+
+    for pf, pf_posts in by_platform.items():
+        hooks = _prepare_hooks(pf)
+        if hooks is None or hooks[0] is None:
+            continue
+        try:
+            started = hooks[0](pf_posts)
+        except Exception as e:
+            logger.warning(f"[PublishAgent] ⚠ Vorbereitung {pf} fehlgeschlagen: {e}")
+            continue
+        if started:
+            logger.info(f"[PublishAgent] ⏩ {pf}: {len(started)} Posts vorbereitet")
+
+
+def discard_prepared(post_ids: List[str], platforms: List[str]) -> None:
+    """
+    Nach dem Tick: nicht verbrauchte Vorarbeit verwerfen.
+    """
+    for pf in dict.fromkeys(platforms):
+        hooks = _prepare_hooks(pf)
+        if hooks is not None and hooks[1] is not None:
+            hooks[1](post_ids)
 
 
 # ------------------------------------------------------------
 # ✅ Haupt-API
 # ------------------------------------------------------------
-def publish_post(post_id: str, publish_at: Optional[datetime] = None) -> Dict[str, Any]:
+def publish_post(
+    post_id: str,
+    publish_at: Optional[datetime] = None,
+    platforms: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    platforms=None → alle noch offenen Plattformen des Posts sofort
+    (Publish-Now); der Scheduler übergibt gezielt die fälligen
+    Plattformen (platform_times + Retry-Queue).
+    """
+    from core import post_store
+
+    # 🔑 EIN Store-Write pro Publish: Schedule-Patch + finaler Write-back
+    # werden gesammelt und beim Verlassen des Blocks gemeinsam geschrieben.
+    with post_store.transaction():
+        res = _publish_post_tx(post_id, publish_at, platforms)
+
+    if res.get("status") == "published":
+        msg = f"✅ Post published ({post_id}) auf {', '.join(res['platforms'])}"
+        logger.info(f"[PublishAgent] 🚀 {msg}")
+        _notify_client(res["client"], res["platforms"], msg)
+
+    return res
+
+
+def _platform_status(post: Dict[str, Any], platform: str) -> str:
+    return str(((post.get("results") or {}).get(platform) or {}).get("status") or "")
+
+
+def _publish_post_tx(
+    post_id: str,
+    publish_at: Optional[datetime],
+    only: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    from core import post_store
+
     post = _load_post_from_store(post_id)
 
     client = _get_client(post)
-    platforms = _normalize_platforms(post)
+    all_platforms = _normalize_platforms(post)
     status = _get_status(post)
 
+    # bereits erledigte Plattformen (ok / posted / manual) NIE erneut
+    targets = [
+        pf for pf in (pending_platforms(post) if only is None else only)
+        if not platform_done(post, pf)
+    ]
+
     # already done
     if status == "published":
         return {"status": "skipped", "reason": "already_published", "post_id": post_id}
 
     # Only schedule (no publishing)
     if publish_at is not None:
+        publish_at = publish_at.astimezone(timezone.utc)
         _update_post_in_store(
             post_id,
             {
                 "status": "scheduled",
-                  "platform_times": build_platform_times(),
-                "publish_at": publish_at.astimezone(timezone.utc).isoformat(),
+                "platform_times": build_platform_times(publish_at),
+                "publish_at": publish_at.isoformat(),
                 "updated_at": _utcnow_iso(),
             },
         )
@@ -183,57 +232,108 @@ def publish_post(post_id: str, publish_at: Optional[datetime] = None) -> Dict[st
             post_id,
             {
                 "status": "scheduled",
-                  "platform_times": build_platform_times(),
+                "platform_times": build_platform_times(),
                 "publish_at": _utcnow_iso(),
                 "updated_at": _utcnow_iso(),
             },
         )
         status = _get_status(post)
 
-    results: Dict[str, Any] = {}
+    # 🖐 manuelle Plattformen (z.B. LinkedIn) → Dashboard-Aufgabe
+    platforms = []
+    for pf in targets:
+        if is_manual_platform(pf):
+            post_store.mark_manual_required(post_id, pf)
+        else:
+            platforms.append(pf)
+
+    # ⚡ Plattformen parallel (Caps pro Plattform/Account), Ergebnisse
+    # werden gesammelt und unten in EINEM Write zurückgeschrieben
+    outcomes = run_platforms(
+        client,
+        {pf: (lambda pf=pf: _publish_platform(post_id, post, pf)) for pf in platforms},
+    )
 
+    results: Dict[str, Any] = {}
+    cleared: Dict[str, Any] = {}
     for platform in platforms:
-        adapter = _safe_import_platform_adapter(platform)
-
-        try:
-            if adapter is None:
-                logger.info(f"[PublishAgent] 🧪 Simuliere Publish auf {platform} ({post_id})")
-            else:
-                adapter(post)
-
+        outcome = outcomes[platform]
+        if isinstance(outcome, PublishStateUnknown):
+            # 🖐 evtl. schon live → nicht erneut senden, Dashboard gleicht ab
+            logger.error(f"[PublishAgent] ❗ {platform} ungeklärt, manueller Abgleich ({post_id}): {outcome}")
+            post_store.mark_manual_required(post_id, platform)
+            results[platform] = {"status": "unknown", "error": str(outcome)}
+            continue
+
+        # Vorarbeit des Adapters (Container, Batch-Ergebnis) ist verbraucht
+        entry = platform_registry.get_adapter(platform)
+        if entry and entry["state_field"]:
+            cleared[entry["state_field"]] = {}
+
+        if isinstance(outcome, Exception):
+            # 🔁 Retry-Queue entscheidet: Backoff (retrying) oder Dead-Letter (error)
+            scheduler_metrics.count_error(outcome)
+            job = publish_queue.record_failure(post_id, platform, client, outcome)
+            logger.error(
+                f"[PublishAgent] ❌ Fehler auf {platform} (Versuch {job['attempts']}, {job['state']}): {outcome}"
+            )
             results[platform] = {
-                "status": "ok",
-                "published_at": _utcnow_iso(),
-                # keep whatever store might already have, otherwise None
-                "preview_url": (post.get("results") or {}).get(platform, {}).get("preview_url"),
-                "caption": (post.get("results") or {}).get(platform, {}).get("caption"),
+                "status": "retrying" if job["state"] == "pending" else "error",
+                "error": str(outcome),
+                "attempts": job["attempts"],
             }
-
-        except Exception as e:
-            logger.error(f"[PublishAgent] ❌ Fehler auf {platform}: {e}")
-            results[platform] = {"status": "error", "error": str(e)}
-
-    # FINAL write-back (✅ fixed parentheses/indent + stable fields)
-    _update_post_in_store(
-        post_id,
-        {
-            "status": "published",          # 🔑 FINAL STATE
-            "published_at": _utcnow_iso(),  # 🔑 Scheduler-Ende
-            "posted_at": _utcnow_iso(),     # 🔑 Dashboard / Analytics
-            "updated_at": _utcnow_iso(),
-            "results": results,
-        },
-    )
-
-    msg = f"✅ Post published ({post_id}) auf {', '.join(platforms)}"
-    logger.info(f"[PublishAgent] 🚀 {msg}")
-    _notify_client(client, platforms, msg)
+            continue
+
+        publish_queue.record_success(post_id, platform)
+        results[platform] = {
+            "status": "ok",
+            "published_at": _utcnow_iso(),
+            # keep whatever store might already have, otherwise None
+            "preview_url": (post.get("results") or {}).get(platform, {}).get("preview_url"),
+            "caption": (post.get("results") or {}).get(platform, {}).get("caption"),
+            "platform_post_id": outcome.get("id") if isinstance(outcome, dict) else None,
+        }
+
+    patch: Dict[str, Any] = {"updated_at": _utcnow_iso(), "results": results, **cleared}
+    if post.get("lease"):
+        patch["lease"] = {}  # 🔐 Lease des Scheduler-Workers freigeben
+    post = _update_post_in_store(post_id, patch)
+
+    # platform_status: erfolgreiche Plattformen "posted" (inkl. früherer
+    # Läufe), manuelle bleiben "manual" → Basis für finalize_post_if_done
+    platform_status = dict(post.get("platform_status") or {})
+    for pf in all_platforms:
+        if _platform_status(post, pf) == "ok":
+            platform_status[pf] = "posted"
+    if platform_status:
+        post = _update_post_in_store(post_id, {"platform_status": platform_status})
+
+    # Gesamtstatus über ALLE Plattformen (frühere Erfolge zählen mit)
+    failed = [_platform_status(post, pf) for pf in pending_platforms(post)]
+    if scheduled_platforms(post):
+        final_status = "scheduled"  # spätere Plattform-Termine offen
+    elif "retrying" in failed:
+        final_status = "retrying"
+    elif "error" in failed:
+        final_status = "failed"
+    elif post_store.finalize_post_if_done(post_id, status="published"):
+        final_status = "published"
+    else:
+        final_status = "scheduled_manual"  # nur noch manuelle Plattformen offen
+
+    status_patch: Dict[str, Any] = {"status": final_status}
+    if final_status == "published":
+        status_patch["published_at"] = _utcnow_iso()  # 🔑 Scheduler-Ende
+        status_patch["posted_at"] = _utcnow_iso()     # 🔑 Dashboard / Analytics
+
+    # FINAL write-back (gleiche Transaktion → ein Commit)
+    _update_post_in_store(post_id, status_patch)
 
     return {
-        "status": "published",
+        "status": final_status,
         "post_id": post_id,
         "client": client,
-        "platforms": platforms,
+        "platforms": all_platforms,
         "results": results,
     }
 
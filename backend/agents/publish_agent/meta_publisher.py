@@ -1,5 +1,6 @@
 import os
-import requests
+
+from core import graph_client
 
 
 def post_to_facebook(message: str) -> dict:
@@ -8,21 +9,14 @@ def post_to_facebook(message: str) -> dict:
     """
     page_id = os.getenv("META_PAGE_ID")
     token = os.getenv("META_PAGE_TOKEN")
-    version = os.getenv("META_API_VERSION", "v24.0")
 
     if not page_id or not token:
         raise RuntimeError("META_PAGE_ID oder META_PAGE_TOKEN fehlt")
 
-    url = f"https://graph.facebook.com/{version}/{page_id}/feed"
-
-    r = requests.post(
-        url,
+    return graph_client.post(
+        f"{page_id}/feed",
         data={
             "message": message,
             "access_token": token,
         },
-        timeout=10,
     )
-
-    r.raise_for_status()
-    return r.json()
@@ -0,0 +1,88 @@
+"""
+🧩 Plattform-Adapter-Registry
+----------------------------
+- load_adapters(): importiert alle Adapter EINMAL (Supervisor-Start bzw.
+  erster Zugriff) → platform → Eintrag {name, publish, prepare, discard,
+  state_field, capabilities}; fehlgeschlagene Imports werden einmal
+  geloggt und als None gemerkt (kein erneuter Import-Versuch pro Post)
+- prepare/discard optional; STATE_FIELD = Post-Feld mit Vorarbeit des
+  Adapters (agent.py leert es nach Publish/Fehler)
+- Jeder Adapter deklariert CAPABILITIES (beim Laden in den Executor):
+    max_concurrency  Publish-Slots der Plattform (PUBLISH_CONCURRENCY_<PF>
+                     gewinnt)
+    batch            prepare() bündelt die Posts eines Ticks
+    min_batch        Posts, ab denen gebündelt wird
+    max_batch        Operationen pro Batch-Request
+  → publish_executor.batch_chunks() plant die Requests
+"""
+
+import importlib
+import threading
+from typing import Any, Dict, Optional
+
+from core import publish_executor
+from core.logger import logger
+
+ADAPTER_MODULES = {
+    "instagram": "agents.publish_agent.platforms.instagram",
+    "facebook": "agents.publish_agent.platforms.facebook",
+    "linkedin": "agents.publish_agent.platforms.linkedin",
+}
+
+DEFAULT_CAPABILITIES: Dict[str, Any] = {
+    "max_concurrency": publish_executor.DEFAULT_PLATFORM_CONCURRENCY,
+    "batch": False,
+    "min_batch": 2,
+    "max_batch": None,
+}
+
+_lock = threading.Lock()
+_registry: Optional[Dict[str, Optional[Dict[str, Any]]]] = None
+
+
+def _load(platform: str, module_name: str) -> Optional[Dict[str, Any]]:
+    try:
+        module = importlib.import_module(module_name)
+    except Exception as e:
+        logger.warning(f"[PlatformRegistry] ⚠ Adapter Import fehlgeschlagen ({platform}): {e}")
+        return None
+
+    return {
+        "name": platform,
+        "publish": module.publish,
+        "prepare": getattr(module, "prepare", None),
+        "discard": getattr(module, "discard", None),
+        "state_field": getattr(module, "STATE_FIELD", None),
+        "capabilities": {**DEFAULT_CAPABILITIES, **getattr(module, "CAPABILITIES", {})},
+    }
+
+
+def load_adapters(reload: bool = False) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    -> { platform: Eintrag | None }. Idempotent; reload=True lädt neu.
+    """
+    global _registry
+    with _lock:
+        if _registry is not None and not reload:
+            return _registry
+
+        registry = {pf: _load(pf, name) for pf, name in ADAPTER_MODULES.items()}
+        publish_executor.set_platform_limits({
+            pf: entry["capabilities"]["max_concurrency"]
+            for pf, entry in registry.items()
+            if entry is not None and entry["capabilities"]["max_concurrency"]
+        })
+        publish_executor.set_platform_batches({
+            pf: {"min": entry["capabilities"]["min_batch"], "max": entry["capabilities"]["max_batch"]}
+            for pf, entry in registry.items()
+            if entry is not None and entry["capabilities"]["batch"] and entry["capabilities"]["max_batch"]
+        })
+        _registry = registry
+
+    loaded = [pf for pf, entry in registry.items() if entry is not None]
+    logger.info(f"[PlatformRegistry] 🧩 Adapter geladen: {', '.join(loaded) or '-'}")
+    return registry
+
+
+def get_adapter(platform: str) -> Optional[Dict[str, Any]]:
+    return load_adapters().get(platform)
@@ -1,30 +1,148 @@
+"""
+📘 Facebook Adapter (Foto-Post auf die Page)
+-------------------------------------------
+- publish(post): einzelner Call über core/graph_client
+- prepare(posts): alle fälligen Facebook-Posts eines Ticks pro Page über
+  die Graph Batch API (max. 50 Operationen pro Request)
+- Batch-Ergebnisse landen VOR dem Return am Post ("fb_batch"), nicht im
+  Prozess → publish() liest sie vom Post; ein Absturz zwischen Batch
+  und Publish-Write-back postet nicht doppelt:
+    sending    Request läuft (vor dem Senden geschrieben)
+    published  Antwort-JSON der Operation → publish() liefert sie
+    error      Graph-Fehler der Operation → publish() wirft ihn
+    unknown    Ausgang offen (Timeout, Verbindungsabbruch, 5xx)
+  sending/unknown → PublishStateUnknown → manueller Abgleich, kein Retry
+- Batch-Planung über die Registry-Capabilities (batch/min_batch/max_batch →
+  publish_executor.batch_chunks): ab FB_BATCH_MIN_POSTS Posts, max.
+  BATCH_MAX_OPERATIONS pro Request, darunter Einzel-Calls
+"""
+
 import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Tuple
+
 import requests
 
-def publish(post: dict):
-    fb = post["results"]["facebook"]
-    image_url = "http://127.0.0.1:8000" + fb["preview_url"]
-    caption = fb["caption"]
+from agents.publish_agent import platforms as platform_registry
+from core import graph_client, post_store, publish_executor
+from core.logger import logger
+from core.publish_queue import PublishStateUnknown
+
+# Registry (agents/publish_agent/platforms/__init__.py)
+CAPABILITIES = {
+    "max_concurrency": 4,
+    "batch": True,
+    "min_batch": int(os.getenv("FB_BATCH_MIN_POSTS", "2")),
+    "max_batch": graph_client.BATCH_MAX_OPERATIONS,
+}
+
+# Post-Feld mit dem Batch-Ergebnis (agent.py leert es nach dem Publish)
+STATE_FIELD = "fb_batch"
+OPEN_STATES = ("sending", "unknown")
 
+
+def _credentials() -> Tuple[str, str]:
     page_id = os.getenv("META_PAGE_ID")
     token = os.getenv("META_PAGE_TOKEN")
-    version = os.getenv("META_API_VERSION", "v24.0")
 
     if not page_id or not token:
         raise RuntimeError("META_PAGE_ID oder META_PAGE_TOKEN fehlt")
+    return page_id, token
+
+
+def _photo(post: dict) -> Dict[str, str]:
+    fb = post["results"]["facebook"]
+    return {
+        "url": "http://127.0.0.1:8000" + fb["preview_url"],
+        "caption": fb["caption"],
+        "published": "true",
+    }
+
+
+def _utcnow_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _record(res: Any) -> Dict[str, Any]:
+    """
+    Ergebnis einer Operation → Eintrag für den Post.
+    """
+    if isinstance(res, graph_client.GraphAPIError):
+        return {"state": "error", "message": str(res)[:500],
+                "status_code": res.status_code, "error": res.error, "at": _utcnow_iso()}
+    if isinstance(res, Exception):
+        # Operation ohne Antwort → ob das Foto live ist, weiß nur die Page
+        return {"state": "unknown", "message": str(res)[:500], "at": _utcnow_iso()}
+    return {"state": "published", "response": res, "at": _utcnow_iso()}
+
+
+def _batch_failed(exc: Exception) -> Dict[str, Any]:
+    # 4xx auf den Batch-Request selbst → keine Operation ausgeführt
+    status = getattr(exc, "status_code", None)
+    if isinstance(exc, graph_client.GraphAPIError) and isinstance(status, int) and status < 500:
+        return _record(exc)
+    return {"state": "unknown", "message": str(exc)[:500], "at": _utcnow_iso()}
+
+
+def prepare(posts: Iterable[dict]) -> List[str]:
+    """
+    Veröffentlicht die Posts gebündelt und schreibt jedes Ergebnis an den
+    Post, bevor prepare() zurückkehrt. Eine Page pro Deployment
+    (META_PAGE_ID) → eine Gruppe.
+    """
+    try:
+        page_id, token = _credentials()
+    except RuntimeError:
+        return []
+
+    ops, ids = [], []
+    for post in posts:
+        post_id = post.get("id")
+        if not post_id or post_id in ids or (post.get(STATE_FIELD) or {}).get("state"):
+            continue  # schon gebatcht → publish() liest das Ergebnis
+        try:
+            body = _photo(post)
+        except (KeyError, TypeError):
+            continue  # publish() meldet den Fehler wie bisher
+        ops.append({"method": "POST", "relative_url": f"{page_id}/photos", "body": body})
+        ids.append(post_id)
+
+    platform_registry.load_adapters()  # Capabilities → Executor (idempotent)
+    chunks = publish_executor.batch_chunks("facebook", list(zip(ids, ops)))
+    if not chunks:
+        return []
+
+    # pro Request schreiben → ein Fehler in Request 2 verliert Request 1 nicht
+    for pairs in chunks:
+        chunk = [pid for pid, _ in pairs]
+        post_store.update_posts_many({
+            pid: {STATE_FIELD: {"state": "sending", "at": _utcnow_iso()}} for pid in chunk
+        })
+        try:
+            records = [_record(res) for res in graph_client.batch([op for _, op in pairs], token)]
+        except (graph_client.GraphAPIError, requests.RequestException) as e:
+            record = _batch_failed(e)
+            records = [record] * len(chunk)
+            logger.error(f"[Facebook] ❌ Batch-Request fehlgeschlagen ({record['state']}): {e}")
+        post_store.update_posts_many({pid: {STATE_FIELD: rec} for pid, rec in zip(chunk, records)})
+    return ids
+
+
+def publish(post: dict):
+    batched = post.get(STATE_FIELD) or {}
+    state = batched.get("state")
+    if state == "published":
+        return batched["response"]
+    if state in OPEN_STATES:
+        raise PublishStateUnknown(
+            f"Facebook-Batch ohne Ergebnis ({state} seit {batched.get('at')}): {batched.get('message', '')}"
+        )
+    if state == "error":
+        raise graph_client.GraphAPIError(
+            batched.get("message") or "Graph Batch Fehler",
+            status_code=batched.get("status_code"),
+            error=batched.get("error"),
+        )
 
-    r = requests.post(
-        f"https://graph.facebook.com/{version}/{page_id}/photos",
-        data={
-            "url": image_url,
-            "caption": caption,
-            "published": "true",
-            "access_token": token,
-        },
-        timeout=15,
-    )
-
-    if not r.ok:
-        raise RuntimeError(r.text)
-
-    return r.json()
+    page_id, token = _credentials()
+    return graph_client.post(f"{page_id}/photos", data={**_photo(post), "access_token": token})
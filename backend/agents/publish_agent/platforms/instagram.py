@@ -1,48 +1,266 @@
+"""
+📸 Instagram Adapter (Container → Status FINISHED → media_publish)
+-----------------------------------------------------------------
+- Async über core/graph_client (Hintergrund-Loop, Keep-Alive-Pool)
+- Container-Status wird gepollt (Backoff), erst FINISHED → media_publish
+  (große Bilder brauchen Verarbeitungszeit; sofortiges Publish schlägt fehl)
+- prepare(posts): Worker startet die Container ALLER fälligen IG-Posts
+  eines Ticks gleichzeitig → publish() wartet nur noch auf den eigenen
+  Container; Tick-Dauer ≈ langsamster Container statt Summe
+- Ohne prepare() (z.B. Publish-Now) legt publish() den Container selbst an
+- stage(posts): Container vorab (scheduler/ig_prestage.py, N Minuten vor
+  dem Termin) → am Post als "ig_container" gespeichert; publish() nutzt
+  ihn, solange er nicht abgelaufen ist und Bild/Caption passen →
+  zum Termin läuft nur noch media_publish
+"""
+
+import asyncio
+import json
 import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Dict, Iterable, List, Optional
+
 import requests
 
+from core import graph_client, publish_queue
+from core.logger import logger
+from core.post_model import iso_to_ts
+
+POLL_SECONDS = float(os.getenv("IG_CONTAINER_POLL_SECONDS", "1"))
+POLL_MAX_SECONDS = float(os.getenv("IG_CONTAINER_POLL_MAX_SECONDS", "10"))
+CONTAINER_TIMEOUT_SECONDS = float(os.getenv("IG_CONTAINER_TIMEOUT_SECONDS", "300"))
+CREATE_CONCURRENCY = int(os.getenv("IG_CONTAINER_CONCURRENCY", "10"))
+# Meta verwirft unveröffentlichte Container nach 24h; Puffer bis zum Publish
+CONTAINER_TTL_HOURS = float(os.getenv("IG_CONTAINER_TTL_HOURS", "24"))
+EXPIRY_MARGIN_MINUTES = float(os.getenv("IG_CONTAINER_EXPIRY_MARGIN_MINUTES", "30"))
+
+# Registry (agents/publish_agent/platforms/__init__.py)
+CAPABILITIES = {
+    "max_concurrency": 2,
+}
+
+# Post-Feld mit dem vorab angelegten Container (agent.py leert es nach dem Publish)
+STATE_FIELD = "ig_container"
+
+_lock = threading.Lock()
+_containers: Dict[str, Future] = {}  # post_id → Future(creation_id)
+_create_limits: Dict[int, asyncio.Semaphore] = {}  # pro Event-Loop
+
+
 def _env(name: str) -> str:
     val = os.getenv(name)
     if not val:
         raise RuntimeError(f"ENV variable missing: {name}")
     return val
 
-def publish(post: dict):
+
+def _container_error(creation_id: str, status: str) -> graph_client.GraphAPIError:
+    error = {"message": f"Container {creation_id} status {status}", "status_code": status}
+    return graph_client.GraphAPIError(json.dumps({"error": error}), error=error)
+
+
+# ============================================================
+# ⚡ ASYNC FLOW
+# ============================================================
+
+async def _create_container(ig_user_id: str, token: str, image_url: str, caption: str) -> str:
+    loop_id = id(asyncio.get_running_loop())
+    limit = _create_limits.get(loop_id)
+    if limit is None:
+        limit = _create_limits[loop_id] = asyncio.Semaphore(CREATE_CONCURRENCY)
+
+    async with limit:
+        r = await graph_client.apost(
+            f"{ig_user_id}/media",
+            data={
+                "image_url": image_url,
+                "caption": caption,
+                "access_token": token,
+            },
+        )
+
+    creation_id = r.get("id")
+    if not creation_id:
+        raise RuntimeError("No creation_id returned")
+    return creation_id
+
+
+async def _wait_finished(creation_id: str, token: str) -> None:
+    """
+    Pollt status_code mit exponentiellem Backoff bis FINISHED.
+    ERROR/EXPIRED → GraphAPIError (kein Retry), Timeout → requests.Timeout (Retry).
+    """
+    deadline = time.monotonic() + CONTAINER_TIMEOUT_SECONDS
+    delay = POLL_SECONDS
+
+    while True:
+        r = await graph_client.aget(
+            creation_id,
+            params={"fields": "status_code", "access_token": token},
+        )
+        status = str(r.get("status_code") or "").upper()
+        if status in ("FINISHED", "PUBLISHED"):
+            return
+        if status in ("ERROR", "EXPIRED"):
+            raise _container_error(creation_id, status)
+
+        if time.monotonic() + delay > deadline:
+            raise requests.Timeout(f"Container {creation_id} nach {CONTAINER_TIMEOUT_SECONDS:g}s nicht fertig ({status})")
+        await asyncio.sleep(delay)
+        delay = min(POLL_MAX_SECONDS, delay * 2)
+
+
+async def _prepare_container(ig_user_id: str, token: str, image_url: str, caption: str) -> str:
+    creation_id = await _create_container(ig_user_id, token, image_url, caption)
+    await _wait_finished(creation_id, token)
+    return creation_id
+
+
+def _media(post: dict) -> Dict[str, str]:
     ig = post["results"]["instagram"]
-    image_url = "http://127.0.0.1:8000" + ig["preview_url"]
-    caption = ig["caption"]
+    return {"image_url": "http://127.0.0.1:8000" + ig["preview_url"], "caption": ig["caption"]}
+
 
+def _start(post: dict) -> Future:
+    media = _media(post)
     ig_user_id = _env("INSTAGRAM_BUSINESS_ID")
     token = _env("META_PAGE_TOKEN")
-    version = os.getenv("META_API_VERSION", "v24.0")
+    return graph_client.submit(_prepare_container(ig_user_id, token, media["image_url"], media["caption"]))
 
-    # STEP 1: CREATE MEDIA
-    r1 = requests.post(
-        f"https://graph.facebook.com/{version}/{ig_user_id}/media",
-        data={
-            "image_url": image_url,
-            "caption": caption,
-            "access_token": token,
-        },
-        timeout=15,
-    )
-    if not r1.ok:
-        raise RuntimeError(r1.text)
 
-    creation_id = r1.json().get("id")
-    if not creation_id:
-        raise RuntimeError("No creation_id returned")
+# ============================================================
+# ⏳ VORAB ANGELEGTE CONTAINER (am Post gespeichert)
+# ============================================================
+
+def staged_creation_id(post: dict, now_ts: Optional[float] = None) -> Optional[str]:
+    """
+    creation_id des gespeicherten Containers, wenn er noch lange genug
+    gültig ist und zum aktuellen Bild + Caption gehört.
+    """
+    container = post.get("ig_container")
+    if not isinstance(container, dict) or not container.get("creation_id"):
+        return None
+
+    now_ts = time.time() if now_ts is None else now_ts
+    expires = iso_to_ts(container.get("expires_at"))
+    if expires is None or expires - EXPIRY_MARGIN_MINUTES * 60 <= now_ts:
+        return None
+
+    try:
+        media = _media(post)
+    except (KeyError, TypeError):
+        return None
+    if container.get("image_url") != media["image_url"] or container.get("caption") != media["caption"]:
+        return None
+    return container["creation_id"]
+
+
+def stage(posts: Iterable[dict]) -> Dict[str, Any]:
+    """
+    Container für alle Posts parallel anlegen und bis FINISHED pollen.
+    -> { post_id: ig_container-Dict | Exception }
+    """
+    ig_user_id = _env("INSTAGRAM_BUSINESS_ID")
+    token = _env("META_PAGE_TOKEN")
+
+    staged: Dict[str, Any] = {}
+    media: Dict[str, Dict[str, str]] = {}
+    for post in posts:
+        try:
+            media[post["id"]] = _media(post)
+        except (KeyError, TypeError) as e:
+            staged[post.get("id")] = e
+
+    async def one(m: Dict[str, str]) -> Dict[str, Any]:
+        creation_id = await _prepare_container(ig_user_id, token, m["image_url"], m["caption"])
+        created = datetime.now(timezone.utc)
+        return {
+            "creation_id": creation_id,
+            **m,
+            "created_at": created.isoformat(),
+            "expires_at": (created + timedelta(hours=CONTAINER_TTL_HOURS)).isoformat(),
+        }
+
+    async def run_all():
+        return await asyncio.gather(*(one(m) for m in media.values()), return_exceptions=True)
 
-    # STEP 2: PUBLISH MEDIA
-    r2 = requests.post(
-        f"https://graph.facebook.com/{version}/{ig_user_id}/media_publish",
+    if media:
+        staged.update(zip(media, graph_client.run(run_all())))
+    return staged
+
+
+# ============================================================
+# 🧩 ADAPTER-API
+# ============================================================
+
+def prepare(posts: Iterable[dict]) -> List[str]:
+    """
+    Container für alle Posts gleichzeitig anlegen (kehrt sofort zurück).
+    Posts ohne Preview / ohne ENV → publish() meldet den Fehler wie bisher.
+    """
+    started = []
+    now_ts = time.time()
+    for post in posts:
+        post_id = post.get("id")
+        if staged_creation_id(post, now_ts):
+            continue  # vorab angelegt → nur media_publish
+        with _lock:
+            if not post_id or post_id in _containers:
+                continue
+        try:
+            fut = _start(post)
+        except (KeyError, TypeError, RuntimeError):
+            continue
+        with _lock:
+            _containers[post_id] = fut
+        started.append(post_id)
+    return started
+
+
+def discard(post_ids: Iterable[str]) -> None:
+    """
+    Nicht verbrauchte Container vergessen (verfallen bei Meta nach 24h).
+    """
+    with _lock:
+        for post_id in post_ids:
+            fut = _containers.pop(post_id, None)
+            if fut is not None:
+                fut.cancel()
+
+
+def _media_publish(creation_id: str) -> Dict[str, Any]:
+    return graph_client.run(graph_client.apost(
+        f"{_env('INSTAGRAM_BUSINESS_ID')}/media_publish",
         data={
             "creation_id": creation_id,
-            "access_token": token,
+            "access_token": _env("META_PAGE_TOKEN"),
         },
-        timeout=15,
-    )
-    if not r2.ok:
-        raise RuntimeError(r2.text)
+    ))
+
+
+def publish(post: dict):
+    with _lock:
+        fut = _containers.pop(post.get("id"), None)
+
+    staged = None if fut is not None else staged_creation_id(post)
+    if staged:
+        try:
+            return _media_publish(staged)
+        except graph_client.GraphAPIError as e:
+            if publish_queue.is_retryable(e):
+                raise
+            # Container bei Meta verworfen/ungültig → einmal frisch anlegen
+            logger.warning(f"[Instagram] ⚠ Vorab-Container {staged} unbrauchbar, neu: {e}")
+
+    if fut is None:
+        fut = _start(post)
+
+    try:
+        creation_id = fut.result(timeout=CONTAINER_TIMEOUT_SECONDS + graph_client.READ_TIMEOUT)
+    except FutureTimeout as e:
+        raise requests.Timeout("Instagram Container nicht rechtzeitig fertig") from e
 
-    return r2.json()
+    return _media_publish(creation_id)
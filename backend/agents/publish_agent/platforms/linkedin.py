@@ -3,6 +3,11 @@ from datetime import datetime
 
 from core.logger import logger
 
+# Registry (agents/publish_agent/platforms/__init__.py) – nur simuliert
+CAPABILITIES = {
+    "max_concurrency": 2,
+}
+
 
 def publish(post: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
-from core.post_store import get_post_by_id, update_post
+from core.post_store import update_post
 from api.dashboard_helpers import (
+    _hot_post,
     PREVIEW_DIR,
     APPROVED_DIR,
     POSTING_QUEUE_DIR,
@@ -15,8 +16,7 @@ router = APIRouter(prefix="/api/dashboard", tags=["dashboard-actions"])
 @router.post("/approve/{post_id}")
 def approve_post(post_id: str):
     base_id = _base_post_id(post_id)
-    if not get_post_by_id(base_id):
-        raise HTTPException(404)
+    _hot_post(base_id)
 
     _move_variants(base_id, PREVIEW_DIR, APPROVED_DIR)
     update_post(base_id, {"status": "approved", "updated_at": _utcnow_iso()})
@@ -25,6 +25,7 @@ def approve_post(post_id: str):
 @router.post("/schedule/{post_id}")
 def schedule_post(post_id: str):
     base_id = _base_post_id(post_id)
+    _hot_post(base_id)
 
     if _any_variants_exist(base_id, APPROVED_DIR):
         _move_variants(base_id, APPROVED_DIR, POSTING_QUEUE_DIR)
@@ -39,6 +40,7 @@ def schedule_post(post_id: str):
 @router.post("/post/{post_id}")
 def post_post(post_id: str):
     base_id = _base_post_id(post_id)
+    _hot_post(base_id)
     update_post(base_id, {"status": "posted", "posted_at": _utcnow_iso()})
     return {"status": "posted"}
 
@@ -49,9 +51,7 @@ def post_post(post_id: str):
 def mark_linkedin_posted(client: str, post_id: str):
     base_id = _base_post_id(post_id)
 
-    post = get_post_by_id(base_id)
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
+    post = _hot_post(base_id)
 
     update_post(
         base_id,
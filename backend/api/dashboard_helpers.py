@@ -3,6 +3,8 @@ from pathlib import Path
 import shutil
 from datetime import datetime, timezone
 
+from core import post_store
+
 # =================================================
 # CONFIG
 # =================================================
@@ -52,6 +54,17 @@ def _base_post_id(post_id: str) -> str:
         return post_id[:-9]
     return post_id
 
+def _hot_post(base_id: str) -> dict:
+    """
+    Post für Schreibzugriffe: archiviert → 409 (read-only), fehlt → 404.
+    """
+    post = post_store.get_hot_post(base_id)
+    if post is not None:
+        return post
+    if post_store.get_post_by_id(base_id) is not None:
+        raise HTTPException(409, "Post is archived")
+    raise HTTPException(404, "Post not found")
+
 def _static_to_fs(url: str) -> Path:
     if not isinstance(url, str) or not url.startswith("/static/"):
         raise HTTPException(400, f"Invalid static url: {url}")
@@ -1,7 +1,7 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter
 from pydantic import BaseModel
-from core.post_store import get_post_by_id, update_post
-from api.dashboard_helpers import _base_post_id, _utcnow_iso, _safe_category
+from core.post_store import update_post
+from api.dashboard_helpers import _base_post_id, _hot_post, _utcnow_iso, _safe_category
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard-meta"])
 
@@ -13,9 +13,7 @@ class UpdateMetaPayload(BaseModel):
 @router.post("/update-meta/{post_id}")
 def update_meta(post_id: str, payload: UpdateMetaPayload):
     base_id = _base_post_id(post_id)
-    post = get_post_by_id(base_id)
-    if not post:
-        raise HTTPException(404)
+    _hot_post(base_id)
 
     patch = {"updated_at": _utcnow_iso()}
     if payload.caption:
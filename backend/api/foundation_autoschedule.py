@@ -4,6 +4,7 @@ from pathlib import Path
 from datetime import datetime, timezone
 import json
 
+from core.post_model import parse_iso_utc
 from core.post_store import get_post_by_id, update_post
 from core.fs_utils import move_variants
 
@@ -83,7 +84,7 @@ def autoschedule_foundation(client: str):
             post_id,
             {
                 "status": "scheduled",
-                "platform_times": build_platform_times(),
+                "platform_times": build_platform_times(parse_iso_utc(publish_at)),
                 "publish_at": publish_at,
                 "updated_at": datetime.now(timezone.utc).isoformat(),
             },
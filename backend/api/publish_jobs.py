@@ -0,0 +1,33 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+
+from core import publish_queue
+
+router = APIRouter(prefix="/api/publish-jobs", tags=["publish-jobs"])
+
+
+@router.get("")
+def list_publish_jobs(state: Optional[str] = None):
+    return {"jobs": publish_queue.list_jobs(state)}
+
+
+@router.get("/dead")
+def list_dead_letters():
+    return {"jobs": publish_queue.list_jobs("dead")}
+
+
+# =================================================
+# 🔁 RE-DRIVE (Dead-Letter → wieder fällig)
+# =================================================
+@router.post("/redrive")
+def redrive_all():
+    return {"redriven": publish_queue.redrive()}
+
+
+@router.post("/redrive/{job_id}")
+def redrive_job(job_id: str):
+    moved = publish_queue.redrive(job_id)
+    if not moved:
+        raise HTTPException(status_code=404, detail="Dead-letter job not found")
+    return {"redriven": moved}
@@ -5,9 +5,11 @@ import json
 import shutil
 from datetime import datetime
 
-from agents.publish_agent import run as publish_run
+from agents.publish_agent.agent import publish_post
+from core import post_store
 from core.posting_guard import posting_allowed
 from core.client_config import load_client_config
+from core.publish_executor import publish_now
 
 router = APIRouter(prefix="/api/publisher", tags=["publisher"])
 
@@ -25,6 +27,11 @@ class PublishPayload(BaseModel):
 # -------------------------------------------------
 ALLOWED_EXTS = {".jpg", ".jpeg", ".png"}
 
+# 🔐 "Publish now" claimt den Post wie ein Scheduler-Worker → kein Doppel-Post
+PUBLISH_NOW_OWNER = "publish-now"
+PUBLISH_NOW_LEASE_SECONDS = 600
+PUBLISH_NOW_STATUSES = ("preview", "approved", "scheduled", "retrying", "failed")
+
 
 def client_dirs(client: str):
     base = Path(__file__).resolve().parents[1] / "clients" / client
@@ -103,7 +110,6 @@ def queue(client: str):
 def post_now(post_id: str, payload: PublishPayload):
     client = payload.client
     platform = payload.platform or "instagram,facebook"
-    mode = payload.mode
 
     cfg = load_client_config(client)
 
@@ -121,17 +127,23 @@ def post_now(post_id: str, payload: PublishPayload):
     if not src:
         raise HTTPException(status_code=404, detail="Approved-Datei nicht gefunden")
 
-    entry = meta.get(src.name, {})
-    caption = entry.get("caption", "")
-    category = entry.get("category", "uncategorized")
-
-    # 1️⃣ Publish Agent
-    result = publish_run(
-        prompt=caption or f"Post ({category})",
-        client=client,
-        platform=platform,
-        mode=mode,
+    # 1️⃣ Publish Agent – Priority-Lane (vor Scheduler-Batches)
+    post_store.ensure_post_exists(post_id, client)
+    claimed = post_store.claim_posts(
+        [post_id], PUBLISH_NOW_OWNER, PUBLISH_NOW_LEASE_SECONDS, statuses=PUBLISH_NOW_STATUSES
     )
+    if not claimed:
+        status = (post_store.get_post_by_id(post_id) or {}).get("status")
+        if status == "publishing":
+            raise HTTPException(status_code=409, detail="Post wird gerade veröffentlicht")
+        return {"status": "skipped", "id": post_id, "reason": status}
+
+    platforms = [p.strip().lower() for p in platform.split(",") if p.strip()]
+    try:
+        result = publish_now(lambda: publish_post(post_id, platforms=platforms))
+    except Exception:
+        post_store.release_post(post_id, PUBLISH_NOW_OWNER)
+        raise
 
     # 2️⃣ Move File
     dst = posted / src.name
@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from core import scheduler_metrics
+
+router = APIRouter(prefix="/api/scheduler", tags=["scheduler"])
+
+
+@router.get("/metrics")
+def get_scheduler_metrics():
+    return {"workers": scheduler_metrics.read_all()}
+
+
+# =================================================
+# 📈 PROMETHEUS (text exposition format)
+# =================================================
+@router.get("/metrics/prometheus", response_class=PlainTextResponse)
+def get_scheduler_metrics_prometheus():
+    return PlainTextResponse(
+        scheduler_metrics.render_prometheus(),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -1,5 +1,13 @@
 from pathlib import Path
+from contextlib import contextmanager
+import os
 import shutil
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows: kein advisory locking
+    fcntl = None
 
 ALLOWED_EXTS = (".png", ".jpg", ".jpeg", ".webp")
 PLATFORM_SUFFIXES = ("", "_facebook", "_linkedin")
@@ -16,3 +24,57 @@ def move_variants(base_id: str, src_dir: Path, dst_dir: Path) -> bool:
                 moved = True
 
     return moved
+
+
+# =================================================
+# 🔒 ATOMIC WRITE + CROSS-PROCESS LOCK
+# =================================================
+
+def atomic_write_text(path: Path, text: str, encoding: str = "utf-8") -> None:
+    """
+    Temp-Datei im selben Ordner + fsync + os.replace:
+    Leser sehen immer entweder den alten oder den neuen, vollständigen Inhalt.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding=encoding) as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+    # Rename selbst dauerhaft machen (Verzeichnis-Eintrag)
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(str(path.parent), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+@contextmanager
+def file_lock(lock_path: Path):
+    """
+    Exklusiver advisory Lock (flock) – schützt Read-Modify-Write über
+    Prozessgrenzen (Web-Worker, Scheduler, Tools) und Threads hinweg.
+    """
+    lock_path = Path(lock_path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(lock_path, "a+") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,308 @@
+"""
+🌐 Graph API Client (gepoolte Keep-Alive-Verbindungen, sync + async)
+-------------------------------------------------------------------
+- EINE requests.Session pro Prozess → TCP+TLS-Handshake nur beim ersten
+  Call pro Verbindung, nicht pro Request (IG Container + Publish teilen
+  sich die Verbindung)
+- Pool-Größe GRAPH_POOL_SIZE (≥ parallele Plattform-Tasks, s. publish_executor)
+- Timeouts: GRAPH_CONNECT_TIMEOUT / GRAPH_READ_TIMEOUT (Sekunden)
+- Retries (GRAPH_RETRIES) nur für Verbindungsaufbau + idempotente GETs –
+  nie für POST (sonst doppelte Posts); Publish-Retries macht core/publish_queue.py
+- API-Version + Base-URL an EINER Stelle: META_API_VERSION, GRAPH_BASE_URL
+- Fehler → GraphAPIError (.error = Graph-Fehlerobjekt, .status_code),
+  str(exc) = Response-Body wie bisher RuntimeError(r.text)
+- Async: httpx.AsyncClient pro Event-Loop (aget/apost, Retries nur beim
+  Verbindungsaufbau); Transportfehler → requests.ConnectionError/Timeout
+  → gleiche Retry-Klassifikation (publish_queue.is_retryable)
+- batch(): Graph Batch API (max. BATCH_MAX_OPERATIONS pro Request) →
+  Ergebnis bzw. GraphAPIError pro Operation, Reihenfolge wie übergeben
+- submit()/run(): Coroutines aus Worker-Threads auf EINEM Hintergrund-Loop
+  (Thread "graph-loop") → viele gleichzeitige Calls ohne einen Thread pro Call
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import json
+import os
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urlencode
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+GRAPH_API_VERSION = os.getenv("META_API_VERSION", "v24.0")
+GRAPH_BASE_URL = os.getenv("GRAPH_BASE_URL", "https://graph.facebook.com").rstrip("/")
+
+CONNECT_TIMEOUT = float(os.getenv("GRAPH_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("GRAPH_READ_TIMEOUT", "30"))
+POOL_SIZE = int(os.getenv("GRAPH_POOL_SIZE", "16"))
+RETRIES = int(os.getenv("GRAPH_RETRIES", "2"))
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+BATCH_MAX_OPERATIONS = 50  # Limit der Graph API
+
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class GraphAPIError(RuntimeError):
+    """
+    Nicht-2xx-Antwort der Graph API.
+    """
+
+    def __init__(self, text: str, status_code: Optional[int] = None, error: Optional[Dict[str, Any]] = None):
+        super().__init__(text)
+        self.status_code = status_code
+        self.error = error
+
+
+def url(path: str) -> str:
+    """
+    "/{id}/media" → https://graph.facebook.com/<version>/{id}/media
+    (absolute URLs bleiben unverändert).
+    """
+    if path.startswith(("http://", "https://")):
+        return path
+    return f"{GRAPH_BASE_URL}/{GRAPH_API_VERSION}/{path.lstrip('/')}"
+
+
+def _timeout(timeout) -> Any:
+    return (CONNECT_TIMEOUT, READ_TIMEOUT) if timeout is None else timeout
+
+
+def _parse(status_code: int, text: str, payload: Any) -> Dict[str, Any]:
+    if 200 <= status_code < 300:
+        return payload if isinstance(payload, dict) else {"data": payload}
+    error = payload.get("error") if isinstance(payload, dict) else None
+    raise GraphAPIError(text, status_code=status_code, error=error if isinstance(error, dict) else None)
+
+
+def _json_or_none(response) -> Any:
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+# ============================================================
+# 🔁 SYNC (requests)
+# ============================================================
+
+def _new_session() -> requests.Session:
+    retry = Retry(
+        total=RETRIES,
+        connect=RETRIES,
+        read=0,
+        status=RETRIES,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset({"GET"}),
+        backoff_factor=0.5,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _new_session()
+    return _session
+
+
+def _reset_after_fork() -> None:
+    # Sockets des Parent-Prozesses nicht im Child weiterverwenden
+    global _session, _lock, _loop
+    _lock = threading.Lock()
+    _session = None
+    _loop = None  # Loop-Thread existiert im Child nicht
+    _async_clients.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def request(
+    method: str,
+    path: str,
+    params: Optional[Dict[str, Any]] = None,
+    data: Optional[Dict[str, Any]] = None,
+    timeout=None,
+) -> Dict[str, Any]:
+    r = session().request(method, url(path), params=params, data=data, timeout=_timeout(timeout))
+    return _parse(r.status_code, r.text, _json_or_none(r))
+
+
+def get(path: str, params: Optional[Dict[str, Any]] = None, timeout=None) -> Dict[str, Any]:
+    return request("GET", path, params=params, timeout=timeout)
+
+
+def post(
+    path: str,
+    data: Optional[Dict[str, Any]] = None,
+    params: Optional[Dict[str, Any]] = None,
+    timeout=None,
+) -> Dict[str, Any]:
+    return request("POST", path, params=params, data=data, timeout=timeout)
+
+
+def _batch_result(item: Optional[Dict[str, Any]]) -> Union[Dict[str, Any], Exception]:
+    if item is None:
+        # Graph API hat die Operation nicht mehr ausgeführt (Batch-Timeout)
+        return requests.Timeout("Batch-Operation ohne Antwort")
+    body = item.get("body") or ""
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        payload = None
+    try:
+        return _parse(int(item.get("code") or 0), body, payload)
+    except GraphAPIError as e:
+        return e
+
+
+def batch(
+    operations: List[Dict[str, Any]],
+    access_token: str,
+    timeout=None,
+) -> List[Union[Dict[str, Any], Exception]]:
+    """
+    operations: [{"method": "POST", "relative_url": "<page>/photos", "body": {...}}]
+    -> pro Operation Antwort-JSON oder Exception (GraphAPIError / Timeout).
+    Fehler des ganzen Batch-Requests werden normal geworfen.
+    """
+    out: List[Union[Dict[str, Any], Exception]] = []
+    for i in range(0, len(operations), BATCH_MAX_OPERATIONS):
+        chunk = [
+            {
+                "method": op.get("method", "GET"),
+                "relative_url": op["relative_url"],
+                **({"body": urlencode(op["body"])} if op.get("body") else {}),
+            }
+            for op in operations[i:i + BATCH_MAX_OPERATIONS]
+        ]
+        data = post("", data={"batch": json.dumps(chunk), "access_token": access_token}, timeout=timeout)
+        items = data.get("data") if isinstance(data.get("data"), list) else []
+        items = items + [None] * (len(chunk) - len(items))
+        out.extend(_batch_result(item) for item in items[:len(chunk)])
+    return out
+
+
+def close() -> None:
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+# ============================================================
+# ⚡ ASYNC (httpx)
+# ============================================================
+
+def _async_transport() -> httpx.AsyncBaseTransport:
+    # retries= gilt bei httpx nur für den Verbindungsaufbau
+    return httpx.AsyncHTTPTransport(retries=RETRIES)
+
+
+def async_client() -> httpx.AsyncClient:
+    """
+    Ein Client pro Event-Loop (httpx-Clients sind an ihren Loop gebunden).
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            transport=_async_transport(),
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def _async_timeout(timeout) -> Any:
+    if timeout is None:
+        return httpx.USE_CLIENT_DEFAULT
+    if isinstance(timeout, tuple):
+        return httpx.Timeout(timeout[1], connect=timeout[0])
+    return timeout
+
+
+async def arequest(
+    method: str,
+    path: str,
+    params: Optional[Dict[str, Any]] = None,
+    data: Optional[Dict[str, Any]] = None,
+    timeout=None,
+) -> Dict[str, Any]:
+    try:
+        r = await async_client().request(
+            method, url(path), params=params, data=data, timeout=_async_timeout(timeout)
+        )
+    except httpx.TimeoutException as e:
+        raise requests.Timeout(str(e)) from e
+    except httpx.TransportError as e:
+        raise requests.ConnectionError(str(e)) from e
+    return _parse(r.status_code, r.text, _json_or_none(r))
+
+
+async def aget(path: str, params: Optional[Dict[str, Any]] = None, timeout=None) -> Dict[str, Any]:
+    return await arequest("GET", path, params=params, timeout=timeout)
+
+
+async def apost(
+    path: str,
+    data: Optional[Dict[str, Any]] = None,
+    params: Optional[Dict[str, Any]] = None,
+    timeout=None,
+) -> Dict[str, Any]:
+    return await arequest("POST", path, params=params, data=data, timeout=timeout)
+
+
+async def aclose() -> None:
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+# ============================================================
+# 🧵 HINTERGRUND-LOOP (Brücke für Worker-Threads)
+# ============================================================
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="graph-loop", daemon=True).start()
+            _loop = loop
+        return _loop
+
+
+def submit(coro) -> "concurrent.futures.Future":
+    """
+    Coroutine auf dem Hintergrund-Loop starten (kehrt sofort zurück).
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop())
+
+
+def run(coro, timeout: Optional[float] = None) -> Any:
+    return submit(coro).result(timeout)
@@ -88,6 +88,8 @@ from api.stats import router as stats_router
 
 from api.workflow import router as workflow_router
 from api.publisher import router as publisher_router
+from api.publish_jobs import router as publish_jobs_router
+from api.scheduler_metrics import router as scheduler_metrics_router
 from api.foundation_create_previews import router as foundation_previews_router
 from api.foundation_autoschedule import router as foundation_autoschedule_router
 
@@ -108,6 +110,8 @@ app.include_router(stats_router)
 
 app.include_router(workflow_router)
 app.include_router(publisher_router)
+app.include_router(publish_jobs_router)
+app.include_router(scheduler_metrics_router)
 
 app.include_router(foundation_previews_router)
 app.include_router(foundation_autoschedule_router)
@@ -1,5 +1,6 @@
 import os
-import requests
+
+from core import graph_client
 
 # =================================================
 # 📘 FACEBOOK FOTO POST
@@ -7,26 +8,19 @@ import requests
 def post_photo_to_facebook(image_url: str, caption: str) -> dict:
     page_id = os.getenv("META_PAGE_ID")
     token = os.getenv("META_PAGE_TOKEN")
-    version = os.getenv("META_API_VERSION", "v19.0")
 
     if not page_id or not token:
         raise RuntimeError("META_PAGE_ID oder META_PAGE_TOKEN fehlt")
 
-    url = f"https://graph.facebook.com/{version}/{page_id}/photos"
-
-    r = requests.post(
-        url,
+    return graph_client.post(
+        f"{page_id}/photos",
         data={
             "url": image_url,
             "caption": caption,
             "access_token": token,
         },
-        timeout=15,
     )
 
-    r.raise_for_status()
-    return r.json()
-
 
 # =================================================
 # 📸 INSTAGRAM FOTO POST
@@ -34,32 +28,24 @@ def post_photo_to_facebook(image_url: str, caption: str) -> dict:
 def post_photo_to_instagram(image_url: str, caption: str) -> dict:
     ig_user_id = os.getenv("META_IG_USER_ID")
     token = os.getenv("META_PAGE_TOKEN")
-    version = os.getenv("META_API_VERSION", "v19.0")
 
     if not ig_user_id or not token:
         raise RuntimeError("META_IG_USER_ID oder META_PAGE_TOKEN fehlt")
 
-    container_url = f"https://graph.facebook.com/{version}/{ig_user_id}/media"
-    r = requests.post(
-        container_url,
+    r = graph_client.post(
+        f"{ig_user_id}/media",
         data={
             "image_url": image_url,
             "caption": caption,
             "access_token": token,
         },
-        timeout=15,
     )
-    r.raise_for_status()
-    creation_id = r.json()["id"]
+    creation_id = r["id"]
 
-    publish_url = f"https://graph.facebook.com/{version}/{ig_user_id}/media_publish"
-    r2 = requests.post(
-        publish_url,
+    return graph_client.post(
+        f"{ig_user_id}/media_publish",
         data={
             "creation_id": creation_id,
             "access_token": token,
         },
-        timeout=15,
     )
-    r2.raise_for_status()
-    return r2.json()
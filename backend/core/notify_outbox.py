@@ -0,0 +1,292 @@
+"""
+📬 Notification Outbox (Publish-Benachrichtigungen, asynchron)
+-------------------------------------------------------------
+- publish_post hängt nur an (enqueue) → kein SMTP/Teams im Publish-Pfad
+- runtime/notify_outbox.json (Datei-Lock + atomic write wie publish_queue)
+- dispatch(): pro Client EIN Digest, sobald die älteste Nachricht
+  NOTIFY_DIGEST_SECONDS wartet oder NOTIFY_DIGEST_MAX erreicht sind
+- Kanäle: E-Mail (eine SMTP-Verbindung pro Dispatch-Lauf für alle
+  Digests, STARTTLS + Login nur einmal) und Teams-Webhook (Keep-Alive-Session)
+- Zustellung pro Kanal gemerkt → ein Retry schickt nur den
+  fehlgeschlagenen Kanal erneut
+- Fehler: eigener Backoff (NOTIFY_RETRY_BASE_SECONDS/NOTIFY_RETRY_MAX_SECONDS,
+  unabhängig von PUBLISH_RETRY_*), nach NOTIFY_MAX_ATTEMPTS → "dead"
+- Während der Zustellung sind die Einträge geleast (next_attempt_ts)
+  → mehrere Dispatcher senden nichts doppelt
+- Dispatcher: Supervisor-Job "notify" bzw. scheduler/worker.loop() nach
+  jedem Tick; Web-Prozess und publish_post hängen nur an
+"""
+
+import json
+import os
+import random
+import smtplib
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.mime.text import MIMEText
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from core.fs_utils import atomic_write_text, file_lock
+from core.logger import logger
+
+BASE_DIR = Path(__file__).resolve().parents[1]  # backend/
+OUTBOX_PATH = BASE_DIR / "runtime" / "notify_outbox.json"
+
+DIGEST_SECONDS = float(os.getenv("NOTIFY_DIGEST_SECONDS", "300"))
+DIGEST_MAX = int(os.getenv("NOTIFY_DIGEST_MAX", "20"))
+MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "5"))
+LEASE_SECONDS = float(os.getenv("NOTIFY_LEASE_SECONDS", "300"))
+BACKOFF_BASE_SECONDS = float(os.getenv("NOTIFY_RETRY_BASE_SECONDS", "60"))
+BACKOFF_MAX_SECONDS = float(os.getenv("NOTIFY_RETRY_MAX_SECONDS", "3600"))
+
+_teams_session: Optional[requests.Session] = None
+
+
+# ============================================================
+# 📦 IO
+# ============================================================
+
+def _read() -> Dict[str, Any]:
+    try:
+        data = json.loads(OUTBOX_PATH.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {"items": {}}
+    data.setdefault("items", {})
+    return data
+
+
+@contextmanager
+def _writing():
+    with file_lock(OUTBOX_PATH.with_name(OUTBOX_PATH.name + ".lock")):
+        data = _read()
+        yield data
+        atomic_write_text(OUTBOX_PATH, json.dumps(data, indent=2, ensure_ascii=False))
+
+
+def _utcnow_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# ============================================================
+# ✍️ ENQUEUE
+# ============================================================
+
+def enqueue(client: str, platforms: List[str], message: str) -> str:
+    now = time.time()
+    item_id = uuid.uuid4().hex
+    with _writing() as data:
+        data["items"][item_id] = {
+            "id": item_id,
+            "client": client,
+            "platforms": list(platforms),
+            "message": message,
+            "state": "pending",
+            "created_ts": now,
+            "created_at": _utcnow_iso(),
+            "attempts": 0,
+            "next_attempt_ts": now,
+            "sent": [],
+        }
+    return item_id
+
+
+def list_items(state: Optional[str] = None) -> List[Dict[str, Any]]:
+    items = _read()["items"].values()
+    return [i for i in items if state is None or i.get("state") == state]
+
+
+def next_dispatch_ts() -> Optional[float]:
+    """
+    Frühester Zeitpunkt, zu dem dispatch() etwas senden kann (Worker-Schlaf).
+    """
+    due = [
+        max(i["next_attempt_ts"], i["created_ts"] + (0 if i["attempts"] else DIGEST_SECONDS))
+        for i in list_items("pending")
+    ]
+    return min(due) if due else None
+
+
+# ============================================================
+# 📤 KANÄLE
+# ============================================================
+
+def channels() -> List[str]:
+    out = []
+    if all(os.getenv(k) for k in ("SMTP_HOST", "SMTP_USER", "SMTP_PASS", "NOTIFY_EMAIL")):
+        out.append("email")
+    if os.getenv("TEAMS_WEBHOOK"):
+        out.append("teams")
+    return out
+
+
+def _digest(client: str, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    platforms = list(dict.fromkeys(pf for i in items for pf in i.get("platforms") or []))
+    if len(items) == 1:
+        text = items[0]["message"]
+    else:
+        text = f"{len(items)} Updates:\n" + "\n".join(f"- {i['message']}" for i in items)
+    return {"client": client, "platforms": platforms, "text": text}
+
+
+def _send_email(mailer: Dict[str, Any], digest: Dict[str, Any]) -> None:
+    """
+    mailer: Zustand des Laufs – Verbindung beim ersten Digest öffnen und
+    für alle weiteren nutzen; nach einem Fehler neu verbinden.
+    """
+    user = os.getenv("SMTP_USER")
+    msg = MIMEText(
+        f"Hallo {digest['client']},\n\n{digest['text']}\n\n"
+        f"Plattformen: {', '.join(digest['platforms'])}\n\n"
+        f"— IntelliAgent Solutions"
+    )
+    msg["Subject"] = f"Content-Update ({', '.join(digest['platforms'])})"
+    msg["From"] = user
+    msg["To"] = os.getenv("NOTIFY_EMAIL")
+
+    if mailer.get("server") is None:
+        server = smtplib.SMTP(os.getenv("SMTP_HOST"), 587, timeout=10)
+        server.starttls()
+        server.login(user, os.getenv("SMTP_PASS"))
+        mailer["server"] = server
+    try:
+        mailer["server"].send_message(msg)
+    except Exception:
+        _close_mailer(mailer)
+        raise
+
+
+def _close_mailer(mailer: Dict[str, Any]) -> None:
+    server = mailer.pop("server", None)
+    if server is not None:
+        try:
+            server.quit()
+        except Exception:
+            pass
+
+
+def _send_teams(digest: Dict[str, Any]) -> None:
+    global _teams_session
+    if _teams_session is None:
+        _teams_session = requests.Session()
+    payload = {
+        "text": (
+            f"📢 *Content veröffentlicht*\n\n{digest['text']}\n\n"
+            f"Plattformen: {', '.join(digest['platforms'])}"
+        )
+    }
+    r = _teams_session.post(os.getenv("TEAMS_WEBHOOK"), json=payload, timeout=10)
+    if r.status_code not in (200, 201):
+        raise RuntimeError(f"Teams-Webhook {r.status_code}: {r.text[:200]}")
+
+
+# ============================================================
+# 🚚 DISPATCH
+# ============================================================
+
+def backoff_seconds(attempts: int) -> float:
+    """
+    Exponentiell (base * 2^(n-1), gedeckelt) mit Jitter (50–100 %).
+    """
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _ready(items: List[Dict[str, Any]], now: float) -> bool:
+    # Retries warten nicht erneut auf das Sammelfenster
+    if len(items) >= DIGEST_MAX or any(i["attempts"] for i in items):
+        return True
+    return min(i["created_ts"] for i in items) + DIGEST_SECONDS <= now
+
+
+def _lease_batches(now: float) -> Dict[str, List[Dict[str, Any]]]:
+    if not any(
+        i["state"] == "pending" and i["next_attempt_ts"] <= now for i in _read()["items"].values()
+    ):
+        return {}  # nichts fällig → kein Lock, kein Write
+
+    with _writing() as data:
+        by_client: Dict[str, List[Dict[str, Any]]] = {}
+        for item in data["items"].values():
+            if item["state"] == "pending" and item["next_attempt_ts"] <= now:
+                by_client.setdefault(item["client"], []).append(item)
+
+        batches = {}
+        for client, items in by_client.items():
+            if not _ready(items, now):
+                continue
+            items = sorted(items, key=lambda i: i["created_ts"])[:DIGEST_MAX]
+            for item in items:
+                item["next_attempt_ts"] = now + LEASE_SECONDS
+            batches[client] = [dict(i) for i in items]
+        return batches
+
+
+def dispatch(now: Optional[float] = None) -> Dict[str, int]:
+    """
+    Ein Lauf: fällige Digests senden. -> {"sent", "failed", "dead"}
+    """
+    now = time.time() if now is None else now
+    batches = _lease_batches(now)
+    if not batches:
+        return {"sent": 0, "failed": 0, "dead": 0}
+
+    active = channels()
+    mailer: Dict[str, Any] = {}
+    delivered: Dict[str, List[str]] = {}
+    errors: Dict[str, str] = {}
+
+    try:
+        for client, items in batches.items():
+            for channel in active:
+                todo = [i for i in items if channel not in (i.get("sent") or [])]
+                if not todo:
+                    continue
+                digest = _digest(client, todo)
+                try:
+                    if channel == "email":
+                        _send_email(mailer, digest)
+                    else:
+                        _send_teams(digest)
+                except Exception as e:
+                    errors[client] = f"{channel}: {e}"
+                    logger.error(f"[NotifyOutbox] ❌ {channel} an {client} fehlgeschlagen: {e}")
+                    continue
+                for i in todo:
+                    delivered.setdefault(i["id"], []).append(channel)
+    finally:
+        _close_mailer(mailer)
+
+    sent = failed = dead = 0
+    with _writing() as data:
+        for client, items in batches.items():
+            for leased in items:
+                item = data["items"].get(leased["id"])
+                if item is None:
+                    continue
+                item["sent"] = list(dict.fromkeys((item.get("sent") or []) + delivered.get(item["id"], [])))
+                if all(c in item["sent"] for c in active):
+                    data["items"].pop(item["id"])
+                    continue
+
+                item["attempts"] += 1
+                item["last_error"] = errors.get(client, "")[:500]
+                item["updated_at"] = _utcnow_iso()
+                if item["attempts"] >= MAX_ATTEMPTS:
+                    item["state"] = "dead"
+                    dead += 1
+                else:
+                    item["next_attempt_ts"] = now + backoff_seconds(item["attempts"])
+
+            if client in errors:
+                failed += 1
+            else:
+                sent += 1
+
+    if sent:
+        logger.info(f"[NotifyOutbox] 📬 {sent} Digest(s) zugestellt")
+    return {"sent": sent, "failed": failed, "dead": dead}
@@ -0,0 +1,16 @@
+"""
+📁 Gemeinsame Pfade (backend/clients/...)
+"""
+
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]  # backend/
+CLIENTS_DIR = BASE_DIR / "clients"
+
+
+def client_dir(client: str) -> Path:
+    return CLIENTS_DIR / client
+
+
+def posting_queue_dir(client: str) -> Path:
+    return CLIENTS_DIR / client / "output" / "posting_queue"
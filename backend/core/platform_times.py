@@ -1,7 +1,20 @@
 from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
 from core.platforms import PLATFORMS
+from core.post_model import iso_to_ts
+
+# Plattform gilt als erledigt (kein weiterer Job nötig)
+DONE_PLATFORM_STATUSES = ("posted", "manual")
+
+# fehlgeschlagene Plattformen steuert die Retry-Queue (core/publish_queue.py)
+QUEUED_RESULT_STATUSES = ("retrying", "error")
+
 
 def build_platform_times(now: datetime | None = None) -> dict:
+    """
+    now = Basiszeit (i.d.R. publish_at des Posts), None → jetzt.
+    """
     if now is None:
         now = datetime.now(timezone.utc)
 
@@ -15,3 +28,91 @@ def build_platform_times(now: datetime | None = None) -> dict:
             times[platform] = (now + timedelta(minutes=delay)).isoformat()
 
     return times
+
+
+# ============================================================
+# 🕒 PRO-PLATTFORM-JOBS (Scheduler + Due-Index)
+# ============================================================
+
+def is_manual_platform(platform: str) -> bool:
+    return bool(PLATFORMS.get(platform, {}).get("manual", False))
+
+
+def post_platforms(post: Dict[str, Any]) -> List[str]:
+    """
+    Prefer explicit 'platforms' list.
+    Else allow comma-separated 'platform'.
+    Else default to instagram/facebook/linkedin if results exist, otherwise instagram.
+    """
+    if isinstance(post.get("platforms"), list) and post["platforms"]:
+        return [str(p).strip().lower() for p in post["platforms"] if str(p).strip()]
+
+    if isinstance(post.get("platform"), str) and post["platform"].strip():
+        return [p.strip().lower() for p in post["platform"].split(",") if p.strip()]
+
+    # fallback: if results already contain platforms, use those
+    if isinstance(post.get("results"), dict) and post["results"]:
+        keys = [str(k).strip().lower() for k in post["results"].keys()]
+        keys = [k for k in keys if k]
+        if keys:
+            return keys
+
+    return ["instagram"]
+
+
+def _result_status(post: Dict[str, Any], platform: str) -> str:
+    return str(((post.get("results") or {}).get(platform) or {}).get("status") or "")
+
+
+def platform_done(post: Dict[str, Any], platform: str) -> bool:
+    if (post.get("platform_status") or {}).get(platform) in DONE_PLATFORM_STATUSES:
+        return True
+    return _result_status(post, platform) == "ok"
+
+
+def pending_platforms(post: Dict[str, Any]) -> List[str]:
+    return [pf for pf in post_platforms(post) if not platform_done(post, pf)]
+
+
+def scheduled_platforms(post: Dict[str, Any]) -> List[str]:
+    """
+    Offene Plattformen, die nach platform_times laufen (nicht in der Retry-Queue).
+    """
+    return [
+        pf for pf in pending_platforms(post)
+        if _result_status(post, pf) not in QUEUED_RESULT_STATUSES
+    ]
+
+
+def platform_due_ts(post: Dict[str, Any], platform: str) -> Optional[float]:
+    """
+    Fälligkeit einer Plattform: platform_times[pf], nie vor publish_at
+    (ältere Posts haben Zeiten relativ zur Freigabe statt zu publish_at).
+    Manuelle Plattformen → publish_at (dann "manual required").
+    """
+    base = iso_to_ts(post.get("publish_at"))
+    if is_manual_platform(platform):
+        return base
+
+    ts = iso_to_ts((post.get("platform_times") or {}).get(platform))
+    if ts is None:
+        return base
+    return ts if base is None else max(ts, base)
+
+
+def due_platforms(post: Dict[str, Any], now_ts: float) -> List[str]:
+    out = []
+    for pf in scheduled_platforms(post):
+        ts = platform_due_ts(post, pf)
+        if ts is not None and ts <= now_ts:
+            out.append(pf)
+    return out
+
+
+def next_platform_due_ts(post: Dict[str, Any]) -> Optional[float]:
+    """
+    Frühester Termin einer noch offenen Plattform (None = nichts offen / kein Termin).
+    """
+    times = [platform_due_ts(post, pf) for pf in scheduled_platforms(post)]
+    times = [t for t in times if t is not None]
+    return min(times) if times else None
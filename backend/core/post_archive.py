@@ -0,0 +1,185 @@
+"""
+🧊 PostStore – Cold Archive (posted / published)
+-----------------------------------------------
+- Terminal-Posts wandern aus dem Hot-Store in
+  clients/<client>/state/archive/<YYYY-MM>.ndjson.gz (append-only)
+- archive/index.json: { post_id: segment } für Einzel-Lookups
+- Backend-neutral, kennt post_store NICHT (Fall-Through dort)
+- Job: scheduler/archive_worker.py
+"""
+
+import gzip
+import json
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from core.fs_utils import atomic_write_text, file_lock
+from core.post_model import parse_iso_utc
+
+CLIENTS_DIR = Path(__file__).resolve().parents[1] / "clients"  # backend/clients
+ARCHIVE_DIR = "archive"
+INDEX_FILE = "index.json"
+
+# "scheduled_manual" ist NICHT terminal (manuelle Plattform offen); der
+# manuelle Abschluss (finalize_post_if_done / tools/finalize_post) setzt
+# "posted" + Zeitstempel → ab dann archivierbar
+TERMINAL_STATUSES = {"posted", "published"}
+
+_index_lock = threading.Lock()
+_index_cache: Dict[str, Dict[str, Any]] = {}
+
+
+def archive_dir(client: str) -> Path:
+    return CLIENTS_DIR / client / "state" / ARCHIVE_DIR
+
+
+def archived_at(post: Dict[str, Any]):
+    """
+    Zeitpunkt, ab dem ein Post "terminal" ist (posted_at / published_at).
+    """
+    return parse_iso_utc(post.get("posted_at")) or parse_iso_utc(post.get("published_at"))
+
+
+def is_terminal(post: Dict[str, Any]) -> bool:
+    return str(post.get("status") or "").lower().strip() in TERMINAL_STATUSES
+
+
+# ============================================================
+# 📇 ID INDEX
+# ============================================================
+
+def _load_index(client: str) -> Dict[str, str]:
+    path = archive_dir(client) / INDEX_FILE
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return {}
+    sig = (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    with _index_lock:
+        cached = _index_cache.get(str(path))
+        if cached and cached["sig"] == sig:
+            return cached["index"]
+
+        index = json.loads(path.read_text(encoding="utf-8"))
+        _index_cache[str(path)] = {"sig": sig, "index": index}
+        return index
+
+
+def archived_ids(client: str) -> set:
+    return set(_load_index(client))
+
+
+def archive_clients() -> List[str]:
+    if not CLIENTS_DIR.exists():
+        return []
+    return sorted(
+        p.parent.parent.parent.name
+        for p in CLIENTS_DIR.glob(f"*/state/{ARCHIVE_DIR}/{INDEX_FILE}")
+    )
+
+
+# ============================================================
+# 📦 SEGMENTS (gzip NDJSON, ein Member pro Append)
+# ============================================================
+
+def _segment_name(post: Dict[str, Any]) -> str:
+    dt = archived_at(post)
+    return f"{dt:%Y-%m}.ndjson.gz" if dt else "undated.ndjson.gz"
+
+
+def _read_segment(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Abgebrochener letzter Append (Crash) → bis dahin gelesene Zeilen gelten.
+    """
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    except FileNotFoundError:
+        return
+    except (EOFError, OSError, zlib.error, ValueError):
+        return
+
+
+def archive_posts(client: str, posts: Iterable[Dict[str, Any]]) -> int:
+    """
+    Hängt Posts an die Monats-Segmente an und aktualisiert den Index.
+    Erst danach darf der Hot-Store die Posts entfernen.
+    """
+    by_segment: Dict[str, List[Dict[str, Any]]] = {}
+    for p in posts:
+        if p.get("id"):
+            by_segment.setdefault(_segment_name(p), []).append(p)
+    if not by_segment:
+        return 0
+
+    base = archive_dir(client)
+    base.mkdir(parents=True, exist_ok=True)
+
+    count = 0
+    with file_lock(base / ".lock"):
+        index = dict(_load_index(client))
+
+        for segment, seg_posts in sorted(by_segment.items()):
+            lines = "".join(json.dumps(p, ensure_ascii=False) + "\n" for p in seg_posts)
+            with open(base / segment, "ab") as raw:
+                with gzip.GzipFile(fileobj=raw, mode="ab") as gz:
+                    gz.write(lines.encode("utf-8"))
+                raw.flush()
+                os.fsync(raw.fileno())
+
+            for p in seg_posts:
+                index[p["id"]] = segment
+            count += len(seg_posts)
+
+        atomic_write_text(base / INDEX_FILE, json.dumps(index, ensure_ascii=False))
+    return count
+
+
+# ============================================================
+# 🔍 READ
+# ============================================================
+
+def get_archived_post(post_id: str, client: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    clients = [client] if client else archive_clients()
+
+    for c in clients:
+        segment = _load_index(c).get(post_id)
+        if not segment:
+            continue
+
+        found = None
+        for p in _read_segment(archive_dir(c) / segment):
+            if p.get("id") == post_id:
+                found = p  # letzter Eintrag gewinnt (erneut archiviert)
+        if found is not None:
+            return found
+    return None
+
+
+def iter_archived_posts(client: str, since=None) -> Iterator[Dict[str, Any]]:
+    """
+    Alle archivierten Posts eines Clients (pro id der neueste Eintrag).
+    since (datetime) → nur Segmente ab diesem Monat.
+    """
+    base = archive_dir(client)
+    index = _load_index(client)
+    if not index:
+        return
+
+    first = f"{since:%Y-%m}" if since else None
+    for segment in sorted(set(index.values())):
+        if first and segment[:7] < first:
+            continue
+
+        latest: Dict[str, Dict[str, Any]] = {}
+        for p in _read_segment(base / segment):
+            if index.get(p.get("id")) == segment:
+                latest[p["id"]] = p
+        yield from latest.values()
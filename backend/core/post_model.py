@@ -0,0 +1,316 @@
+"""
+🧱 PostStore – gemeinsame Post-Helfer
+------------------------------------
+- Backend-neutral (JSON + SQLite nutzen dieselben Regeln)
+- Normalisierung, Patch-Merge, Stub für manuelle Posts
+- Plattform-Status (manual required / Abschluss) für beide Backends
+- Robustes ISO-Parsing für publish_at
+- Unit-of-Work (PostTransaction): sammelt add/update/update_status,
+  das Backend schreibt alles in EINEM Commit
+- Lease-Regeln (claim / release / Ablauf) für mehrere Scheduler-Worker
+"""
+
+import copy
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+VALID_IMAGE_CATEGORIES = {
+    "finished_work",
+    "work_action",
+    "process_detail",
+    "team_vehicle",
+    "empty_space",
+}
+
+
+def normalize_post(post: Dict[str, Any]) -> Dict[str, Any]:
+    cat = (
+        post.get("category")
+        or post.get("image_context")
+        or post.get("image_category")
+    )
+
+    if cat not in VALID_IMAGE_CATEGORIES:
+        cat = "finished_work"
+
+    post["category"] = cat
+    post.setdefault("results", {})
+    return post
+
+
+def new_manual_post(post_id: str, client: str) -> Dict[str, Any]:
+    return {
+        "id": post_id,
+        "client": client,
+        "type": "manual",
+        "category": "finished_work",
+        "content_category": "manual",
+        "preview": "",
+        "caption": "",
+        "results": {},
+        "status": "preview",
+        "created_at": datetime.utcnow().isoformat(),
+    }
+
+
+def apply_patch(post: Dict[str, Any], fields: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge-Regeln von update_post:
+    - None-Werte werden ignoriert
+    - results wird pro Plattform gemerged, nicht ersetzt
+    """
+    for k, v in fields.items():
+        if v is None:
+            continue
+
+        if k == "results" and isinstance(v, dict):
+            post.setdefault("results", {})
+            for pf, pf_data in v.items():
+                post["results"].setdefault(pf, {})
+                post["results"][pf].update(pf_data)
+        else:
+            post[k] = v
+
+    return normalize_post(post)
+
+
+def apply_status(post: Dict[str, Any], status: str) -> Dict[str, Any]:
+    post["status"] = status
+    if status == "posted":
+        post["posted_at"] = datetime.utcnow().isoformat()
+    return post
+
+
+def apply_manual_required(post: Dict[str, Any], platform: str) -> Dict[str, Any]:
+    post.setdefault("platform_status", {})
+    post["platform_status"][platform] = "manual"
+    post["status"] = "scheduled_manual"
+    return post
+
+
+def apply_finalize_if_done(post: Dict[str, Any], status: str = "posted") -> bool:
+    """
+    Alle Plattformen "posted" → Endstatus setzen. -> True, wenn abgeschlossen.
+    """
+    platform_status = post.get("platform_status") or {}
+    if platform_status and all(v == "posted" for v in platform_status.values()):
+        post["status"] = status
+        post["published_at"] = datetime.utcnow().isoformat()
+        return True
+    return False
+
+
+def parse_iso_utc(value: Optional[str]) -> Optional[datetime]:
+    """
+    Robust ISO parse:
+    - akzeptiert "...Z" oder "+00:00"
+    - naive Werte werden als UTC behandelt
+    """
+    if not value or not isinstance(value, str):
+        return None
+
+    v = value.strip()
+    try:
+        if v.endswith("Z"):
+            v = v[:-1] + "+00:00"
+        dt = datetime.fromisoformat(v)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(timezone.utc)
+    except Exception:
+        return None
+
+
+def iso_to_ts(value: Optional[str]) -> Optional[float]:
+    dt = parse_iso_utc(value)
+    return dt.timestamp() if dt else None
+
+
+def as_utc_ts(now=None) -> float:
+    """
+    datetime (naiv = UTC), Unix-Timestamp oder None (= jetzt) → Timestamp.
+    """
+    if now is None:
+        return datetime.now(timezone.utc).timestamp()
+    if isinstance(now, datetime):
+        if now.tzinfo is None:
+            now = now.replace(tzinfo=timezone.utc)
+        return now.timestamp()
+    return float(now)
+
+
+# ============================================================
+# 🔐 LEASE (status "publishing")
+# ============================================================
+# post["lease"] = {owner, expires_ts, expires_at, prev_status}
+# Freigegeben = {} (update_post ignoriert None → Key bleibt, aber leer).
+
+LEASE_STATUS = "publishing"
+CLAIMABLE_STATUSES = ("scheduled", "retrying", "failed")
+
+
+def lease_expires_ts(post: Dict[str, Any]) -> Optional[float]:
+    """
+    Ablaufzeit eines aktiven Leases (None = kein Lease).
+    """
+    if str(post.get("status") or "").lower() != LEASE_STATUS:
+        return None
+    return float((post.get("lease") or {}).get("expires_ts") or 0)
+
+
+def lease_claimable(post: Dict[str, Any], now_ts: float, statuses=CLAIMABLE_STATUSES) -> bool:
+    expires = lease_expires_ts(post)
+    if expires is not None:
+        return expires <= now_ts  # abgelaufen → übernehmbar
+    return str(post.get("status") or "").lower() in statuses
+
+
+def apply_lease(post: Dict[str, Any], owner: str, expires_ts: float) -> Dict[str, Any]:
+    previous = post.get("lease") or {}
+    prev_status = (
+        previous.get("prev_status", "scheduled")
+        if lease_expires_ts(post) is not None
+        else post.get("status")
+    )
+    post["status"] = LEASE_STATUS
+    post["lease"] = {
+        "owner": owner,
+        "expires_ts": expires_ts,
+        "expires_at": datetime.fromtimestamp(expires_ts, timezone.utc).isoformat(),
+        "prev_status": prev_status,
+    }
+    return post
+
+
+def release_lease(post: Dict[str, Any], owner: Optional[str] = None) -> bool:
+    """
+    Gibt den Lease frei (owner=None → egal wer, z.B. Recovery).
+    Post noch "publishing" → zurück auf den Status vor dem Claim.
+    """
+    lease = post.get("lease") or {}
+    if not lease or (owner is not None and lease.get("owner") != owner):
+        return False
+    if str(post.get("status") or "").lower() == LEASE_STATUS:
+        post["status"] = lease.get("prev_status") or "scheduled"
+    post["lease"] = {}
+    return True
+
+
+# ============================================================
+# 🧾 UNIT OF WORK
+# ============================================================
+# Ein Op ist ein Tupel, das beim Commit gegen den dann aktuellen Stand
+# erneut angewendet wird (Replay). So bleiben Änderungen anderer Writer
+# zwischen Beginn und Commit erhalten.
+#   ("add", post) | ("ensure", post_id, client)
+#   ("update", post_id, fields) | ("status", post_id, status)
+
+Op = Tuple[Any, ...]
+
+
+def op_target(op: Op) -> str:
+    return op[1]["id"] if op[0] == "add" else op[1]
+
+
+def op_client(op: Op) -> Optional[str]:
+    """
+    Client aus dem Op selbst (add/ensure), sonst None.
+    """
+    if op[0] == "add":
+        return op[1].get("client")
+    if op[0] == "ensure":
+        return op[2]
+    return None
+
+
+def apply_op(post: Optional[Dict[str, Any]], op: Op) -> Optional[Dict[str, Any]]:
+    """
+    -> neuer Stand des Posts (None = kein Post / keine Änderung).
+    Mutiert `post` in-place, wenn vorhanden.
+    """
+    kind = op[0]
+
+    if kind == "add":
+        return copy.deepcopy(op[1])
+
+    if kind == "ensure":
+        return post if post is not None else new_manual_post(op[1], op[2])
+
+    if kind == "update":
+        if post is None:
+            raise KeyError(f"Post nicht gefunden: {op[1]}")
+        return apply_patch(post, copy.deepcopy(op[2]))
+
+    if kind == "status":
+        return apply_status(post, op[2]) if post is not None else None
+
+    raise ValueError(f"Unbekannte Operation: {kind}")
+
+
+class PostTransaction:
+    """
+    Sammelt Mutationen; Lesezugriffe innerhalb der Transaktion sehen die
+    eigenen, noch nicht geschriebenen Änderungen (Overlay).
+    """
+
+    def __init__(self, fetch: Callable[..., Optional[Dict[str, Any]]]):
+        # fetch(post_id, client=None) muss eine KOPIE liefern (wird im
+        # Overlay mutiert); client ist nur ein Routing-Hinweis
+        self._fetch = fetch
+        self._overlay: Dict[str, Dict[str, Any]] = {}
+        self.ops: List[Op] = []
+
+    def _current(self, post_id: str, client: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        if post_id in self._overlay:
+            return self._overlay[post_id]
+        return self._fetch(post_id, client)
+
+    def _record(self, op: Op) -> Optional[Dict[str, Any]]:
+        post_id = op_target(op)
+        new = apply_op(self._current(post_id, op_client(op)), op)
+        if new is not None:
+            self._overlay[post_id] = new
+        self.ops.append(op)
+        return copy.deepcopy(new) if new is not None else None
+
+    # ---------- READ ----------
+    def get(self, post_id: str) -> Optional[Dict[str, Any]]:
+        post = self._current(post_id)
+        return copy.deepcopy(post) if post is not None else None
+
+    def overlay(self, posts: List[Dict[str, Any]], client: str) -> List[Dict[str, Any]]:
+        """
+        Legt eigene Änderungen über eine gelesene Client-Liste.
+        """
+        if not self._overlay:
+            return posts
+
+        seen = set()
+        out = []
+        for p in posts:
+            pid = p.get("id")
+            seen.add(pid)
+            out.append(copy.deepcopy(self._overlay[pid]) if pid in self._overlay else p)
+
+        for pid, p in self._overlay.items():
+            if pid not in seen and p.get("client") == client:
+                out.append(copy.deepcopy(p))
+        return out
+
+    # ---------- WRITE ----------
+    def add(self, post: Dict[str, Any]) -> None:
+        if not post.get("id"):
+            raise ValueError("Post requires an id")
+        self._record(("add", copy.deepcopy(post)))
+
+    def ensure(self, post_id: str, client: str) -> Dict[str, Any]:
+        existing = self._current(post_id, client)
+        if existing is not None:
+            return copy.deepcopy(existing)
+        return self._record(("ensure", post_id, client))
+
+    def update(self, post_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        return self._record(("update", post_id, copy.deepcopy(fields)))
+
+    def update_status(self, post_id: str, status: str) -> None:
+        self._record(("status", post_id, status))
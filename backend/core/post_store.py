@@ -1,68 +1,353 @@
+import bisect
+import copy
+import heapq
 import json
+import os
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, timezone
+
+from core.post_model import (
+    VALID_IMAGE_CATEGORIES,
+    PostTransaction,
+    CLAIMABLE_STATUSES,
+    apply_finalize_if_done,
+    apply_lease,
+    apply_manual_required,
+    apply_op,
+    as_utc_ts,
+    iso_to_ts,
+    lease_claimable,
+    lease_expires_ts,
+    op_client,
+    op_target,
+    release_lease,
+)
+from core.post_sync import diff_output_files, apply_output_diff, reset_index
+from core.platform_times import next_platform_due_ts
+from core import post_archive, wakeup
+from core.fs_utils import atomic_write_text, file_lock
+from core.logger import logger
 
 # ============================================================
-# 🔒 STORE PATH
+# 🔒 STORE PATH (pro Client ein Shard)
 # ============================================================
+# clients/<client>/state/posts.json – Lesen/Schreiben eines Clients
+# parst und schreibt NUR dessen Posts. runtime/posts.json ist der alte
+# globale Store: solange ein Client noch keinen Shard hat, werden seine
+# Posts von dort gelesen und beim ersten Save in den Shard übernommen.
+# Komplett-Split: python -m tools.migrate_posts_to_shards
 
 BASE_DIR = Path(__file__).resolve().parents[2]  # IntelliAgent/
-STORE_PATH = BASE_DIR / "backend" / "runtime" / "posts.json"
-STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
+CLIENTS_DIR = BASE_DIR / "backend" / "clients"
+LEGACY_STORE_PATH = BASE_DIR / "backend" / "runtime" / "posts.json"
+SHARD_DIR = "state"
+SHARD_FILE = "posts.json"
+
+# Write-Behind: Commits, die innerhalb dieses Fensters eintreffen, werden
+# zu EINEM Save zusammengefasst (0 = nur bereits wartende Commits bündeln)
+COALESCE_MS = int(os.getenv("POST_STORE_COALESCE_MS", "0"))
+
+
+class PostStoreError(RuntimeError):
+    """posts.json ist nicht lesbar – NICHT als leerer Store behandeln."""
+
+
+def shard_path(client: str) -> Path:
+    if not client or "/" in client or "\\" in client or client.startswith("."):
+        raise ValueError(f"Ungültiger Client für PostStore: {client!r}")
+    return CLIENTS_DIR / client / SHARD_DIR / SHARD_FILE
+
+
+def shard_clients() -> List[str]:
+    """
+    Alle Clients mit Shard oder noch nicht migrierten Alt-Posts.
+    """
+    clients = set(_legacy_by_client())
+    if CLIENTS_DIR.exists():
+        for f in CLIENTS_DIR.glob(f"*/{SHARD_DIR}/{SHARD_FILE}"):
+            clients.add(f.parent.parent.name)
+    return sorted(clients)
 
-VALID_IMAGE_CATEGORIES = {
-    "finished_work",
-    "work_action",
-    "process_detail",
-    "team_vehicle",
-    "empty_space",
-}
 
 # ============================================================
-# 🧠 INIT
+# ⚡ IN-PROCESS CACHE (pro Shard: geparster Stand + Index by id)
 # ============================================================
+# Invalidierung über Datei-Signatur (mtime_ns, size, inode): Änderungen
+# anderer Prozesse werden beim nächsten Zugriff erkannt. Gecachte Posts
+# verlassen das Modul nur als Kopie.
+
+_shards_lock = threading.Lock()
+_shards: Dict[str, Dict[str, Any]] = {}
+# post_id → client (Routing für Zugriffe nur per id)
+_routes: Dict[str, str] = {}
+_legacy: Dict[str, Any] = {"sig": None, "by_client": {}}
+_stats = {"hits": 0, "misses": 0, "version": 0, "saves": 0, "conflicts": 0}
+
+
+def _file_sig(path: Path):
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _shard(client: str) -> Dict[str, Any]:
+    path = shard_path(client)
+    key = str(path)
+    with _shards_lock:
+        shard = _shards.get(key)
+        if shard is None:
+            shard = {
+                "client": client,
+                "path": path,
+                "lock": threading.RLock(),
+                "sig": None,
+                "data": None,
+                "by_id": {},
+                # Due-Index: sortiert (due_ts, post_id), nur "scheduled";
+                # due_ts = nächste offene Plattform laut platform_times
+                "due": [],
+                "due_keys": {},
+                # aktive Leases: post_id → expires_ts (status "publishing")
+                "leases": {},
+                # Group Commit
+                "leader": threading.Lock(),
+                "pending": [],
+            }
+            _shards[key] = shard
+        return shard
+
+
+def _due_entry(post: Dict[str, Any]):
+    if str(post.get("status") or "").lower().strip() != "scheduled":
+        return None
+    # nächste offene Plattform (platform_times), sonst publish_at
+    ts = next_platform_due_ts(post)
+    if ts is None:
+        ts = iso_to_ts(post.get("publish_at"))
+    # scheduled ohne (gültiges) publish_at → nie fällig
+    return (ts, post.get("id")) if ts is not None else None
+
+
+def _reindex(shard: Dict[str, Any], data: Dict[str, Any]) -> None:
+    by_id = {p.get("id"): p for p in data["posts"]}
+    due = sorted(e for e in map(_due_entry, data["posts"]) if e)
+
+    shard["data"] = data
+    shard["by_id"] = by_id
+    shard["due"] = due
+    shard["due_keys"] = {e[1]: e for e in due}
+    shard["leases"] = {
+        pid: ts for pid, ts in ((pid, lease_expires_ts(p)) for pid, p in by_id.items())
+        if ts is not None
+    }
+    for post_id in by_id:
+        _routes[post_id] = shard["client"]
+    _stats["version"] += 1
+
+
+def _reindex_posts(shard: Dict[str, Any], posts: List[Dict[str, Any]]) -> None:
+    """
+    Inkrementell: nur die geänderten Posts im by_id- und Due-Index nachziehen.
+    """
+    due, due_keys = shard["due"], shard["due_keys"]
+    for p in posts:
+        post_id = p.get("id")
+        shard["by_id"][post_id] = p
+        _routes[post_id] = shard["client"]
+
+        old = due_keys.pop(post_id, None)
+        if old is not None:
+            i = bisect.bisect_left(due, old)
+            if i < len(due) and due[i] == old:
+                del due[i]
+
+        new = _due_entry(p)
+        if new is not None:
+            bisect.insort(due, new)
+            due_keys[post_id] = new
+
+        lease_ts = lease_expires_ts(p)
+        if lease_ts is None:
+            shard["leases"].pop(post_id, None)
+        else:
+            shard["leases"][post_id] = lease_ts
+    _stats["version"] += 1
+
+
+def _invalidate(shard: Dict[str, Any]) -> None:
+    with shard["lock"]:
+        shard["sig"] = None
+        shard["data"] = None
+
+
+def cache_stats() -> Dict[str, Any]:
+    with _shards_lock:
+        shards = list(_shards.values())
+    posts = sum(len(s["data"]["posts"]) for s in shards if s["data"])
+    return {**_stats, "posts": posts, "shards": len(shards)}
+
+
+def store_version() -> int:
+    """
+    Steigt bei jedem eigenen Save und jeder erkannten Fremdänderung
+    (prüft die Signatur aller Shards).
+    """
+    for client in shard_clients():
+        _load(_shard(client))
+    return _stats["version"]
 
-if not STORE_PATH.exists():
-    STORE_PATH.write_text(
-        json.dumps({"posts": []}, indent=2, ensure_ascii=False),
-        encoding="utf-8",
-    )
 
 # ============================================================
 # 📦 LOW LEVEL IO
 # ============================================================
 
-def _load() -> Dict[str, Any]:
-    try:
-        data = json.loads(STORE_PATH.read_text(encoding="utf-8"))
+def _parse_store(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Fehlende Datei → None. Kaputter Inhalt → EIN Retry (z.B. ein
+    Alt-Writer ohne atomic write), danach PostStoreError statt leerem Store:
+    ein leerer Store würde beim nächsten Sync/Save echte Posts löschen.
+    """
+    for attempt in range(2):
+        try:
+            raw = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            data = None
+
         if isinstance(data, dict) and isinstance(data.get("posts"), list):
+            data.setdefault("version", 0)
             return data
-    except Exception:
-        pass
-    return {"posts": []}
 
+        if attempt == 0:
+            time.sleep(0.05)
+
+    logger.error(f"[PostStore] ❌ posts.json unlesbar: {path}")
+    raise PostStoreError(f"posts.json unlesbar: {path}")
+
+
+def _legacy_by_client() -> Dict[str, List[Dict[str, Any]]]:
+    sig = _file_sig(LEGACY_STORE_PATH)
+    if sig is None:
+        return {}
+    with _shards_lock:
+        if _legacy["sig"] != sig:
+            data = _parse_store(LEGACY_STORE_PATH) or {"posts": []}
+            by_client: Dict[str, List[Dict[str, Any]]] = {}
+            for p in data["posts"]:
+                if isinstance(p, dict) and p.get("id") and p.get("client"):
+                    by_client.setdefault(p["client"], []).append(p)
+            _legacy["by_client"] = by_client
+            _legacy["sig"] = sig
+        return _legacy["by_client"]
+
+
+def _read_shard(shard: Dict[str, Any]) -> Dict[str, Any]:
+    data = _parse_store(shard["path"])
+    if data is not None:
+        return data
+    # Noch kein Shard → Alt-Posts des Clients übernehmen (Lazy-Migration)
+    legacy = _legacy_by_client().get(shard["client"], [])
+    return {"version": 0, "posts": copy.deepcopy(legacy)}
+
+
+def _load(shard: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Gecachter Shard – NUR innerhalb des Moduls verwenden und nicht ohne
+    anschließendes _save() mutieren (siehe _writing()).
+    """
+    with shard["lock"]:
+        sig = _file_sig(shard["path"])
+        if shard["data"] is not None and shard["sig"] == sig:
+            _stats["hits"] += 1
+            return shard["data"]
+
+        _stats["misses"] += 1
+        data = _read_shard(shard)
+        _reindex(shard, data)
+        shard["sig"] = sig
+        return data
+
+
+def _save(shard: Dict[str, Any], data: Dict[str, Any], changed: Optional[List[Dict[str, Any]]] = None):
+    """
+    Nur unter _writing() aufrufen (Datei-Lock gehalten).
+    changed = geänderte/neue Posts → Index inkrementell, sonst komplett neu.
+    """
+    with shard["lock"]:
+        head = shard["due"][0] if shard["due"] else None
+
+        data["version"] = int(data.get("version") or 0) + 1
+        atomic_write_text(
+            shard["path"],
+            json.dumps(data, indent=2, ensure_ascii=False),
+        )
+        if changed is None:
+            _reindex(shard, data)
+        else:
+            _reindex_posts(shard, changed)
+        shard["sig"] = _file_sig(shard["path"])
+        _stats["saves"] += 1
+
+        # nächster Termin hat sich geändert → Scheduler neu planen lassen
+        if (shard["due"][0] if shard["due"] else None) != head:
+            wakeup.notify()
+
+
+def _lock_path(shard: Dict[str, Any]) -> Path:
+    path = shard["path"]
+    return path.with_name(path.name + ".lock")
+
+
+@contextmanager
+def _writing(shard: Dict[str, Any]):
+    """
+    Read-Modify-Write unter exklusivem Datei-Lock (prozessübergreifend):
+    _load() liest dabei den aktuellen Stand anderer Prozesse nach.
+    Bei Fehlern vor dem _save() wird der Cache verworfen, damit keine
+    halb geänderten Daten gelesen werden.
+    Lock-Reihenfolge: Datei-Lock → Shard-Lock (Leser nehmen nur den Shard-Lock).
+    """
+    with file_lock(_lock_path(shard)), shard["lock"]:
+        data = _load(shard)
+        try:
+            yield data
+        except BaseException:
+            _invalidate(shard)
+            raise
 
-def _save(data: Dict[str, Any]):
-    STORE_PATH.write_text(
-        json.dumps(data, indent=2, ensure_ascii=False),
-        encoding="utf-8",
-    )
 
+# ============================================================
+# 🧭 ROUTING (post_id → Client-Shard)
+# ============================================================
 
-def _normalize_post(post: Dict[str, Any]) -> Dict[str, Any]:
-    cat = (
-        post.get("category")
-        or post.get("image_context")
-        or post.get("image_category")
-    )
-
-    if cat not in VALID_IMAGE_CATEGORIES:
-        cat = "finished_work"
-
-    post["category"] = cat
-    post.setdefault("results", {})
-    return post
+def _client_for(post_id: str) -> Optional[str]:
+    """
+    Erst der gemerkte Shard, sonst alle Shards durchsuchen (jeder Shard
+    wird dabei höchstens einmal geparst, danach nur noch stat()).
+    """
+    client = _routes.get(post_id)
+    if client is not None:
+        shard = _shard(client)
+        _load(shard)
+        if post_id in shard["by_id"]:
+            return client
+
+    for client in shard_clients():
+        shard = _shard(client)
+        _load(shard)
+        if post_id in shard["by_id"]:
+            return client
+    return None
 
 
 # ============================================================
@@ -70,136 +355,409 @@ def _normalize_post(post: Dict[str, Any]) -> Dict[str, Any]:
 # ============================================================
 
 def _sync_filesystem(client: str):
-    data = _load()
-    posts = data["posts"]
-
-    preview_dir = (
-        BASE_DIR / "backend" / "clients" / client / "output" / "preview"
-    )
-    approved_dir = (
-        BASE_DIR / "backend" / "clients" / client / "output" / "approved" / "used"
-    )
-
-    def split_variant(stem: str):
-        if stem.endswith("_facebook"):
-            return stem[:-9], "facebook"
-        if stem.endswith("_linkedin"):
-            return stem[:-9], "linkedin"
-        return stem, "instagram"
-
-    files_by_id: Dict[str, Dict[str, str]] = {}
-
-    def collect(dir_path: Path, folder: str):
-        if not dir_path.exists():
-            return
-        for f in dir_path.glob("*.png"):
-            base_id, platform = split_variant(f.stem)
-            files_by_id.setdefault(base_id, {})
-            files_by_id[base_id][platform] = (
-                f"/static/{client}/output/{folder}/{f.name}"
+    # ⚡ Ordner unverändert → kein Load, kein Save
+    diff = diff_output_files(client)
+    if diff is None:
+        return
+
+    shard = _shard(client)
+    try:
+        with _writing(shard) as data:
+            data["posts"], changed = apply_output_diff(
+                client, data["posts"], diff, post_archive.archived_ids(client)
             )
+            if changed:
+                _save(shard, data)
+    except Exception:
+        reset_index(client)
+        raise
 
-    # PRIORITÄT: preview > approved
-    collect(approved_dir, "approved/used")
-    collect(preview_dir, "preview")
 
-    posts_by_id = {
-        p["id"]: p for p in posts if p.get("client") == client
-    }
+# ============================================================
+# 🧾 TRANSACTION (Unit of Work)
+# ============================================================
+#   with post_store.transaction() as tx:
+#       tx.add(post) / tx.update(id, fields) / tx.update_status(id, status)
+# → EIN Save pro betroffenem Client-Shard beim Verlassen des Blocks.
+# Public-Funktionen, die innerhalb eines Blocks (gleicher Thread)
+# aufgerufen werden, hängen sich an die laufende Transaktion an.
+# Exception im Block → nichts wird geschrieben. Über mehrere Clients
+# hinweg ist der Commit NICHT atomar (ein Shard nach dem anderen).
+
+_tx_local = threading.local()
+
+
+def _current_tx() -> Optional[PostTransaction]:
+    return getattr(_tx_local, "tx", None)
+
+
+def _lookup(client: str, post_id: str) -> Optional[Dict[str, Any]]:
+    shard = _shard(client)
+    with shard["lock"]:
+        data = _load(shard)
+        post = shard["by_id"].get(post_id)
+        if post is None:
+            return None
+
+        # Optimistischer Check: Shard-Version beim ersten Lesen merken
+        versions = getattr(_tx_local, "versions", None)
+        if versions is not None:
+            versions.setdefault(client, data.get("version"))
+        return copy.deepcopy(post)
+
+
+def _fetch_copy(post_id: str, client: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    # client = Routing-Hinweis des Aufrufers (add/ensure)
+    if client:
+        return _lookup(client, post_id)
+
+    routed = _routes.get(post_id)
+    if routed is not None:
+        post = _lookup(routed, post_id)
+        if post is not None:
+            return post
+
+    client = _client_for(post_id)
+    return _lookup(client, post_id) if client else None
+
+
+# ---------- Group Commit (Write-Behind) ----------
+# Jeder Commit legt pro Shard einen Slot ab. Wer den Leader-Lock des
+# Shards bekommt, schreibt ALLE bis dahin wartenden Slots mit einem Save;
+# die anderen Threads finden ihren Slot danach erledigt vor. Schlägt ein
+# Slot fehl (z.B. KeyError), betrifft das nur diesen Slot.
+
+def _stage(slot, by_id, staged) -> None:
+    """
+    Wendet die Ops eines Slots auf Kopien an; erst wenn alle Ops klappen,
+    wird das Ergebnis in `staged` übernommen.
+    """
+    local: Dict[str, Dict[str, Any]] = {}
+    for op in slot["ops"]:
+        post_id = op_target(op)
+        if post_id in local:
+            current = local[post_id]
+        else:
+            base = staged.get(post_id, by_id.get(post_id))
+            current = copy.deepcopy(base) if base is not None else None
+
+        new = apply_op(current, op)
+        if new is not None:
+            local[post_id] = new
+    staged.update(local)
+
+
+def _flush(shard, batch) -> None:
+    with _writing(shard) as data:
+        if any(
+            s["base_version"] is not None and s["base_version"] != data.get("version")
+            for s in batch
+        ):
+            # jemand hat seit Beginn der Transaktion geschrieben
+            # → Ops laufen per Replay gegen den aktuellen Stand
+            _stats["conflicts"] += 1
+
+        staged: Dict[str, Dict[str, Any]] = {}
+        for slot in batch:
+            try:
+                _stage(slot, shard["by_id"], staged)
+            except Exception as e:
+                slot["error"] = e
+
+        if not staged:
+            return
 
-    touched_ids = set()
+        posts = data["posts"]
+        index = {p.get("id"): i for i, p in enumerate(posts)}
+        for post_id, new in staged.items():
+            if post_id in index:
+                posts[index[post_id]] = new
+            else:
+                posts.append(new)
+        _save(shard, data, list(staged.values()))
+
+
+def _commit_shard(shard, ops, base_version: Optional[int]) -> None:
+    slot = {"ops": ops, "base_version": base_version, "done": False, "error": None}
+    with shard["lock"]:
+        shard["pending"].append(slot)
+
+    with shard["leader"]:
+        if not slot["done"]:
+            if COALESCE_MS > 0:
+                time.sleep(COALESCE_MS / 1000)
+
+            with shard["lock"]:
+                batch = list(shard["pending"])
+                shard["pending"].clear()
+
+            try:
+                _flush(shard, batch)
+            except BaseException as e:
+                for s in batch:
+                    s["error"] = s["error"] or e
+                raise
+            finally:
+                for s in batch:
+                    s["done"] = True
+
+    if slot["error"] is not None:
+        raise slot["error"]
+
+
+def _route_ops(ops) -> Dict[str, List[Any]]:
+    """
+    Ops → { client: [ops] } (Reihenfolge bleibt erhalten). Posts, die in
+    derselben Transaktion angelegt werden, sind direkt routbar.
+    """
+    routed: Dict[str, List[Any]] = {}
+    local: Dict[str, str] = {}
+
+    for op in ops:
+        kind, post_id = op[0], op_target(op)
+        if kind in ("add", "ensure"):
+            client = op_client(op)
+            if not client:
+                raise ValueError(f"Post requires a client: {post_id}")
+        else:
+            client = local.get(post_id) or _client_for(post_id)
+            if client is None:
+                if kind == "update":
+                    raise KeyError(f"Post nicht gefunden: {post_id}")
+                continue
+
+        local[post_id] = client
+        routed.setdefault(client, []).append(op)
+    return routed
+
+
+def _commit(ops, base_versions: Optional[Dict[str, Any]] = None) -> None:
+    if not ops:
+        return
+
+    base_versions = base_versions or {}
+    errors = []
+    for client, client_ops in _route_ops(ops).items():
+        try:
+            _commit_shard(_shard(client), client_ops, base_versions.get(client))
+        except Exception as e:
+            errors.append(e)
+    if errors:
+        raise errors[0]
+
+
+@contextmanager
+def transaction():
+    tx = _current_tx()
+    if tx is not None:
+        # verschachtelt → Teil der äußeren Transaktion
+        yield tx
+        return
+
+    tx = PostTransaction(_fetch_copy)
+    _tx_local.tx = tx
+    _tx_local.versions = {}
+    try:
+        yield tx
+    finally:
+        _tx_local.tx = None
+        versions, _tx_local.versions = _tx_local.versions, None
 
-    for post_id, platform_map in files_by_id.items():
-        post = posts_by_id.get(post_id)
+    _commit(tx.ops, versions)
 
-        if not post:
-            post = {
-                "id": post_id,
-                "client": client,
-                "type": "manual",
-                "category": "finished_work",
-                "content_category": "manual",
-                "preview": "",
-                "caption": "",
-                "results": {},
-                "status": "preview",
-                "created_at": datetime.utcnow().isoformat(),
-            }
-            posts.append(post)
 
-        for pf, url in platform_map.items():
-            post.setdefault("results", {})
-            post["results"].setdefault(pf, {})
-            post["results"][pf]["preview_url"] = url
+# ============================================================
+# 🔍 READ
+# ============================================================
+
+def get_post_by_id(post_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Hot-Store zuerst, dann Cold-Archiv (archivierte posted/published Posts).
+    """
+    post = get_hot_post(post_id)
+    return post if post is not None else post_archive.get_archived_post(post_id)
 
-        if "instagram" in platform_map:
-            post["preview"] = platform_map["instagram"]
 
-        touched_ids.add(post_id)
+def get_hot_post(post_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Nur Hot-Store (ohne Archiv) → Prüfung vor update_post().
+    """
+    tx = _current_tx()
+    return tx.get(post_id) if tx is not None else _fetch_copy(post_id)
 
-    # 🔥 CLEANUP:
-    # preview Posts ohne Dateien → löschen
-    cleaned: List[Dict[str, Any]] = []
 
-    for p in posts:
-        if p.get("client") != client:
-            cleaned.append(p)
-            continue
+def ensure_post_exists(post_id: str, client: str) -> Dict[str, Any]:
+    with transaction() as tx:
+        return tx.ensure(post_id, client)
 
-        status = (p.get("status") or "").lower()
 
-        if status in {"approved", "scheduled", "posted", "published"}:
-            cleaned.append(p)
-            continue
+def get_posts(client: str, sync: bool = True) -> List[Dict[str, Any]]:
+    """
+    sync=False → reiner Lesezugriff ohne Filesystem-Abgleich (Scheduler, Analytics).
+    """
+    if sync:
+        _sync_filesystem(client)
+    shard = _shard(client)
+    with shard["lock"]:
+        posts = copy.deepcopy(_load(shard)["posts"])
 
-        if p["id"] in touched_ids:
-            cleaned.append(p)
+    tx = _current_tx()
+    return tx.overlay(posts, client) if tx is not None else posts
 
-    data["posts"] = cleaned
-    _save(data)
+
+def list_clients() -> List[str]:
+    return shard_clients()
+
+
+def get_posts_by_status(client: str, status: str) -> List[Dict[str, Any]]:
+    """
+    Nur lesen, KEIN Filesystem-Sync (Scheduler / Dashboard-Filter).
+    """
+    return [
+        p for p in get_posts(client, sync=False)
+        if (p.get("status") or "").lower() == status
+    ]
 
 
 # ============================================================
-# 🔍 READ
+# ⏰ DUE QUERY (Scheduler)
 # ============================================================
+# Liest nur den Due-Index der Shards: O(k) für k fällige Posts statt
+# jeden Post + publish_at pro Tick. Ohne Transaktions-Overlay.
+
+def get_due_posts(now=None, limit: Optional[int] = None, client: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    status == "scheduled" und publish_at <= now, älteste zuerst.
+    now: datetime (naiv = UTC) oder Unix-Timestamp, Default jetzt.
+    """
+    now_ts = as_utc_ts(now)
+    clients = [client] if client else shard_clients()
+    heads = []
+
+    for c in clients:
+        shard = _shard(c)
+        with shard["lock"]:
+            _load(shard)
+            due = shard["due"]
+            end = bisect.bisect_right(due, (now_ts, "\U0010ffff"))
+            if limit is not None:
+                end = min(end, limit)
+            heads.append([
+                (ts, post_id, copy.deepcopy(shard["by_id"][post_id]))
+                for ts, post_id in due[:end]
+            ])
+
+    merged = heapq.merge(*heads, key=lambda e: e[:2])
+    if limit is not None:
+        merged = (e for _, e in zip(range(limit), merged))
+    return [e[2] for e in merged]
+
+
+def next_due_at(client: Optional[str] = None) -> Optional[datetime]:
+    """
+    Frühestes publish_at aller "scheduled" Posts (UTC) – None, wenn keiner.
+    """
+    clients = [client] if client else shard_clients()
+    first = None
+
+    for c in clients:
+        shard = _shard(c)
+        with shard["lock"]:
+            _load(shard)
+            if shard["due"] and (first is None or shard["due"][0][0] < first):
+                first = shard["due"][0][0]
+
+    return datetime.fromtimestamp(first, timezone.utc) if first is not None else None
 
-def get_post_by_id(post_id: str) -> Optional[Dict[str, Any]]:
-    data = _load()
-    for p in data["posts"]:
-        if p.get("id") == post_id:
-            return p
-    return None
 
+# ============================================================
+# 🔐 LEASES (mehrere Scheduler-Worker)
+# ============================================================
+# claim_posts() ist atomar über Prozesse (Datei-Lock des Shards): nur
+# ein Worker bekommt einen Post. NICHT innerhalb von transaction() nutzen.
+
+def _mutate_posts(client: str, post_ids, fn) -> List[Dict[str, Any]]:
+    """
+    fn(post) → True = geändert. Ein Save pro Shard, liefert Kopien.
+    """
+    shard = _shard(client)
+    changed: List[Dict[str, Any]] = []
+
+    with _writing(shard) as data:
+        index = {p.get("id"): i for i, p in enumerate(data["posts"])}
+        for post_id in post_ids:
+            if post_id not in index:
+                continue
+            post = copy.deepcopy(data["posts"][index[post_id]])
+            if fn(post):
+                data["posts"][index[post_id]] = post
+                changed.append(post)
+        if changed:
+            _save(shard, data, changed)
+
+    return copy.deepcopy(changed)
+
+
+def _group_by_client(post_ids) -> Dict[str, List[str]]:
+    grouped: Dict[str, List[str]] = {}
+    for post_id in post_ids:
+        client = _client_for(post_id)
+        if client is not None:
+            grouped.setdefault(client, []).append(post_id)
+    return grouped
+
+
+def claim_posts(
+    post_ids: List[str],
+    owner: str,
+    ttl_seconds: float,
+    statuses=CLAIMABLE_STATUSES,
+) -> List[Dict[str, Any]]:
+    """
+    -> die Posts, die dieser Owner jetzt hält (status "publishing").
+    Abgelaufene Leases anderer Owner werden dabei übernommen.
+    """
+    now = time.time()
+
+    def claim(post):
+        if not lease_claimable(post, now, statuses):
+            return False
+        apply_lease(post, owner, now + ttl_seconds)
+        return True
 
-def ensure_post_exists(post_id: str, client: str) -> Dict[str, Any]:
-    data = _load()
+    claimed: List[Dict[str, Any]] = []
+    for client, ids in _group_by_client(post_ids).items():
+        claimed += _mutate_posts(client, ids, claim)
+    return claimed
+
+
+def release_post(post_id: str, owner: Optional[str] = None) -> bool:
+    client = _client_for(post_id)
+    if client is None:
+        return False
+    return bool(_mutate_posts(client, [post_id], lambda p: release_lease(p, owner)))
 
-    for p in data["posts"]:
-        if p.get("id") == post_id:
-            return p
-
-    post = {
-        "id": post_id,
-        "client": client,
-        "type": "manual",
-        "category": "finished_work",
-        "content_category": "manual",
-        "preview": "",
-        "caption": "",
-        "results": {},
-        "status": "preview",
-        "created_at": datetime.utcnow().isoformat(),
-    }
 
-    data["posts"].append(post)
-    _save(data)
-    return post
+def recover_expired_leases(now=None) -> int:
+    """
+    Abgestürzte Worker: abgelaufene Leases → Status vor dem Claim
+    (Post ist danach wieder fällig). Liest nur den Lease-Index.
+    """
+    now_ts = as_utc_ts(now)
 
+    def recover(post):
+        expires = lease_expires_ts(post)
+        return expires is not None and expires <= now_ts and release_lease(post)
 
-def get_posts(client: str) -> List[Dict[str, Any]]:
-    _sync_filesystem(client)
-    data = _load()
-    return [p for p in data["posts"] if p.get("client") == client]
+    recovered = 0
+    for client in shard_clients():
+        shard = _shard(client)
+        with shard["lock"]:
+            _load(shard)
+            expired = [pid for pid, ts in shard["leases"].items() if ts <= now_ts]
+        if expired:
+            recovered += len(_mutate_posts(client, expired, recover))
+    return recovered
 
 
 # ============================================================
@@ -207,95 +765,133 @@ def get_posts(client: str) -> List[Dict[str, Any]]:
 # ============================================================
 
 def add_post(post: dict):
-    data = _load()
+    # 🔑 UPSERT: ersetzt bestehenden Post mit gleicher ID
+    with transaction() as tx:
+        tx.add(post)
 
-    posts = data.get("posts", [])
-    post_id = post.get("id")
 
-    if not post_id:
-        raise ValueError("Post requires an id")
+def add_posts(posts: List[Dict[str, Any]]) -> None:
+    with transaction() as tx:
+        for post in posts:
+            tx.add(post)
 
-    # 🔑 UPSERT: ersetze bestehenden Post mit gleicher ID
-    replaced = False
-    for i, p in enumerate(posts):
-        if p.get("id") == post_id:
-            posts[i] = post
-            replaced = True
-            break
 
-    if not replaced:
-        posts.append(post)
+# ============================================================
+# 🔄 STATUS UPDATE
+# ============================================================
 
-    data["posts"] = posts
-    _save(data)
+def update_status(post_id: str, status: str):
+    with transaction() as tx:
+        tx.update_status(post_id, status)
 
 
 # ============================================================
-# 🔄 STATUS UPDATE
+# 🔧 GENERIC UPDATE
 # ============================================================
 
-def update_status(post_id: str, status: str):
-    data = _load()
+def update_post(post_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+    with transaction() as tx:
+        return tx.update(post_id, fields)
 
-    for p in data["posts"]:
-        if p.get("id") == post_id:
-            p["status"] = status
-            if status == "posted":
-                p["posted_at"] = datetime.utcnow().isoformat()
-            break
 
-    _save(data)
+def update_posts_many(patches: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    { post_id: fields } → EIN Save für alle Patches.
+    """
+    with transaction() as tx:
+        return [tx.update(post_id, fields) for post_id, fields in patches.items()]
 
 
 # ============================================================
-# 🔧 GENERIC UPDATE
+# 🗑️ REMOVE (Archivierung)
 # ============================================================
 
-def update_post(post_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
-    data = _load()
-    updated = None
+def remove_posts(client: str, post_ids: List[str]) -> int:
+    """
+    Entfernt Posts aus dem Hot-Store (nach post_archive.archive_posts).
+    """
+    ids = set(post_ids)
+    if not ids:
+        return 0
 
+    shard = _shard(client)
+    with _writing(shard) as data:
+        kept = [p for p in data["posts"] if p.get("id") not in ids]
+        removed = len(data["posts"]) - len(kept)
+        if removed:
+            data["posts"] = kept
+            _save(shard, data)
+    return removed
+
+
+# ============================================================
+# 🚚 MIGRATION (runtime/posts.json → clients/<client>/state/posts.json)
+# ============================================================
+
+def migrate_legacy_store(path: Path = None) -> Dict[str, int]:
+    """
+    Verteilt den alten globalen Store auf die Client-Shards.
+    Idempotent: Posts, die im Shard schon existieren, gewinnen.
+    -> { client: übernommene Posts }
+    """
+    path = Path(path or LEGACY_STORE_PATH)
+    data = _parse_store(path) or {"posts": []}
+
+    by_client: Dict[str, List[Dict[str, Any]]] = {}
+    skipped = 0
     for p in data["posts"]:
-        if p.get("id") == post_id:
-            for k, v in fields.items():
-                if v is None:
-                    continue
-
-                if k == "results" and isinstance(v, dict):
-                    p.setdefault("results", {})
-                    for pf, pf_data in v.items():
-                        p["results"].setdefault(pf, {})
-                        p["results"][pf].update(pf_data)
-                else:
-                    p[k] = v
-
-            updated = _normalize_post(p)
-            break
-
-    if not updated:
-        raise KeyError(f"Post nicht gefunden: {post_id}")
-
-    _save(data)
-    return updated
-def mark_manual_required(post_id: str, platform: str):
-    post = get_post_by_id(post_id)
+        if isinstance(p, dict) and p.get("id") and p.get("client"):
+            by_client.setdefault(p["client"], []).append(p)
+        else:
+            skipped += 1
+    if skipped:
+        logger.warning(f"[PostStore] ⚠️ {skipped} Posts ohne id/client nicht migriert")
+
+    counts: Dict[str, int] = {}
+    for client, posts in by_client.items():
+        shard = _shard(client)
+        with _writing(shard) as shard_data:
+            existing = {p.get("id") for p in shard_data["posts"]}
+            new = [p for p in posts if p["id"] not in existing]
+            if new or shard["sig"] is None:
+                shard_data["posts"].extend(copy.deepcopy(new))
+                _save(shard, shard_data)
+        counts[client] = len(new)
+    return counts
 
-    post.setdefault("platform_status", {})
-    post["platform_status"][platform] = "manual"
-    post["status"] = "scheduled_manual"
 
-    update_post(post_id, post)
+# ============================================================
+# 🧩 PLATFORM STATUS (backend-neutral, nutzt nur die Public API)
+# ============================================================
 
-from datetime import datetime
+def mark_manual_required(post_id: str, platform: str):
+    with transaction():
+        post = get_post_by_id(post_id)
+        update_post(post_id, apply_manual_required(post, platform))
 
-def finalize_post_if_done(post_id: str):
-    post = get_post_by_id(post_id)
 
-    if all(v == "posted" for v in post.get("platform_status", {}).values()):
-        post["status"] = "posted"
-        post["published_at"] = datetime.utcnow().isoformat()
+def finalize_post_if_done(post_id: str, status: str = "posted"):
+    """
+    Alle Plattformen "posted" → Post abschließen.
+    status: Endstatus (Auto-Publisher nutzt "published").
+    """
+    with transaction():
+        post = get_post_by_id(post_id)
+        if apply_finalize_if_done(post, status):
+            update_post(post_id, post)
+            return True
+        return False
 
-        update_post(post_id, post)
-        return True
 
-    return False
+# ============================================================
+# 🗄️ BACKEND SWITCH
+# ============================================================
+# POST_STORE_BACKEND=sqlite → Public API läuft über core/post_store_sqlite.py
+# (WAL + Indizes). Migration: python -m tools.migrate_posts_to_sqlite
+# JSON-only (shard_clients, store_version, cache_stats, migrate_legacy_store)
+# werfen dort NotImplementedError statt still die JSON-Shards zu lesen
+
+POST_STORE_BACKEND = os.getenv("POST_STORE_BACKEND", "json").strip().lower()
+
+if POST_STORE_BACKEND == "sqlite":
+    from core.post_store_sqlite import *  # noqa: E402,F401,F403
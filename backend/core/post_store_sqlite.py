@@ -0,0 +1,502 @@
+"""
+🗄️ PostStore – SQLite Backend (WAL)
+-----------------------------------
+- Gleiche Public API wie core/post_store.py (JSON)
+- Aktiv mit POST_STORE_BACKEND=sqlite
+- Indizes: id (PRIMARY KEY), (client, status), publish_at, (status, publish_at)
+- Post bleibt vollständig als JSON in `data`, Index-Spalten werden gespiegelt
+- Einmal-Migration aus runtime/posts.json: migrate_from_json()
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from core.post_model import (
+    CLAIMABLE_STATUSES,
+    LEASE_STATUS,
+    PostTransaction,
+    apply_finalize_if_done,
+    apply_lease,
+    apply_manual_required,
+    apply_op,
+    as_utc_ts,
+    iso_to_ts,
+    lease_claimable,
+    lease_expires_ts,
+    op_target,
+    release_lease,
+)
+from core.post_sync import diff_output_files, apply_output_diff, reset_index
+from core.platform_times import next_platform_due_ts
+from core import post_archive, wakeup
+
+__all__ = [
+    "get_post_by_id",
+    "get_hot_post",
+    "ensure_post_exists",
+    "get_posts",
+    "get_posts_by_status",
+    "add_post",
+    "add_posts",
+    "update_status",
+    "update_post",
+    "update_posts_many",
+    "transaction",
+    "get_due_posts",
+    "next_due_at",
+    "remove_posts",
+    "list_clients",
+    "claim_posts",
+    "release_post",
+    "recover_expired_leases",
+    "mark_manual_required",
+    "finalize_post_if_done",
+    # JSON-only → NotImplementedError
+    "shard_clients",
+    "store_version",
+    "cache_stats",
+    "migrate_legacy_store",
+]
+
+BASE_DIR = Path(__file__).resolve().parents[1]  # backend/
+DB_PATH = Path(os.getenv("POST_STORE_DB", str(BASE_DIR / "db" / "posts.sqlite")))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id          TEXT PRIMARY KEY,
+    client      TEXT NOT NULL,
+    status      TEXT,
+    publish_at  TEXT,
+    publish_ts  REAL,            -- Due-Zeit: nächste offene Plattform, sonst publish_at
+    created_at  TEXT,
+    updated_at  TEXT,
+    data        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_posts_client_status ON posts (client, status);
+CREATE INDEX IF NOT EXISTS idx_posts_publish_at ON posts (publish_ts);
+CREATE INDEX IF NOT EXISTS idx_posts_status_publish ON posts (status, publish_ts);
+"""
+
+_local = threading.local()
+
+
+# ============================================================
+# 📦 CONNECTION
+# ============================================================
+
+def _conn() -> sqlite3.Connection:
+    """
+    Eine Connection pro Thread (sqlite3-Objekte sind nicht thread-safe).
+    Wechselt DB_PATH (Tests/Migration), wird neu verbunden.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None and getattr(_local, "path", None) == str(DB_PATH):
+        return conn
+
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(DB_PATH), timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    conn.executescript(_SCHEMA)
+
+    _local.conn = conn
+    _local.path = str(DB_PATH)
+    return conn
+
+
+def _row_to_post(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+    if row is None:
+        return None
+    return json.loads(row["data"])
+
+
+def _due_ts(post: Dict[str, Any]) -> Optional[float]:
+    ts = next_platform_due_ts(post)
+    return ts if ts is not None else iso_to_ts(post.get("publish_at"))
+
+
+def _upsert(conn: sqlite3.Connection, post: Dict[str, Any]) -> None:
+    conn.execute(
+        """
+        INSERT INTO posts (id, client, status, publish_at, publish_ts, created_at, updated_at, data)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            client = excluded.client,
+            status = excluded.status,
+            publish_at = excluded.publish_at,
+            publish_ts = excluded.publish_ts,
+            created_at = excluded.created_at,
+            updated_at = excluded.updated_at,
+            data = excluded.data
+        """,
+        (
+            post["id"],
+            str(post.get("client") or ""),
+            (post.get("status") or "").lower(),
+            post.get("publish_at"),
+            _due_ts(post),
+            post.get("created_at"),
+            post.get("updated_at"),
+            json.dumps(post, ensure_ascii=False),
+        ),
+    )
+
+
+def _select_one(conn: sqlite3.Connection, post_id: str) -> Optional[Dict[str, Any]]:
+    row = conn.execute("SELECT data FROM posts WHERE id = ?", (post_id,)).fetchone()
+    return _row_to_post(row)
+
+
+# ============================================================
+# 🧠 FILESYSTEM SYNC (NUR PREVIEW + APPROVED)
+# ============================================================
+
+def _sync_filesystem(client: str):
+    # ⚡ Ordner unverändert → keine Query, kein Write
+    diff = diff_output_files(client)
+    if diff is None:
+        return
+
+    try:
+        conn = _conn()
+        rows = conn.execute("SELECT data FROM posts WHERE client = ?", (client,)).fetchall()
+        posts = [_row_to_post(r) for r in rows]
+        before = {p["id"]: json.dumps(p, sort_keys=True, ensure_ascii=False) for p in posts}
+
+        merged, changed = apply_output_diff(
+            client, posts, diff, post_archive.archived_ids(client)
+        )
+        if not changed:
+            return
+
+        kept_ids = set()
+        with conn:
+            for p in merged:
+                kept_ids.add(p["id"])
+                if before.get(p["id"]) != json.dumps(p, sort_keys=True, ensure_ascii=False):
+                    _upsert(conn, p)
+
+            removed = [pid for pid in before if pid not in kept_ids]
+            if removed:
+                conn.executemany("DELETE FROM posts WHERE id = ?", [(pid,) for pid in removed])
+    except Exception:
+        reset_index(client)
+        raise
+
+
+# ============================================================
+# 🧾 TRANSACTION (Unit of Work)
+# ============================================================
+# Gleiche Semantik wie im JSON-Store: Ops sammeln, beim Verlassen des
+# Blocks in EINER SQLite-Transaktion anwenden. Die DB bleibt während des
+# Blocks (z.B. Netzwerk-Calls im Publisher) ungesperrt.
+
+_tx_local = threading.local()
+
+
+def _current_tx() -> Optional[PostTransaction]:
+    return getattr(_tx_local, "tx", None)
+
+
+def _fetch_copy(post_id: str, client: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    return _select_one(_conn(), post_id)
+
+
+def _commit(ops) -> None:
+    if not ops:
+        return
+
+    conn = _conn()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        for op in ops:
+            new = apply_op(_select_one(conn, op_target(op)), op)
+            if new is not None:
+                _upsert(conn, new)
+
+    # Scheduler neu planen lassen (Termin evtl. neu/verschoben)
+    wakeup.notify()
+
+
+@contextmanager
+def transaction():
+    tx = _current_tx()
+    if tx is not None:
+        yield tx
+        return
+
+    tx = PostTransaction(_fetch_copy)
+    _tx_local.tx = tx
+    try:
+        yield tx
+    finally:
+        _tx_local.tx = None
+
+    _commit(tx.ops)
+
+
+# ============================================================
+# 🔍 READ
+# ============================================================
+
+def get_post_by_id(post_id: str) -> Optional[Dict[str, Any]]:
+    post = get_hot_post(post_id)
+    return post if post is not None else post_archive.get_archived_post(post_id)
+
+
+def get_hot_post(post_id: str) -> Optional[Dict[str, Any]]:
+    tx = _current_tx()
+    return tx.get(post_id) if tx is not None else _fetch_copy(post_id)
+
+
+def ensure_post_exists(post_id: str, client: str) -> Dict[str, Any]:
+    with transaction() as tx:
+        return tx.ensure(post_id, client)
+
+
+def get_posts(client: str, sync: bool = True) -> List[Dict[str, Any]]:
+    if sync:
+        _sync_filesystem(client)
+    rows = _conn().execute(
+        "SELECT data FROM posts WHERE client = ? ORDER BY rowid", (client,)
+    ).fetchall()
+    posts = [_row_to_post(r) for r in rows]
+
+    tx = _current_tx()
+    return tx.overlay(posts, client) if tx is not None else posts
+
+
+def list_clients() -> List[str]:
+    rows = _conn().execute("SELECT DISTINCT client FROM posts ORDER BY client").fetchall()
+    return [r[0] for r in rows if r[0]]
+
+
+def get_posts_by_status(client: str, status: str) -> List[Dict[str, Any]]:
+    """
+    Nur lesen, KEIN Filesystem-Sync – nutzt idx_posts_client_status.
+    """
+    rows = _conn().execute(
+        "SELECT data FROM posts WHERE client = ? AND status = ? ORDER BY rowid",
+        (client, status),
+    ).fetchall()
+    posts = [_row_to_post(r) for r in rows]
+
+    tx = _current_tx()
+    if tx is None:
+        return posts
+    return [
+        p for p in tx.overlay(posts, client)
+        if (p.get("status") or "").lower() == status
+    ]
+
+
+# ============================================================
+# ⏰ DUE QUERY (Scheduler) – nutzt idx_posts_status_publish
+# ============================================================
+
+def get_due_posts(now=None, limit: Optional[int] = None, client: Optional[str] = None) -> List[Dict[str, Any]]:
+    sql = "SELECT data FROM posts WHERE status = 'scheduled' AND publish_ts <= ?"
+    args: List[Any] = [as_utc_ts(now)]
+    if client:
+        sql += " AND client = ?"
+        args.append(client)
+    sql += " ORDER BY publish_ts, id"
+    if limit is not None:
+        sql += " LIMIT ?"
+        args.append(limit)
+
+    return [_row_to_post(r) for r in _conn().execute(sql, args).fetchall()]
+
+
+def next_due_at(client: Optional[str] = None) -> Optional[datetime]:
+    sql = "SELECT MIN(publish_ts) FROM posts WHERE status = 'scheduled'"
+    args: List[Any] = []
+    if client:
+        sql += " AND client = ?"
+        args.append(client)
+
+    ts = _conn().execute(sql, args).fetchone()[0]
+    return datetime.fromtimestamp(ts, timezone.utc) if ts is not None else None
+
+
+# ============================================================
+# 🔐 LEASES (mehrere Scheduler-Worker) – BEGIN IMMEDIATE = atomar
+# ============================================================
+
+def _mutate_posts(post_ids, fn) -> List[Dict[str, Any]]:
+    conn = _conn()
+    changed: List[Dict[str, Any]] = []
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        for post_id in post_ids:
+            post = _select_one(conn, post_id)
+            if post is not None and fn(post):
+                _upsert(conn, post)
+                changed.append(post)
+    return changed
+
+
+def claim_posts(
+    post_ids: List[str],
+    owner: str,
+    ttl_seconds: float,
+    statuses=CLAIMABLE_STATUSES,
+) -> List[Dict[str, Any]]:
+    now = time.time()
+
+    def claim(post):
+        if not lease_claimable(post, now, statuses):
+            return False
+        apply_lease(post, owner, now + ttl_seconds)
+        return True
+
+    return _mutate_posts(post_ids, claim)
+
+
+def release_post(post_id: str, owner: Optional[str] = None) -> bool:
+    return bool(_mutate_posts([post_id], lambda p: release_lease(p, owner)))
+
+
+def recover_expired_leases(now=None) -> int:
+    now_ts = as_utc_ts(now)
+
+    def recover(post):
+        expires = lease_expires_ts(post)
+        return expires is not None and expires <= now_ts and release_lease(post)
+
+    rows = _conn().execute(
+        "SELECT id FROM posts WHERE status = ?", (LEASE_STATUS,)
+    ).fetchall()
+    changed = _mutate_posts([r["id"] for r in rows], recover)
+    if changed:
+        wakeup.notify()
+    return len(changed)
+
+
+# ============================================================
+# ➕ CREATE
+# ============================================================
+
+def add_post(post: dict):
+    with transaction() as tx:
+        tx.add(post)
+
+
+def add_posts(posts: List[Dict[str, Any]]) -> None:
+    with transaction() as tx:
+        for post in posts:
+            tx.add(post)
+
+
+# ============================================================
+# 🔄 STATUS UPDATE
+# ============================================================
+
+def update_status(post_id: str, status: str):
+    with transaction() as tx:
+        tx.update_status(post_id, status)
+
+
+# ============================================================
+# 🔧 GENERIC UPDATE
+# ============================================================
+
+def update_post(post_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+    with transaction() as tx:
+        return tx.update(post_id, fields)
+
+
+def update_posts_many(patches: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    with transaction() as tx:
+        return [tx.update(post_id, fields) for post_id, fields in patches.items()]
+
+
+# ============================================================
+# 🗑️ REMOVE (Archivierung)
+# ============================================================
+
+def remove_posts(client: str, post_ids: List[str]) -> int:
+    conn = _conn()
+    with conn:
+        cur = conn.executemany(
+            "DELETE FROM posts WHERE client = ? AND id = ?",
+            [(client, pid) for pid in post_ids],
+        )
+    return cur.rowcount
+
+
+# ============================================================
+# 🧩 PLATFORM STATUS
+# ============================================================
+
+def mark_manual_required(post_id: str, platform: str):
+    with transaction():
+        post = get_post_by_id(post_id)
+        update_post(post_id, apply_manual_required(post, platform))
+
+
+def finalize_post_if_done(post_id: str, status: str = "posted"):
+    with transaction():
+        post = get_post_by_id(post_id)
+        if apply_finalize_if_done(post, status):
+            update_post(post_id, post)
+            return True
+        return False
+
+
+# ============================================================
+# 🚫 JSON-ONLY (Shards / In-Process-Cache gibt es hier nicht)
+# ============================================================
+
+def _json_only(name: str):
+    raise NotImplementedError(f"post_store.{name}() gibt es nur im JSON-Backend (POST_STORE_BACKEND=json)")
+
+
+def shard_clients() -> List[str]:
+    _json_only("shard_clients")
+
+
+def store_version() -> int:
+    _json_only("store_version")
+
+
+def cache_stats() -> Dict[str, Any]:
+    _json_only("cache_stats")
+
+
+def migrate_legacy_store(path: Path = None) -> Dict[str, int]:
+    _json_only("migrate_legacy_store")  # → python -m tools.migrate_posts_to_sqlite
+
+
+# ============================================================
+# 🚚 MIGRATION (runtime/posts.json → SQLite)
+# ============================================================
+
+def import_posts(posts: Iterable[Dict[str, Any]]) -> int:
+    conn = _conn()
+    count = 0
+    with conn:
+        for p in posts:
+            if not isinstance(p, dict) or not p.get("id"):
+                continue
+            _upsert(conn, p)
+            count += 1
+    return count
+
+
+def migrate_from_json(json_path: Path) -> int:
+    """
+    Idempotent (UPSERT per id) – kann gefahrlos mehrfach laufen.
+    """
+    data = json.loads(Path(json_path).read_text(encoding="utf-8"))
+    posts = data.get("posts", []) if isinstance(data, dict) else []
+    return import_posts(posts)
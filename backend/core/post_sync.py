@@ -0,0 +1,282 @@
+"""
+🧠 PostStore – Filesystem Sync (NUR PREVIEW + APPROVED)
+------------------------------------------------------
+- Liest output/preview + output/approved/used eines Clients
+- Verknüpft PNG-Varianten (instagram / _facebook / _linkedin) mit Posts
+- Backend-neutral: liefert nur die gemergte Post-Liste zurück
+- Verzeichnis-Index (mtime + Datei-Snapshot) pro Prozess:
+  unveränderte Ordner werden NICHT neu gelistet, nur der Diff wird angewendet
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.post_model import new_manual_post
+
+CLIENTS_DIR = Path(__file__).resolve().parents[1] / "clients"  # backend/clients
+
+# Diese Stati bleiben erhalten, auch wenn keine Datei (mehr) existiert
+PROTECTED_STATUSES = {
+    "approved", "scheduled", "posted", "published",
+    "publishing", "retrying", "failed", "missed",
+    "scheduled_manual",  # Auto-Plattformen live, manuelle noch offen
+}
+
+# PRIORITÄT: preview > approved (spätere Ordner überschreiben frühere)
+SYNC_FOLDERS = ("approved/used", "preview")
+
+# Ordner-mtime jünger als das → Snapshot gilt als "instabil" und wird beim
+# nächsten Aufruf neu gelistet (grobe mtime-Auflösung mancher Dateisysteme)
+MTIME_SETTLE_NS = 2_000_000_000
+
+_index_lock = threading.Lock()
+_dir_index: Dict[str, Dict[str, Any]] = {}
+
+
+def split_variant(stem: str):
+    if stem.endswith("_facebook"):
+        return stem[:-9], "facebook"
+    if stem.endswith("_linkedin"):
+        return stem[:-9], "linkedin"
+    return stem, "instagram"
+
+
+def scan_output_files(client: str) -> Dict[str, Dict[str, str]]:
+    """
+    { base_id: { platform: static_url } }
+    """
+    output_dir = CLIENTS_DIR / client / "output"
+    files_by_id: Dict[str, Dict[str, str]] = {}
+
+    def collect(dir_path: Path, folder: str):
+        if not dir_path.exists():
+            return
+        for f in dir_path.glob("*.png"):
+            base_id, platform = split_variant(f.stem)
+            files_by_id.setdefault(base_id, {})
+            files_by_id[base_id][platform] = (
+                f"/static/{client}/output/{folder}/{f.name}"
+            )
+
+    for folder in SYNC_FOLDERS:
+        collect(output_dir / folder, folder)
+
+    return files_by_id
+
+
+def _apply_platform_map(post: Dict[str, Any], platform_map: Dict[str, str]) -> bool:
+    """
+    -> True, wenn sich am Post etwas geändert hat.
+    """
+    changed = False
+    for pf, url in platform_map.items():
+        post.setdefault("results", {})
+        post["results"].setdefault(pf, {})
+        if post["results"][pf].get("preview_url") != url:
+            post["results"][pf]["preview_url"] = url
+            changed = True
+
+    if "instagram" in platform_map and post.get("preview") != platform_map["instagram"]:
+        post["preview"] = platform_map["instagram"]
+        changed = True
+    return changed
+
+
+def _is_protected(post: Dict[str, Any]) -> bool:
+    return (post.get("status") or "").lower() in PROTECTED_STATUSES
+
+
+def merge_output_files(
+    client: str,
+    posts: List[Dict[str, Any]],
+    files_by_id: Dict[str, Dict[str, str]],
+    skip_ids: frozenset = frozenset(),
+) -> List[Dict[str, Any]]:
+    """
+    Wendet den Datei-Stand auf die Post-Liste an (mutiert Posts in-place)
+    und gibt die bereinigte Liste zurück.
+    skip_ids: archivierte Posts – ihre Dateien legen KEINEN neuen Post an.
+    """
+    return _merge(client, posts, files_by_id, skip_ids)[0]
+
+
+def _merge(
+    client: str,
+    posts: List[Dict[str, Any]],
+    files_by_id: Dict[str, Dict[str, str]],
+    skip_ids: frozenset,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    merge_output_files + ob ein Post angelegt, geändert oder entfernt wurde.
+    """
+    posts_by_id = {
+        p["id"]: p for p in posts if p.get("client") == client
+    }
+
+    touched_ids = set()
+    changed = False
+
+    for post_id, platform_map in files_by_id.items():
+        post = posts_by_id.get(post_id)
+
+        if not post:
+            if post_id in skip_ids:
+                continue
+            post = new_manual_post(post_id, client)
+            posts.append(post)
+            changed = True
+
+        changed = _apply_platform_map(post, platform_map) or changed
+        touched_ids.add(post_id)
+
+    # 🔥 CLEANUP:
+    # preview Posts ohne Dateien → löschen
+    cleaned: List[Dict[str, Any]] = []
+
+    for p in posts:
+        if p.get("client") != client:
+            cleaned.append(p)
+            continue
+
+        if _is_protected(p):
+            cleaned.append(p)
+            continue
+
+        if p["id"] in touched_ids:
+            cleaned.append(p)
+
+    return cleaned, changed or len(cleaned) != len(posts)
+
+
+# ============================================================
+# ⚡ INKREMENTELLER SYNC (Verzeichnis-Index)
+# ============================================================
+
+def _snapshot_dir(dir_path: Path, cached: Optional[Tuple[Optional[int], frozenset, bool]]):
+    """
+    (mtime_ns, png-Namen, stabil) – listet nur, wenn sich die Ordner-mtime
+    geändert hat oder der letzte Snapshot noch instabil war.
+    """
+    try:
+        mtime_ns = dir_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None, frozenset(), True
+
+    if cached and cached[2] and cached[0] == mtime_ns:
+        return cached
+
+    with os.scandir(dir_path) as it:
+        names = frozenset(e.name for e in it if e.name.endswith(".png"))
+
+    stable = time.time_ns() - mtime_ns >= MTIME_SETTLE_NS
+    return mtime_ns, names, stable
+
+
+def _files_from_snapshots(client: str, snapshots: Dict[str, Tuple[Any, frozenset, bool]]):
+    files_by_id: Dict[str, Dict[str, str]] = {}
+    for folder in SYNC_FOLDERS:
+        for name in sorted(snapshots[folder][1]):
+            base_id, platform = split_variant(name[:-4])
+            files_by_id.setdefault(base_id, {})
+            files_by_id[base_id][platform] = f"/static/{client}/output/{folder}/{name}"
+    return files_by_id
+
+
+def diff_output_files(client: str) -> Optional[Dict[str, Any]]:
+    """
+    None → keine Änderung seit dem letzten Aufruf (kein Load/Save nötig).
+    Sonst:
+      full         → erster Lauf im Prozess, kompletter Abgleich
+      files_by_id  → aktueller Datei-Stand
+      changed_ids  → base_ids mit neuen/geänderten Varianten
+      removed_ids  → base_ids ohne Dateien (vorher vorhanden)
+    """
+    output_dir = CLIENTS_DIR / client / "output"
+    key = str(output_dir)
+
+    with _index_lock:
+        entry = _dir_index.get(key)
+        old_snaps = entry["snapshots"] if entry else {}
+
+        snapshots = {
+            folder: _snapshot_dir(output_dir / folder, old_snaps.get(folder))
+            for folder in SYNC_FOLDERS
+        }
+
+        if entry and all(
+            snapshots[f][:2] == old_snaps[f][:2] for f in SYNC_FOLDERS
+        ):
+            entry["snapshots"] = snapshots
+            return None
+
+        files_by_id = _files_from_snapshots(client, snapshots)
+        old_files = entry["files_by_id"] if entry else {}
+
+        _dir_index[key] = {"snapshots": snapshots, "files_by_id": files_by_id}
+
+    return {
+        "full": entry is None,
+        "files_by_id": files_by_id,
+        "changed_ids": {
+            pid for pid, pm in files_by_id.items() if old_files.get(pid) != pm
+        },
+        "removed_ids": set(old_files) - set(files_by_id),
+    }
+
+
+def apply_output_diff(
+    client: str,
+    posts: List[Dict[str, Any]],
+    diff: Dict[str, Any],
+    skip_ids: frozenset = frozenset(),
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    -> (posts, changed). changed=False → Store muss nicht geschrieben werden
+    (auch beim vollständigen Abgleich nach Start/reset_index()).
+    """
+    if diff["full"]:
+        return _merge(client, posts, diff["files_by_id"], skip_ids)
+
+    posts_by_id = {
+        p["id"]: p for p in posts if p.get("client") == client
+    }
+    changed = False
+
+    for post_id in diff["changed_ids"]:
+        post = posts_by_id.get(post_id)
+        if not post:
+            if post_id in skip_ids:
+                continue
+            post = new_manual_post(post_id, client)
+            posts.append(post)
+            posts_by_id[post_id] = post
+            changed = True
+
+        changed = _apply_platform_map(post, diff["files_by_id"][post_id]) or changed
+
+    removed = {
+        pid for pid in diff["removed_ids"]
+        if pid in posts_by_id and not _is_protected(posts_by_id[pid])
+    }
+    if removed:
+        posts = [
+            p for p in posts
+            if not (p.get("client") == client and p.get("id") in removed)
+        ]
+        changed = True
+
+    return posts, changed
+
+
+def reset_index(client: Optional[str] = None) -> None:
+    """
+    Erzwingt beim nächsten Sync einen vollständigen Abgleich.
+    """
+    with _index_lock:
+        if client is None:
+            _dir_index.clear()
+        else:
+            _dir_index.pop(str(CLIENTS_DIR / client / "output"), None)
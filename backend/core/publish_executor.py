@@ -0,0 +1,247 @@
+"""
+⚡ Publish Executor (Thread-Pools + Concurrency-Caps)
+---------------------------------------------------
+- publish_many(): unabhängige Posts parallel (PUBLISH_MAX_POSTS)
+- run_platforms(): Plattformen EINES Posts parallel (PUBLISH_MAX_WORKERS)
+- Caps pro Plattform (Adapter-Capability "max_concurrency", von der
+  Registry per set_platform_limits() gesetzt; Override:
+  PUBLISH_CONCURRENCY_<PLATFORM>) und pro Account
+  (PUBLISH_ACCOUNT_CONCURRENCY, Account = platform:client)
+- batch_chunks(): Batch-Planung aus den Adapter-Capabilities
+  "batch"/"min_batch"/"max_batch" (Registry → set_platform_batches())
+- Zwei getrennte Pools → ein Post-Task, der auf seine Plattform-Tasks
+  wartet, kann den eigenen Pool nicht blockieren
+- Fehler eines Tasks landen als Exception-Objekt im Ergebnis, nicht als Raise
+- fair_order(): gewichtetes Round-Robin über Clients mit Quote pro Tick
+  (PUBLISH_CLIENT_QUOTA, Gewichte: PUBLISH_CLIENT_WEIGHTS="a:2,b:1")
+  → ein Client mit großem Backlog blockiert die anderen nicht
+- publish_now(): Priority-Lane für manuelle "Publish now"-Aktionen –
+  eigener Pool, Plattform-/Account-Slots vor wartenden Scheduler-Tasks
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar
+
+MAX_POST_WORKERS = int(os.getenv("PUBLISH_MAX_POSTS", "4"))
+MAX_PLATFORM_WORKERS = int(os.getenv("PUBLISH_MAX_WORKERS", "8"))
+ACCOUNT_CONCURRENCY = int(os.getenv("PUBLISH_ACCOUNT_CONCURRENCY", "1"))
+DEFAULT_PLATFORM_CONCURRENCY = 2
+MAX_PRIORITY_WORKERS = int(os.getenv("PUBLISH_MAX_PRIORITY", "2"))
+CLIENT_QUOTA = int(os.getenv("PUBLISH_CLIENT_QUOTA", "3"))
+
+_lock = threading.Lock()
+_pools: Dict[str, ThreadPoolExecutor] = {}
+_slots: Dict[str, Dict[str, Any]] = {}
+_platform_limits: Dict[str, int] = {}  # aus den Adapter-Capabilities
+_platform_batches: Dict[str, Dict[str, int]] = {}  # platform → {"min", "max"}
+_lane = threading.local()  # _lane.priority → Task läuft in der Priority-Lane
+
+T = TypeVar("T")
+
+
+def platform_limit(platform: str) -> int:
+    env = os.getenv(f"PUBLISH_CONCURRENCY_{platform.upper()}")
+    if env:
+        return max(1, int(env))
+    return _platform_limits.get(platform) or DEFAULT_PLATFORM_CONCURRENCY
+
+
+def set_platform_limits(limits: Dict[str, int]) -> None:
+    """
+    { platform: max_concurrency } (Adapter-Registry). Bestehende Slots
+    übernehmen den neuen Cap sofort.
+    """
+    with _lock:
+        _platform_limits.clear()
+        _platform_limits.update({pf: max(1, int(n)) for pf, n in limits.items()})
+        for key, slot in _slots.items():
+            if key.startswith("platform:"):
+                with slot["cond"]:
+                    slot["limit"] = platform_limit(key.split(":", 1)[1])
+                    slot["cond"].notify_all()
+
+
+def set_platform_batches(batches: Dict[str, Dict[str, int]]) -> None:
+    """
+    { platform: {"min": Posts ab denen gebündelt wird, "max": pro Request} }
+    (Adapter-Registry, nur Plattformen mit Capability "batch").
+    """
+    with _lock:
+        _platform_batches.clear()
+        _platform_batches.update({
+            pf: {"min": max(1, int(b["min"])), "max": max(1, int(b["max"]))}
+            for pf, b in batches.items()
+        })
+
+
+def batch_chunks(platform: str, items: List[T]) -> List[List[T]]:
+    """
+    items → Batch-Requests à max. "max" Einträge; [] = kein Batch
+    (Plattform bündelt nicht oder weniger als "min" Einträge).
+    """
+    with _lock:
+        batch = _platform_batches.get(platform)
+    if batch is None or len(items) < batch["min"]:
+        return []
+    size = batch["max"]
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _slot(key: str, limit: int) -> Dict[str, Any]:
+    with _lock:
+        slot = _slots.get(key)
+        if slot is None:
+            slot = {"limit": limit, "used": 0, "priority_waiting": 0, "cond": threading.Condition()}
+            _slots[key] = slot
+        return slot
+
+
+@contextmanager
+def _hold(slot: Dict[str, Any], priority: bool):
+    """
+    Zählender Slot; wartende Priority-Tasks werden vor normalen bedient.
+    """
+    cond = slot["cond"]
+    with cond:
+        if priority:
+            slot["priority_waiting"] += 1
+        try:
+            while slot["used"] >= slot["limit"] or (not priority and slot["priority_waiting"]):
+                cond.wait()
+        finally:
+            if priority:
+                slot["priority_waiting"] -= 1
+                cond.notify_all()
+        slot["used"] += 1
+    try:
+        yield
+    finally:
+        with cond:
+            slot["used"] -= 1
+            cond.notify_all()
+
+
+def is_priority() -> bool:
+    return bool(getattr(_lane, "priority", False))
+
+
+def _pool(name: str, size: int) -> ThreadPoolExecutor:
+    with _lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"publish-{name}")
+            _pools[name] = pool
+        return pool
+
+
+@contextmanager
+def platform_slot(platform: str, account: str, priority: Optional[bool] = None):
+    """
+    Hält je einen Slot für die Plattform und den Account (gleiche
+    Reihenfolge überall → kein Lock-Zyklus).
+    """
+    priority = is_priority() if priority is None else priority
+    with _hold(_slot(f"platform:{platform}", platform_limit(platform)), priority):
+        with _hold(_slot(f"account:{platform}:{account}", ACCOUNT_CONCURRENCY), priority):
+            yield
+
+
+def _capture(fn: Callable[[], Any]) -> Any:
+    try:
+        return fn()
+    except Exception as e:
+        return e
+
+
+def run_platforms(account: str, tasks: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """
+    { platform: fn } → { platform: Ergebnis | Exception }
+    """
+    priority = is_priority()  # Lane des aufrufenden Threads mitnehmen
+
+    def guarded(platform, fn):
+        with platform_slot(platform, account, priority):
+            return fn()
+
+    if len(tasks) <= 1:
+        return {pf: _capture(lambda pf=pf, fn=fn: guarded(pf, fn)) for pf, fn in tasks.items()}
+
+    pool = _pool("platforms", MAX_PLATFORM_WORKERS)
+    futures = {pf: pool.submit(_capture, lambda pf=pf, fn=fn: guarded(pf, fn)) for pf, fn in tasks.items()}
+    return {pf: f.result() for pf, f in futures.items()}
+
+
+def publish_many(fn: Callable[[str], Any], post_ids: Iterable[str]) -> Dict[str, Any]:
+    """
+    fn(post_id) für alle Posts parallel → { post_id: Ergebnis | Exception }
+    """
+    post_ids = list(dict.fromkeys(post_ids))
+    if len(post_ids) <= 1:
+        return {pid: _capture(lambda pid=pid: fn(pid)) for pid in post_ids}
+
+    pool = _pool("posts", MAX_POST_WORKERS)
+    futures = {pid: pool.submit(_capture, lambda pid=pid: fn(pid)) for pid in post_ids}
+    return {pid: f.result() for pid, f in futures.items()}
+
+
+# ============================================================
+# ⚖️ FAIR QUEUE (pro Client) + PRIORITY-LANE
+# ============================================================
+
+def client_weight(client: str) -> int:
+    """
+    PUBLISH_CLIENT_WEIGHTS="mtm_client:2,other:1" – Default 1.
+    """
+    for part in os.getenv("PUBLISH_CLIENT_WEIGHTS", "").split(","):
+        name, _, weight = part.partition(":")
+        if name.strip() == client and weight.strip().isdigit():
+            return max(1, int(weight))
+    return 1
+
+
+def fair_order(
+    groups: Dict[str, List[T]],
+    quota: Optional[int] = None,
+    start: int = 0,
+) -> List[T]:
+    """
+    { client: [Tasks, älteste zuerst] } → gewichtetes Round-Robin:
+    pro Runde `weight` Tasks je Client, max. quota * weight pro Client.
+    start rotiert den ersten Client (kein Dauer-Vorteil durch Sortierung).
+    """
+    quota = CLIENT_QUOTA if quota is None else quota
+    clients = sorted(groups)
+    if clients:
+        shift = start % len(clients)
+        clients = clients[shift:] + clients[:shift]
+
+    limits = {c: min(len(groups[c]), quota * client_weight(c)) for c in clients}
+    taken = {c: 0 for c in clients}
+    out: List[T] = []
+
+    while any(taken[c] < limits[c] for c in clients):
+        for c in clients:
+            n = min(client_weight(c), limits[c] - taken[c])
+            out.extend(groups[c][taken[c]:taken[c] + n])
+            taken[c] += n
+    return out
+
+
+def _in_priority_lane(fn: Callable[[], Any]) -> Any:
+    _lane.priority = True
+    try:
+        return fn()
+    finally:
+        _lane.priority = False
+
+
+def publish_now(fn: Callable[[], Any]) -> Any:
+    """
+    Manuelles "Publish now": eigener Pool (nicht hinter Scheduler-Batches),
+    Plattform-Slots mit Vorrang. Fehler werden normal geworfen.
+    """
+    pool = _pool("priority", MAX_PRIORITY_WORKERS)
+    return pool.submit(_in_priority_lane, fn).result()
@@ -0,0 +1,218 @@
+"""
+🔁 Publish Retry Queue (dauerhaft, pro Post + Plattform)
+-------------------------------------------------------
+- runtime/publish_queue.json (Datei-Lock + atomic write wie post_store)
+- Job-ID: "<post_id>:<platform>" → erneut fehlgeschlagen = gleicher Job
+- Retrybare Fehler: exponentieller Backoff mit Jitter, max. MAX_ATTEMPTS
+- Fatale Fehler / ausgeschöpfte Versuche → Dead-Letter ("dead")
+- Re-Drive: redrive(job_id) bzw. POST /api/publish-jobs/redrive
+"""
+
+import json
+import os
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from core.fs_utils import atomic_write_text, file_lock
+from core.logger import logger
+from core import wakeup
+
+BASE_DIR = Path(__file__).resolve().parents[1]  # backend/
+QUEUE_PATH = BASE_DIR / "runtime" / "publish_queue.json"
+
+MAX_ATTEMPTS = int(os.getenv("PUBLISH_RETRY_MAX_ATTEMPTS", "6"))
+BACKOFF_BASE_SECONDS = float(os.getenv("PUBLISH_RETRY_BASE_SECONDS", "30"))
+BACKOFF_MAX_SECONDS = float(os.getenv("PUBLISH_RETRY_MAX_SECONDS", "3600"))
+
+# Graph API Fehlercodes (https://developers.facebook.com/docs/graph-api/guides/error-handling)
+RETRYABLE_GRAPH_CODES = {1, 2, 4, 17, 32, 341, 613, 80001, 80002, 80004}
+FATAL_GRAPH_CODES = {10, 100, 102, 190, 200, 368}
+
+
+# ============================================================
+# 🧪 FEHLER-KLASSIFIKATION
+# ============================================================
+
+class PublishStateUnknown(RuntimeError):
+    """
+    Ausgang eines Publish offen (z.B. Batch-Timeout) → kein Retry,
+    die Plattform geht in den manuellen Abgleich.
+    """
+
+
+def _graph_error(exc: Exception) -> Optional[Dict[str, Any]]:
+    """
+    Adapter werfen RuntimeError(r.text) → Graph-Fehler-JSON parsen.
+    """
+    err = getattr(exc, "error", None)
+    if isinstance(err, dict):
+        return err
+    try:
+        data = json.loads(str(exc))
+    except ValueError:
+        return None
+    return data.get("error") if isinstance(data, dict) else None
+
+
+def is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int) and (status == 429 or status >= 500):
+        return True
+
+    err = _graph_error(exc)
+    if err is None:
+        # z.B. fehlende ENV / fehlende preview_url → Retry hilft nicht
+        return False
+
+    if err.get("is_transient"):
+        return True
+    code = err.get("code")
+    if code in FATAL_GRAPH_CODES:
+        return False
+    return code in RETRYABLE_GRAPH_CODES
+
+
+def backoff_seconds(attempts: int) -> float:
+    """
+    Exponentiell (base * 2^(n-1), gedeckelt) mit Jitter (50–100 %).
+    """
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+# ============================================================
+# 📦 IO
+# ============================================================
+
+def _read() -> Dict[str, Any]:
+    try:
+        data = json.loads(QUEUE_PATH.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {"jobs": {}}
+    data.setdefault("jobs", {})
+    return data
+
+
+@contextmanager
+def _writing():
+    with file_lock(QUEUE_PATH.with_name(QUEUE_PATH.name + ".lock")):
+        data = _read()
+        yield data
+        atomic_write_text(QUEUE_PATH, json.dumps(data, indent=2, ensure_ascii=False))
+
+
+def job_id(post_id: str, platform: str) -> str:
+    return f"{post_id}:{platform}"
+
+
+def _utcnow_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# ============================================================
+# ✍️ WRITE
+# ============================================================
+
+def record_failure(post_id: str, platform: str, client: str, exc: Exception) -> Dict[str, Any]:
+    """
+    -> Job-Stand ({"state": "pending" | "dead", "attempts", "next_attempt_at", ...})
+    """
+    retryable = is_retryable(exc)
+    now = time.time()
+
+    with _writing() as data:
+        jid = job_id(post_id, platform)
+        job = data["jobs"].get(jid) or {
+            "id": jid,
+            "post_id": post_id,
+            "platform": platform,
+            "client": client,
+            "attempts": 0,
+            "created_at": _utcnow_iso(),
+        }
+        job["attempts"] += 1
+        job["last_error"] = str(exc)[:1000]
+        job["retryable"] = retryable
+        job["updated_at"] = _utcnow_iso()
+
+        if retryable and job["attempts"] < MAX_ATTEMPTS:
+            job["state"] = "pending"
+            job["next_attempt_ts"] = now + backoff_seconds(job["attempts"])
+        else:
+            job["state"] = "dead"
+            job["next_attempt_ts"] = None
+            logger.warning(
+                f"[PublishQueue] ☠️ Dead-Letter {jid} nach {job['attempts']} Versuch(en): {job['last_error'][:200]}"
+            )
+
+        data["jobs"][jid] = job
+
+    if job["state"] == "pending":
+        wakeup.notify()
+    return dict(job)
+
+
+def record_success(post_id: str, platform: str) -> None:
+    jid = job_id(post_id, platform)
+    if jid not in _read()["jobs"]:
+        return
+    with _writing() as data:
+        data["jobs"].pop(jid, None)
+
+
+def redrive(jid: Optional[str] = None) -> List[str]:
+    """
+    Dead-Letter → sofort wieder fällig (Versuche zurückgesetzt).
+    jid=None → alle Dead-Letter.
+    """
+    with _writing() as data:
+        moved = []
+        for job in data["jobs"].values():
+            if job.get("state") != "dead" or (jid and job["id"] != jid):
+                continue
+            job["state"] = "pending"
+            job["attempts"] = 0
+            job["next_attempt_ts"] = time.time()
+            job["updated_at"] = _utcnow_iso()
+            moved.append(job["id"])
+
+    if moved:
+        wakeup.notify()
+    return moved
+
+
+# ============================================================
+# 🔍 READ
+# ============================================================
+
+def list_jobs(state: Optional[str] = None) -> List[Dict[str, Any]]:
+    jobs = _read()["jobs"].values()
+    return [j for j in jobs if state is None or j.get("state") == state]
+
+
+def job_state(post_id: str, platform: str) -> Optional[str]:
+    job = _read()["jobs"].get(job_id(post_id, platform))
+    return job.get("state") if job else None
+
+
+def due_jobs(now: Optional[float] = None) -> List[Dict[str, Any]]:
+    now = time.time() if now is None else now
+    jobs = [
+        j for j in list_jobs("pending")
+        if j.get("next_attempt_ts") is not None and j["next_attempt_ts"] <= now
+    ]
+    return sorted(jobs, key=lambda j: j["next_attempt_ts"])
+
+
+def next_retry_at() -> Optional[datetime]:
+    ts = [j["next_attempt_ts"] for j in list_jobs("pending") if j.get("next_attempt_ts") is not None]
+    return datetime.fromtimestamp(min(ts), timezone.utc) if ts else None
@@ -0,0 +1,208 @@
+"""
+📊 Scheduler Metrics (In-Process-Registry → JSON-Datei + Prometheus-Text)
+----------------------------------------------------------------------
+- Tick: Dauer (Histogramm + letzter Wert), gescannte Clients, Ticks gesamt
+- Due-Backlog pro Client (Gauge, Stand des letzten Ticks)
+- Schedule-Lag pro Plattform: now - Plattform-Termin beim Feuern
+- Publish-Latenz pro Plattform (Histogramm)
+- Fehler nach Klasse (Exception-Name bzw. Worker-Phase)
+- Jeder Worker schreibt nach dem Tick runtime/metrics/scheduler-<worker>.json
+  (mehrere Worker → mehrere Dateien); api/scheduler_metrics.py liest sie
+  und rendert sie als JSON oder Prometheus-Text
+- "written_at" = Heartbeat (jeder Tick, spätestens alle
+  SCHEDULER_POLL_SECONDS); Dateien älter als SCHEDULER_METRICS_TTL_SECONDS
+  (beendete Worker, alte hostname:pid) werden beim Lesen übersprungen
+  und gelöscht
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.fs_utils import atomic_write_text
+
+BASE_DIR = Path(__file__).resolve().parents[1]  # backend/
+METRICS_DIR = Path(os.getenv("SCHEDULER_METRICS_DIR", str(BASE_DIR / "runtime" / "metrics")))
+FILE_PREFIX = "scheduler-"
+TTL_SECONDS = float(os.getenv("SCHEDULER_METRICS_TTL_SECONDS", "300"))
+
+# Histogramm-Grenzen in Sekunden (+Inf implizit)
+TICK_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+LAG_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 900, 3600)
+PUBLISH_BUCKETS = (0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_lock = threading.Lock()
+_state: Dict[str, Any] = {}
+
+
+def _new_histogram(bounds) -> Dict[str, Any]:
+    return {"bounds": list(bounds), "counts": [0] * (len(bounds) + 1), "sum": 0.0, "count": 0}
+
+
+def _observe(hist: Dict[str, Any], value: float) -> None:
+    i = 0
+    while i < len(hist["bounds"]) and value > hist["bounds"][i]:
+        i += 1
+    hist["counts"][i] += 1
+    hist["sum"] += value
+    hist["count"] += 1
+
+
+def reset() -> None:
+    with _lock:
+        _state.clear()
+        _state.update({
+            "started_at": time.time(),
+            "ticks_total": 0,
+            "last_tick_ts": None,
+            "last_tick_seconds": None,
+            "clients_scanned": 0,
+            "due_backlog": {},
+            "tick_seconds": _new_histogram(TICK_BUCKETS),
+            "schedule_lag_seconds": {},
+            "publish_seconds": {},
+            "errors_total": {},
+        })
+
+
+reset()
+
+
+# ============================================================
+# ✍️ OBSERVE
+# ============================================================
+
+def observe_tick(duration: float, clients: int, backlog: Dict[str, int]) -> None:
+    with _lock:
+        _state["ticks_total"] += 1
+        _state["last_tick_ts"] = time.time()
+        _state["last_tick_seconds"] = duration
+        _state["clients_scanned"] = clients
+        _state["due_backlog"] = dict(backlog)
+        _observe(_state["tick_seconds"], duration)
+
+
+def observe_lag(platform: str, seconds: float) -> None:
+    with _lock:
+        hist = _state["schedule_lag_seconds"].setdefault(platform, _new_histogram(LAG_BUCKETS))
+        _observe(hist, max(0.0, seconds))
+
+
+def observe_publish(platform: str, seconds: float) -> None:
+    with _lock:
+        hist = _state["publish_seconds"].setdefault(platform, _new_histogram(PUBLISH_BUCKETS))
+        _observe(hist, seconds)
+
+
+def count_error(kind) -> None:
+    """
+    kind: Exception (→ Klassenname) oder Phase als String (z.B. "load_posts").
+    """
+    name = kind if isinstance(kind, str) else type(kind).__name__
+    with _lock:
+        _state["errors_total"][name] = _state["errors_total"].get(name, 0) + 1
+
+
+def snapshot() -> Dict[str, Any]:
+    with _lock:
+        return json.loads(json.dumps(_state))
+
+
+# ============================================================
+# 💾 EXPORT
+# ============================================================
+
+def _file_for(worker_id: str) -> Path:
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", worker_id)
+    return METRICS_DIR / f"{FILE_PREFIX}{safe}.json"
+
+
+def write(worker_id: str) -> Path:
+    data = snapshot()
+    data["worker"] = worker_id
+    data["written_at"] = time.time()
+    path = _file_for(worker_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(path, json.dumps(data, ensure_ascii=False, indent=2))
+    return path
+
+
+def _prune(path: Path) -> None:
+    try:
+        path.unlink()
+    except OSError:
+        pass  # schon weg / anderer Leser war schneller
+
+
+def read_all(now: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Snapshots aller lebenden Worker (Heartbeat jünger als TTL_SECONDS).
+    """
+    now = time.time() if now is None else now
+    out = []
+    for path in sorted(METRICS_DIR.glob(f"{FILE_PREFIX}*.json")):
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue  # halb geschrieben / gelöscht → nächster Scrape
+
+        written_at = data.get("written_at") if isinstance(data, dict) else None
+        if not isinstance(written_at, (int, float)) or now - written_at > TTL_SECONDS:
+            _prune(path)  # Worker beendet → nicht weiter exportieren
+            continue
+        out.append(data)
+    return out
+
+
+def _labels(**labels) -> str:
+    parts = [f'{k}="{str(v)}"' for k, v in labels.items() if v is not None]
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _histogram_lines(name: str, hist: Dict[str, Any], **labels) -> List[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(hist["bounds"] + ["+Inf"], hist["counts"]):
+        cumulative += count
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+    lines.append(f"{name}_sum{_labels(**labels)} {hist['sum']}")
+    lines.append(f"{name}_count{_labels(**labels)} {hist['count']}")
+    return lines
+
+
+def render_prometheus(snapshots: Optional[List[Dict[str, Any]]] = None) -> str:
+    snapshots = read_all() if snapshots is None else snapshots
+    lines = [
+        "# TYPE scheduler_ticks_total counter",
+        "# TYPE scheduler_last_tick_seconds gauge",
+        "# TYPE scheduler_last_tick_timestamp gauge",
+        "# TYPE scheduler_clients_scanned gauge",
+        "# TYPE scheduler_due_backlog gauge",
+        "# TYPE scheduler_tick_seconds histogram",
+        "# TYPE scheduler_schedule_lag_seconds histogram",
+        "# TYPE scheduler_publish_seconds histogram",
+        "# TYPE scheduler_errors_total counter",
+    ]
+
+    for snap in snapshots:
+        w = snap.get("worker")
+        lines.append(f"scheduler_ticks_total{_labels(worker=w)} {snap['ticks_total']}")
+        if snap.get("last_tick_seconds") is not None:
+            lines.append(f"scheduler_last_tick_seconds{_labels(worker=w)} {snap['last_tick_seconds']}")
+            lines.append(f"scheduler_last_tick_timestamp{_labels(worker=w)} {snap['last_tick_ts']}")
+        lines.append(f"scheduler_clients_scanned{_labels(worker=w)} {snap['clients_scanned']}")
+        for client, n in sorted(snap["due_backlog"].items()):
+            lines.append(f"scheduler_due_backlog{_labels(worker=w, client=client)} {n}")
+        lines += _histogram_lines("scheduler_tick_seconds", snap["tick_seconds"], worker=w)
+        for pf, hist in sorted(snap["schedule_lag_seconds"].items()):
+            lines += _histogram_lines("scheduler_schedule_lag_seconds", hist, worker=w, platform=pf)
+        for pf, hist in sorted(snap["publish_seconds"].items()):
+            lines += _histogram_lines("scheduler_publish_seconds", hist, worker=w, platform=pf)
+        for cls, n in sorted(snap["errors_total"].items()):
+            lines.append(f"scheduler_errors_total{_labels(worker=w, error_class=cls)} {n}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,134 @@
+"""
+⏰ Scheduler Wakeup (Unix-Datagram-Socket)
+-----------------------------------------
+- Scheduler: listen() + wait(timeout) → schläft bis Timeout ODER Notify
+- Writer (post_store, andere Prozesse): notify() nach Änderungen am
+  Due-Index (neuer/verschobener Termin)
+- Best effort: kein Listener / kein AF_UNIX → notify() ist ein No-op,
+  wait() fällt auf time.sleep() zurück
+- Ein Listener pro Socket-Pfad: hört schon ein anderer Prozess, bleibt
+  der zweite beim Sleep-Fallback (kein Übernehmen des Sockets)
+"""
+
+import os
+import select
+import socket
+import time
+from pathlib import Path
+from typing import Optional
+
+from core.logger import logger
+
+BASE_DIR = Path(__file__).resolve().parents[1]  # backend/
+SOCKET_PATH = Path(os.getenv("SCHEDULER_WAKE_SOCKET", str(BASE_DIR / "runtime" / "scheduler.sock")))
+
+_listener: Optional[socket.socket] = None
+
+
+def notify() -> None:
+    if not hasattr(socket, "AF_UNIX"):
+        return
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as s:
+            s.setblocking(False)
+            s.sendto(b"1", str(SOCKET_PATH))
+    except OSError:
+        # kein Scheduler aktiv / Puffer voll → er wacht ohnehin auf
+        pass
+
+
+def _in_use() -> bool:
+    """
+    Connect-Probe: True → ein anderer Prozess hört auf SOCKET_PATH.
+    """
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    try:
+        probe.connect(str(SOCKET_PATH))
+    except (FileNotFoundError, ConnectionRefusedError):
+        return False  # keine Datei bzw. verwaist (Listener abgestürzt)
+    except OSError:
+        return True  # z.B. keine Rechte → nicht anfassen
+    finally:
+        probe.close()
+    return True
+
+
+def listen() -> bool:
+    """
+    Bindet den Wake-Socket. Eine verwaiste Socket-Datei wird ersetzt,
+    ein aktiver Listener nicht.
+    """
+    global _listener
+    if _listener is not None:
+        return True
+    if not hasattr(socket, "AF_UNIX"):
+        return False
+
+    try:
+        SOCKET_PATH.parent.mkdir(parents=True, exist_ok=True)
+        if _in_use():
+            logger.info(f"[Wakeup] ℹ️ {SOCKET_PATH} hat schon einen Listener → Fallback auf Sleep")
+            return False
+        try:
+            SOCKET_PATH.unlink()
+        except FileNotFoundError:
+            pass
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        s.bind(str(SOCKET_PATH))
+        s.setblocking(False)
+    except OSError as e:
+        logger.warning(f"[Wakeup] ⚠️ Socket nicht verfügbar ({e}) → Fallback auf Sleep")
+        return False
+
+    _listener = s
+    return True
+
+
+def close() -> None:
+    global _listener
+    if _listener is None:
+        return
+    _listener.close()
+    _listener = None
+    try:
+        SOCKET_PATH.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def fileno() -> Optional[int]:
+    """
+    FD des Listeners (für Event-Loops, z.B. scheduler/supervisor.py).
+    """
+    return _listener.fileno() if _listener is not None else None
+
+
+def drain() -> bool:
+    """
+    Liest alle anstehenden Notifies (mehrere Notifies = ein Aufwachen).
+    """
+    woken = False
+    while _listener is not None:
+        try:
+            _listener.recv(64)
+            woken = True
+        except (BlockingIOError, InterruptedError):
+            break
+    return woken
+
+
+def wait(timeout: float) -> bool:
+    """
+    True → durch notify() geweckt, False → Timeout.
+    """
+    timeout = max(0.0, timeout)
+    if _listener is None:
+        time.sleep(timeout)
+        return False
+
+    ready, _, _ = select.select([_listener], [], [], timeout)
+    if not ready:
+        return False
+
+    drain()
+    return True
@@ -14,7 +14,7 @@ from core.logger import logger
 from core.preview_mockup import create_platform_mockup
 from core.branding_renderer import apply_branding
 from core.client_config import load_client_config
-from core.post_store import add_post
+from core.post_store import add_post, transaction
 from core.caption_builder import build_caption
 
 # ==================================================
@@ -204,9 +204,13 @@ def run_workflow(
 
     if mode == "week":
         created = {}
+        # 🔑 Unit of Work = ein Tag: dessen add_post-Aufrufe → EIN Store-Write;
+        # Fehler an Tag N verwirft nur Tag N, fertige Tage bleiben gespeichert
         for day, entries in weekly_plan.items():
             cats = _extract_content_categories(entries)
-            if cats:
+            if not cats:
+                continue
+            with transaction():
                 created[day] = [create_single_post(client, cats[0])]
         return {"created": created}
 
@@ -1,25 +1,32 @@
-from __future__ import annotations
-from core.platform_times import build_platform_times
 """
 🗓️ IntelliAgent – Approval → Scheduling
 --------------------------------------
 - Liest approved Posts
-- Nutzt weekly_plan.json (content_category-basiert)
+- Nutzt weekly_plan.json (content_category-basiert), vorkompiliert als
+  Index content_category → Slots (Cache bis sich die Datei ändert)
 - Unterstützt publish_time pro Regel
 - Unterstützt fallback mapping (z.B. manual -> service)
-- Setzt publish_at + status = scheduled
+- Batch-Allokation: alle approved Posts in EINEM Durchlauf,
+  mit Slot-Kapazität ("capacity" pro Regel / "slot_capacity"),
+  Mindestabstand ("min_spacing_minutes") und bereits geplanten Posts
+- Setzt publish_at + status = scheduled – alle Zuweisungen in EINEM Write
 - KEIN Publish
 - KEIN Meta
 """
 
+from __future__ import annotations
 
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
+import bisect
 import json
-from typing import Any, Dict, Optional, Tuple
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from core.logger import logger
-from core.post_store import get_posts, update_post
+from core.platform_times import build_platform_times
+from core.post_model import parse_iso_utc
+from core.post_store import get_posts, update_posts_many
 
 # =====================================================
 # CONFIG
@@ -28,6 +35,14 @@ from core.post_store import get_posts, update_post
 CLIENT = "mtm_client"
 DEFAULT_TIME = "09:00"  # fallback, falls rule kein publish_time hat
 
+# Slot-Regeln (weekly_plan.json kann sie überschreiben)
+DEFAULT_SLOT_CAPACITY = int(os.getenv("APPROVAL_SLOT_CAPACITY", "1"))
+DEFAULT_MIN_SPACING_MINUTES = int(os.getenv("APPROVAL_MIN_SPACING_MINUTES", "60"))
+HORIZON_WEEKS = int(os.getenv("APPROVAL_HORIZON_WEEKS", "4"))
+
+# Posts mit diesen Stati belegen ihren publish_at-Slot
+OCCUPYING_STATUSES = {"scheduled", "publishing", "retrying", "scheduled_manual"}
+
 BASE_DIR = Path(__file__).resolve().parents[2]
 WEEKLY_PLAN_PATH = (
     BASE_DIR
@@ -70,32 +85,6 @@ def _parse_time_hhmm(time_str: str) -> Tuple[int, int]:
         return _parse_time_hhmm(DEFAULT_TIME)
 
 
-def next_datetime_for_day(day_name: str, time_str: str) -> datetime:
-    """
-    Berechnet den nächsten Zeitpunkt für einen Wochentag + Uhrzeit (UTC).
-    - Wenn target_day == heute UND Uhrzeit noch in Zukunft => heute.
-    - Sonst nächster passender Wochentag.
-    """
-    now = datetime.now(timezone.utc)
-    day_key = day_name.lower().strip()
-    target_weekday = WEEKDAYS[day_key]
-
-    hour, minute = _parse_time_hhmm(time_str)
-
-    # Baseline: heute mit Zielzeit
-    candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-
-    days_ahead = (target_weekday - now.weekday()) % 7
-
-    if days_ahead == 0:
-        # Heute: nur heute nehmen, wenn candidate in Zukunft ist, sonst nächste Woche
-        if candidate <= now:
-            days_ahead = 7
-    # falls nicht heute: candidate + days_ahead
-    scheduled = candidate + timedelta(days=days_ahead)
-    return scheduled
-
-
 def _rule_matches_post(rule: Dict[str, Any], post: Dict[str, Any]) -> bool:
     """
     Match-Regeln:
@@ -114,30 +103,6 @@ def _rule_matches_post(rule: Dict[str, Any], post: Dict[str, Any]) -> bool:
     return True
 
 
-def find_best_rule_for_post(weekly_plan: Dict[str, Any], post: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
-    """
-    Gibt (day, rule) zurück.
-    1) Best match: content_category + alle optional constraints (service_type/image_context/category)
-    2) Fallback match: nur content_category
-    """
-    week = weekly_plan.get("week", {}) or {}
-
-    # 1) strict match
-    for day, rules in week.items():
-        for rule in rules or []:
-            if _rule_matches_post(rule, post):
-                return day, rule
-
-    # 2) loose match (nur content_category)
-    cc = post.get("content_category")
-    for day, rules in week.items():
-        for rule in rules or []:
-            if rule.get("content_category") == cc:
-                return day, rule
-
-    return None
-
-
 def apply_fallback_content_category(weekly_plan: Dict[str, Any], post: Dict[str, Any]) -> Optional[str]:
     """
     weekly_plan kann ein fallback dict enthalten:
@@ -165,63 +130,211 @@ def _utcnow_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+# =====================================================
+# PLAN INDEX (content_category → Slots)
+# =====================================================
+
+_plan_cache: Dict[str, Any] = {"sig": None, "index": None}
+
+
+def compile_plan(weekly_plan: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    weekly_plan.json → { by_category: {cc: [slot]}, fallback, min_spacing }
+    slot = {day, rule, weekday, hour, minute, capacity}
+    """
+    default_capacity = int(weekly_plan.get("slot_capacity") or DEFAULT_SLOT_CAPACITY)
+    by_category: Dict[str, List[Dict[str, Any]]] = {}
+
+    for day, rules in (weekly_plan.get("week") or {}).items():
+        weekday = WEEKDAYS.get(str(day).lower().strip())
+        if weekday is None:
+            logger.warning(f"[ApprovalScheduler] ⚠️ Unbekannter Wochentag im weekly_plan: {day}")
+            continue
+
+        for rule in rules or []:
+            cc = rule.get("content_category")
+            if not cc:
+                continue
+            hour, minute = _parse_time_hhmm(rule.get("publish_time") or DEFAULT_TIME)
+            by_category.setdefault(cc, []).append({
+                "day": day,
+                "rule": rule,
+                "weekday": weekday,
+                "hour": hour,
+                "minute": minute,
+                "capacity": max(1, int(rule.get("capacity") or default_capacity)),
+            })
+
+    return {
+        "by_category": by_category,
+        "fallback": weekly_plan.get("fallback") or {},
+        "min_spacing": timedelta(
+            minutes=int(weekly_plan.get("min_spacing_minutes", DEFAULT_MIN_SPACING_MINUTES))
+        ),
+    }
+
+
+def load_plan_index() -> Dict[str, Any]:
+    if not WEEKLY_PLAN_PATH.exists():
+        raise FileNotFoundError(f"weekly_plan.json fehlt: {WEEKLY_PLAN_PATH}")
+
+    st = WEEKLY_PLAN_PATH.stat()
+    sig = (st.st_mtime_ns, st.st_size)
+    if _plan_cache["sig"] != sig:
+        _plan_cache["index"] = compile_plan(load_weekly_plan())
+        _plan_cache["sig"] = sig
+    return _plan_cache["index"]
+
+
+def _slots_for_post(index: Dict[str, Any], post: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    1) Best match: content_category + alle optional constraints
+    2) Fallback match: nur content_category
+    3) fallback mapping (manual/finished_work/etc.)
+    """
+    slots = index["by_category"].get(post.get("content_category"))
+    if not slots:
+        fb_cc = apply_fallback_content_category(index, post)
+        if not fb_cc:
+            return []
+        logger.info(f"[ApprovalScheduler] ↪️ Fallback content_category: {post.get('content_category')} → {fb_cc} (post {post.get('id')})")
+        post = {**post, "content_category": fb_cc}  # nicht mutieren
+        slots = index["by_category"].get(fb_cc) or []
+
+    strict = [slot for slot in slots if _rule_matches_post(slot["rule"], post)]
+    return strict or slots
+
+
+def _occurrences(slot: Dict[str, Any], now: datetime, weeks: int) -> Iterator[datetime]:
+    """
+    Nächste Termine eines Slots (heute nur, wenn die Uhrzeit noch kommt).
+    """
+    first = now.replace(hour=slot["hour"], minute=slot["minute"], second=0, microsecond=0)
+    first += timedelta(days=(slot["weekday"] - now.weekday()) % 7)
+    if first <= now:
+        first += timedelta(days=7)
+    for week in range(weeks):
+        yield first + timedelta(weeks=week)
+
+
+def _place_in_slot(
+    slot_time: datetime,
+    capacity: int,
+    spacing: timedelta,
+    taken: List[datetime],
+) -> Optional[datetime]:
+    """
+    Freier Zeitpunkt im Slot: slot_time + k * spacing (k < capacity),
+    mit Mindestabstand zu allen belegten Zeitpunkten.
+    """
+    if not spacing:
+        used = bisect.bisect_right(taken, slot_time) - bisect.bisect_left(taken, slot_time)
+        return slot_time if used < capacity else None
+
+    for k in range(capacity):
+        t = slot_time + k * spacing
+        i = bisect.bisect_left(taken, t)
+        if i < len(taken) and taken[i] - t < spacing:
+            continue
+        if i > 0 and t - taken[i - 1] < spacing:
+            continue
+        return t
+    return None
+
+
+def allocate_slots(
+    index: Dict[str, Any],
+    posts: List[Dict[str, Any]],
+    occupied: List[datetime],
+    now: Optional[datetime] = None,
+    weeks: int = HORIZON_WEEKS,
+) -> Dict[str, datetime]:
+    """
+    Batch-Allokation in Reihenfolge von `posts`: jeder Post bekommt den
+    frühesten freien Termin seiner Slots. -> { post_id: publish_at }
+    """
+    now = now or datetime.now(timezone.utc)
+    spacing = index["min_spacing"]
+    taken = sorted(occupied)
+    assignments: Dict[str, datetime] = {}
+
+    for post in posts:
+        slots = _slots_for_post(index, post)
+        candidates = sorted(
+            (t, i) for i, slot in enumerate(slots) for t in _occurrences(slot, now, weeks)
+        )
+        for slot_time, i in candidates:
+            t = _place_in_slot(slot_time, slots[i]["capacity"], spacing, taken)
+            if t is not None:
+                bisect.insort(taken, t)
+                assignments[post["id"]] = t
+                break
+
+    return assignments
+
+
+def _occupied_times(posts: List[Dict[str, Any]], since: datetime) -> List[datetime]:
+    out = []
+    for p in posts:
+        if str(p.get("status") or "").lower() not in OCCUPYING_STATUSES:
+            continue
+        dt = parse_iso_utc(p.get("publish_at"))
+        if dt is not None and dt >= since:
+            out.append(dt)
+    return out
+
+
 # =====================================================
 # MAIN LOGIC
 # =====================================================
 
-def run_approval_scheduler():
+def run_approval_scheduler() -> Dict[str, Any]:
     logger.info("🗓️ Approval Scheduler gestartet")
 
-    weekly_plan = load_weekly_plan()
-    posts = get_posts(CLIENT)
+    index = load_plan_index()
+    now = datetime.now(timezone.utc)
+    posts = get_posts(CLIENT, sync=False)
 
+    approved = []
     for post in posts:
         if post.get("status") != "approved":
             continue
-
         if not post.get("content_category"):
             logger.warning(f"[ApprovalScheduler] ❌ Post {post.get('id')} hat keine content_category")
             continue
+        approved.append(post)
 
-        # Versuch 1: direktes Matching
-        match = find_best_rule_for_post(weekly_plan, post)
-
-        # Versuch 2: fallback mapping (manual/finished_work/etc.)
-        if not match:
-            fb_cc = apply_fallback_content_category(weekly_plan, post)
-            if fb_cc:
-                original = post.get("content_category")
-                post = dict(post)  # nicht mutieren
-                post["content_category"] = fb_cc
-                logger.info(f"[ApprovalScheduler] ↪️ Fallback content_category: {original} → {fb_cc} (post {post.get('id')})")
-                match = find_best_rule_for_post(weekly_plan, post)
-
-        if not match:
-            logger.warning(f"[ApprovalScheduler] ❌ Kein Slot für content_category {post.get('content_category')} (post {post.get('id')})")
-            continue
-
-        day, rule = match
-        publish_time = rule.get("publish_time") or DEFAULT_TIME
+    # älteste Freigabe zuerst → bekommt den frühesten Slot
+    approved.sort(key=lambda p: (str(p.get("updated_at") or p.get("created_at") or ""), p["id"]))
 
-        try:
-            publish_at = next_datetime_for_day(day, publish_time)
-
-            update_post(
-                post["id"],
-                {
-                    "status": "scheduled",
-                    "platform_times": build_platform_times(),
-                    "publish_at": publish_at.isoformat(),
-                    "updated_at": _utcnow_iso(),
-                },
-            )
+    occupied = _occupied_times(posts, now - index["min_spacing"])
+    assignments = allocate_slots(index, approved, occupied, now)
 
-            logger.info(
-                f"[ApprovalScheduler] ✅ Scheduled {post['id']} → {day} {publish_at.isoformat()} (time={publish_time})"
+    for post in approved:
+        if post["id"] not in assignments:
+            logger.warning(
+                f"[ApprovalScheduler] ❌ Kein freier Slot für content_category {post.get('content_category')} (post {post.get('id')})"
             )
 
-        except Exception as e:
-            logger.error(f"[ApprovalScheduler] ❌ Fehler bei {post.get('id')}: {e}")
+    # 🔑 alle Zuweisungen in EINEM Write
+    if assignments:
+        update_posts_many({
+            post_id: {
+                "status": "scheduled",
+                "platform_times": build_platform_times(publish_at),
+                "publish_at": publish_at.isoformat(),
+                "updated_at": _utcnow_iso(),
+            }
+            for post_id, publish_at in assignments.items()
+        })
+
+    for post_id, publish_at in assignments.items():
+        logger.info(f"[ApprovalScheduler] ✅ Scheduled {post_id} → {publish_at.isoformat()}")
+
+    return {
+        "scheduled": len(assignments),
+        "unassigned": [p["id"] for p in approved if p["id"] not in assignments],
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,79 @@
+"""
+🧊 IntelliAgent Archive Worker (STABLE, Minimal)
+-----------------------------------------------
+- Verschiebt posted/published Posts, älter als ARCHIVE_AFTER_DAYS,
+  aus dem Hot-Store ins Cold-Archiv (core/post_archive.py)
+- Reihenfolge: erst archivieren, dann aus dem Hot-Store entfernen
+  (Crash dazwischen → Post kurz doppelt, Hot-Store gewinnt)
+- Loop-fähig für Render Worker
+- RUN_ONCE=1 für lokalen Test
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from core.logger import logger
+from core import post_archive, post_store
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+
+
+def _archivable(posts: List[Dict[str, Any]], cutoff: datetime) -> List[Dict[str, Any]]:
+    out = []
+    for p in posts:
+        if not post_archive.is_terminal(p):
+            continue
+        done_at = post_archive.archived_at(p)
+        if done_at is not None and done_at < cutoff:
+            out.append(p)
+    return out
+
+
+def archive_client(client: str, older_than_days: int = ARCHIVE_AFTER_DAYS) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    posts = _archivable(post_store.get_posts(client, sync=False), cutoff)
+    if not posts:
+        return 0
+
+    post_archive.archive_posts(client, posts)
+    return post_store.remove_posts(client, [p["id"] for p in posts])
+
+
+def run_once() -> Dict[str, Any]:
+    archived = 0
+    errors = 0
+
+    for client in post_store.list_clients():
+        try:
+            count = archive_client(client)
+            if count:
+                logger.info(f"[ArchiveWorker] 🧊 client={client} archiviert={count}")
+            archived += count
+        except Exception as e:
+            errors += 1
+            logger.error(f"[ArchiveWorker] ❌ Fehler bei client={client}: {e}")
+
+    return {"archived": archived, "errors": errors}
+
+
+def loop(poll_seconds: int = 86400):
+    logger.info(f"[ArchiveWorker] 🔁 Worker gestartet | poll_seconds={poll_seconds}")
+
+    while True:
+        summary = run_once()
+        logger.info(f"[ArchiveWorker] 📊 archived={summary['archived']} errors={summary['errors']}")
+
+        if os.getenv("RUN_ONCE", "") == "1":
+            logger.info("[ArchiveWorker] 🧪 RUN_ONCE=1 -> exit")
+            return
+
+        time.sleep(poll_seconds)
+
+
+if __name__ == "__main__":
+    poll = int(os.getenv("ARCHIVE_POLL_SECONDS", "86400"))  # default: 1x täglich
+    loop(poll_seconds=poll)
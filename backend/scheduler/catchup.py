@@ -0,0 +1,184 @@
+"""
+⏪ Catch-up-Policy für den Scheduler Worker
+-----------------------------------------
+Nach Downtime (Restart/Deploy) liegen viele Posts gleichzeitig im
+Due-Index. Statt sie back-to-back zu feuern:
+- nur Catch-up-Posts (fällig seit mehr als SCHEDULER_CATCHUP_AFTER_SECONDS)
+  werden gedrosselt; pünktliche Posts gehen ohne Burst-Limit und Abstand:
+  - Burst: max. SCHEDULER_MAX_BURST Catch-up-Posts pro
+    SCHEDULER_BURST_WINDOW_SECONDS (gleitendes Fenster, über alle Clients)
+  - Abstand: min. SCHEDULER_ACCOUNT_SPACING_SECONDS zwischen einem
+    Catch-up-Post und dem letzten Post desselben Clients (Account)
+- Stark überfällig (> SCHEDULER_OVERDUE_HOURS, noch keine Plattform
+  veröffentlicht) → SCHEDULER_OVERDUE_ACTION:
+    reschedule → gleiche Uhrzeit am nächsten möglichen Tag
+    skip       → status "missed" (Dashboard entscheidet)
+    publish    → normal posten (altes Verhalten)
+- Zurückgestellte Posts bleiben "scheduled" und fällig; deferred_until()
+  sagt dem Worker, wann der nächste Slot frei wird
+- refund(): Slots gewählter Posts, die ein anderer Worker geclaimt hat,
+  gehen zurück ins Budget
+- Zustand pro Prozess (ein Supervisor/Worker pro Deployment)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from core.platform_times import build_platform_times, next_platform_due_ts, platform_done, post_platforms
+from core.post_model import iso_to_ts, parse_iso_utc
+
+MAX_BURST = int(os.getenv("SCHEDULER_MAX_BURST", "5"))
+BURST_WINDOW_SECONDS = float(os.getenv("SCHEDULER_BURST_WINDOW_SECONDS", "60"))
+ACCOUNT_SPACING_SECONDS = float(os.getenv("SCHEDULER_ACCOUNT_SPACING_SECONDS", "120"))
+CATCHUP_AFTER_SECONDS = float(os.getenv("SCHEDULER_CATCHUP_AFTER_SECONDS", "300"))
+OVERDUE_HOURS = float(os.getenv("SCHEDULER_OVERDUE_HOURS", "6"))
+OVERDUE_ACTION = os.getenv("SCHEDULER_OVERDUE_ACTION", "reschedule").strip().lower()
+
+MISSED_STATUS = "missed"
+
+_lock = threading.Lock()
+_fired: Deque[float] = deque()          # Zeitpunkte der letzten Posts (Burst-Fenster)
+_last_by_client: Dict[str, float] = {}  # letzter Post pro Client
+_deferred_until: Optional[float] = None
+_booked: Dict[str, Tuple[str, bool]] = {}        # letzte Auswahl: post_id → (client, Burst-Slot)
+_last_before: Dict[str, Optional[float]] = {}    # _last_by_client vor der letzten Auswahl
+
+
+def reset() -> None:
+    global _deferred_until
+    with _lock:
+        _fired.clear()
+        _last_by_client.clear()
+        _booked.clear()
+        _last_before.clear()
+        _deferred_until = None
+
+
+# ============================================================
+# ⏰ ÜBERFÄLLIG
+# ============================================================
+
+def due_ts(post: Dict[str, Any]) -> Optional[float]:
+    ts = next_platform_due_ts(post)
+    return ts if ts is not None else iso_to_ts(post.get("publish_at"))
+
+
+def overdue_patch(post: Dict[str, Any], now_utc: datetime) -> Optional[Dict[str, Any]]:
+    """
+    None → normal posten. Sonst Patch für skip / reschedule.
+    Teilweise veröffentlichte Posts werden immer fertig gepostet.
+    """
+    if OVERDUE_ACTION not in ("reschedule", "skip"):
+        return None
+    if any(platform_done(post, pf) for pf in post_platforms(post)):
+        return None
+
+    ts = due_ts(post)
+    if ts is None or now_utc.timestamp() - ts <= OVERDUE_HOURS * 3600:
+        return None
+
+    now_iso = now_utc.isoformat()
+    if OVERDUE_ACTION == "skip":
+        return {"status": MISSED_STATUS, "missed_at": now_iso, "updated_at": now_iso}
+
+    publish_at = parse_iso_utc(post.get("publish_at")) or now_utc
+    days = (now_utc - publish_at).days + 1
+    new_at = publish_at + timedelta(days=days)
+    return {
+        "publish_at": new_at.isoformat(),
+        "platform_times": build_platform_times(new_at),
+        "rescheduled_from": post.get("publish_at"),
+        "updated_at": now_iso,
+    }
+
+
+# ============================================================
+# 🚦 BURST + ABSTAND PRO ACCOUNT
+# ============================================================
+
+def select(posts: List[Dict[str, Any]], now_ts: Optional[float] = None) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    -> (jetzt posten, Anzahl zurückgestellt). Reihenfolge = Due-Reihenfolge.
+    Die Auswahl wird sofort als "gefeuert" verbucht (refund() nimmt
+    nicht geclaimte Posts wieder heraus).
+    """
+    global _deferred_until
+    now_ts = time.time() if now_ts is None else now_ts
+
+    with _lock:
+        while _fired and now_ts - _fired[0] >= BURST_WINDOW_SECONDS:
+            _fired.popleft()
+
+        selected: List[Dict[str, Any]] = []
+        wake: List[float] = []
+        _booked.clear()
+        _last_before.clear()
+
+        for post in posts:
+            client = str(post.get("client") or "")
+            last = _last_by_client.get(client)
+            ts = due_ts(post)
+            catching_up = ts is not None and now_ts - ts > CATCHUP_AFTER_SECONDS
+
+            if catching_up:
+                if len(_fired) >= MAX_BURST:
+                    wake.append(_fired[0] + BURST_WINDOW_SECONDS)
+                    continue
+                if last is not None and now_ts - last < ACCOUNT_SPACING_SECONDS:
+                    wake.append(last + ACCOUNT_SPACING_SECONDS)
+                    continue
+                _fired.append(now_ts)
+
+            selected.append(post)
+            _last_before.setdefault(client, last)
+            _last_by_client[client] = now_ts
+            if post.get("id"):
+                _booked[post["id"]] = (client, catching_up)
+
+        _deferred_until = min(wake) if wake else None
+        return selected, len(posts) - len(selected)
+
+
+def refund(post_ids) -> int:
+    """
+    Gibt Burst-/Abstands-Slots der letzten Auswahl für Posts zurück, die
+    dieser Worker nicht geclaimt hat. -> Anzahl zurückgegebener Slots.
+    """
+    global _deferred_until
+    with _lock:
+        refunded = [pid for pid in dict.fromkeys(post_ids) if pid in _booked]
+        if not refunded:
+            return 0
+
+        entries = [_booked.pop(pid) for pid in refunded]
+        # Burst-Slots der letzten Auswahl liegen hinten im Fenster
+        for _ in range(sum(1 for _, burst in entries if burst)):
+            if _fired:
+                _fired.pop()
+        remaining = {client for client, _ in _booked.values()}
+        for client in {client for client, _ in entries}:
+            if client in remaining:
+                continue  # anderer Post des Clients wird gepostet
+            last = _last_before.get(client)
+            if last is None:
+                _last_by_client.pop(client, None)
+            else:
+                _last_by_client[client] = last
+
+        # zurückgestellte Posts können sofort nachrücken
+        if _deferred_until is not None:
+            _deferred_until = min(_deferred_until, time.time())
+        return len(refunded)
+
+
+def deferred_until() -> Optional[float]:
+    """
+    Timestamp, ab dem zurückgestellte Posts wieder dran sind (None = keine).
+    """
+    return _deferred_until
@@ -59,21 +59,22 @@ def create_scheduled_post(client: str, foundation_post: dict) -> None:
     if not post_id:
         raise ValueError("Foundation-Post ohne ID")
 
+    now = datetime.now(timezone.utc)
     post = {
         "id": post_id,
         "client": client,
         "source": "foundation",
         "status": "scheduled",
-            "platform_times": build_platform_times(),
+        "platform_times": build_platform_times(now),
         "platforms": foundation_post.get("platforms", ["instagram"]),
         "content_category": foundation_post.get("content_category"),
         "image_context": foundation_post.get("image_context"),
         "text": foundation_post.get("text"),
-        "publish_at": datetime.now(timezone.utc).isoformat(),
-        "created_at": datetime.now(timezone.utc).isoformat(),
+        "publish_at": now.isoformat(),
+        "created_at": now.isoformat(),
     }
 
-    post_store.save_post(post)
+    post_store.add_post(post)
     logger.info(f"[FoundationScheduler] 🧱 Post gespeichert: {post_id}")
 
 
@@ -113,23 +114,31 @@ def run_foundation_for_client(client: str) -> bool:
 # MAIN LOOP
 # -------------------------------------------------
 
-def scheduler_loop():
-    logger.info("🕓 IntelliAgent Foundation Scheduler gestartet")
+def run_once() -> bool:
+    """
+    Ein Zyklus über alle Clients. True → ein Foundation-Post wurde erzeugt.
+    """
+    for client in os.listdir(CLIENTS_DIR):
+        client_dir = CLIENTS_DIR / client
+        if not client_dir.is_dir():
+            continue
 
-    while True:
-        for client in os.listdir(CLIENTS_DIR):
-            client_dir = CLIENTS_DIR / client
-            if not client_dir.is_dir():
-                continue
+        did_run = run_foundation_for_client(client)
 
-            did_run = run_foundation_for_client(client)
+        # 🔒 Sobald ein Foundation-Post erzeugt wurde:
+        # KEIN weiterer Client in diesem Zyklus
+        if did_run:
+            logger.info("⏸ Foundation aktiv – weiterer Durchlauf pausiert")
+            return True
 
-            # 🔒 Sobald ein Foundation-Post erzeugt wurde:
-            # KEIN weiterer Client in diesem Zyklus
-            if did_run:
-                logger.info("⏸ Foundation aktiv – weiterer Durchlauf pausiert")
-                break
+    return False
 
+
+def scheduler_loop():
+    logger.info("🕓 IntelliAgent Foundation Scheduler gestartet")
+
+    while True:
+        run_once()
         time.sleep(POLL_INTERVAL_SECONDS)
 
 
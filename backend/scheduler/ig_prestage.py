@@ -0,0 +1,138 @@
+"""
+📸 IntelliAgent Instagram Pre-Stage (Container vor dem Termin)
+-------------------------------------------------------------
+- Legt den IG-Container IG_PRESTAGE_MINUTES vor dem Instagram-Termin
+  an (Upload + Verarbeitung bis FINISHED) → zum Termin läuft nur noch
+  media_publish, der Post geht auch unter Last pünktlich raus
+- Speichert am Post "ig_container": creation_id, image_url, caption,
+  created_at, expires_at (Meta verwirft Container nach 24h)
+- Abgelaufene Container oder geänderte Caption / geändertes Bild →
+  beim nächsten Lauf neu angelegt (instagram.staged_creation_id)
+- Fehlschlag → nichts gespeichert, der Worker legt den Container zum
+  Termin wie bisher selbst an
+- Kandidaten werden wie vom Worker geclaimt (Lease, status "publishing")
+  → kein zweiter Container, während ein Worker denselben Post postet;
+  zwischendurch gelöschte/archivierte Posts werden übersprungen
+- agent.py leert "ig_container" nach Publish/Fehler (STATE_FIELD des
+  Adapters) → ein Retry nutzt keinen alten Container
+- Supervisor-Job "prestage"; Loop-fähig, RUN_ONCE=1 für lokalen Test
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from core.logger import logger
+from core import post_store
+from core.platform_times import platform_due_ts, scheduled_platforms
+
+LEAD_MINUTES = float(os.getenv("IG_PRESTAGE_MINUTES", "15"))
+POLL_INTERVAL_SECONDS = int(os.getenv("IG_PRESTAGE_POLL_SECONDS", "60"))
+
+# 🔐 eigener Lease-Owner (Worker: SCHEDULER_WORKER_ID)
+OWNER = f"ig-prestage:{socket.gethostname()}:{os.getpid()}"
+
+
+def _candidates(now_utc: datetime) -> List[Dict[str, Any]]:
+    from agents.publish_agent.platforms import instagram
+
+    now_ts = now_utc.timestamp()
+    horizon = now_utc + timedelta(minutes=LEAD_MINUTES)
+
+    out = []
+    for post in post_store.get_due_posts(horizon):
+        if "instagram" not in scheduled_platforms(post):
+            continue
+        ts = platform_due_ts(post, "instagram")
+        # schon fällig → Worker legt den Container selbst an
+        if ts is None or ts <= now_ts:
+            continue
+        if instagram.staged_creation_id(post, now_ts):
+            continue
+        out.append(post)
+    return out
+
+
+def run_once(now_utc: Optional[datetime] = None) -> Dict[str, Any]:
+    from agents.publish_agent.platforms import instagram
+
+    now_utc = now_utc or datetime.now(timezone.utc)
+    candidates = _candidates(now_utc)
+    if not candidates:
+        return {"staged": 0, "errors": 0}
+
+    # 🔐 nur Posts, die gerade niemand postet (Lease hält der Worker sonst)
+    lease_seconds = instagram.CONTAINER_TIMEOUT_SECONDS + 60
+    posts = post_store.claim_posts(
+        [p["id"] for p in candidates], OWNER, lease_seconds, statuses=("scheduled",)
+    )
+    if not posts:
+        return {"staged": 0, "errors": 0}
+
+    try:
+        try:
+            results = instagram.stage(posts)
+        except RuntimeError as e:
+            # z.B. fehlende ENV → zum Termin wie bisher
+            logger.warning(f"[IGPrestage] ⚠ Übersprungen: {e}")
+            return {"staged": 0, "errors": len(posts)}
+
+        patches = {}
+        errors = 0
+        for post_id, res in results.items():
+            if isinstance(res, Exception):
+                errors += 1
+                logger.warning(f"[IGPrestage] ⚠ Container fehlgeschlagen post_id={post_id}: {res}")
+            else:
+                patches[post_id] = {"ig_container": res}
+
+        # nur das Container-Feld patchen → keine Kollision mit results/status
+        staged = _store_containers(patches)
+        if staged:
+            logger.info(f"[IGPrestage] 📸 {staged} Container vorbereitet")
+        return {"staged": staged, "errors": errors}
+    finally:
+        for post in posts:
+            post_store.release_post(post["id"], OWNER)
+
+
+def _store_containers(patches: Dict[str, Dict[str, Any]]) -> int:
+    if not patches:
+        return 0
+    try:
+        post_store.update_posts_many(patches)
+        return len(patches)
+    except KeyError:
+        pass
+
+    # Post zwischendurch gelöscht/archiviert → einzeln, fehlende überspringen
+    stored = 0
+    for post_id, patch in patches.items():
+        try:
+            post_store.update_post(post_id, patch)
+            stored += 1
+        except KeyError:
+            logger.info(f"[IGPrestage] ℹ️ Post entfernt, Container verworfen post_id={post_id}")
+    return stored
+
+
+def loop(poll_seconds: int = POLL_INTERVAL_SECONDS):
+    logger.info(f"[IGPrestage] 🔁 Worker gestartet | lead={LEAD_MINUTES:g}min poll_seconds={poll_seconds}")
+
+    while True:
+        summary = run_once()
+        logger.info(f"[IGPrestage] 📊 staged={summary['staged']} errors={summary['errors']}")
+
+        if os.getenv("RUN_ONCE", "") == "1":
+            logger.info("[IGPrestage] 🧪 RUN_ONCE=1 -> exit")
+            return
+
+        time.sleep(poll_seconds)
+
+
+if __name__ == "__main__":
+    loop()
@@ -1,19 +1,17 @@
 """
-🕓 IntelliAgent – Global Post Scheduler (PUBLISH ONLY)
-----------------------------------------------------
-- Ruft KEINEN Master
-- Erzeugt KEINEN Content
-- Published NUR gespeicherte Posts
-- Status-Flow:
-    scheduled → published
+🕓 IntelliAgent – Global Post Scheduler (DEPRECATED)
+---------------------------------------------------
+- Veraltet: Einstieg ist scheduler.supervisor (bzw. python -m scheduler.worker)
+- scheduler_loop() postet NICHT mehr selbst, sondern startet den
+  lease-basierten Worker (claim_posts / release_post) → neben einem
+  laufenden Worker/Supervisor wird kein Post doppelt veröffentlicht
+- get_due_posts() bleibt als reiner Lesezugriff erhalten
 """
 
-import time
 from datetime import datetime, timezone
 
 from core.logger import logger
-from core.post_store import get_posts
-from agents.publish_agent.agent import publish_post
+from core import post_store
 
 POLL_INTERVAL_SECONDS = 30
 CLIENT = "mtm_client"
@@ -24,59 +22,20 @@ def get_due_posts():
     Liefert alle Posts, die:
     - status == scheduled
     - publish_at <= now
+    (Due-Index im Store, älteste zuerst)
     """
-    now = datetime.now(timezone.utc)
-    due = []
-
-    posts = get_posts(CLIENT)
-
-    for post in posts:
-        if post.get("status") != "scheduled":
-            continue
-
-        publish_at = post.get("publish_at")
-        if not publish_at:
-            continue
-
-        try:
-            publish_time = datetime.fromisoformat(publish_at)
-        except Exception:
-            logger.warning(f"[Scheduler] ❌ Ungültiges publish_at: {publish_at}")
-            continue
-
-        if publish_time <= now:
-            due.append(post)
-
-    return due
+    return post_store.get_due_posts(datetime.now(timezone.utc), client=CLIENT)
 
 
 def scheduler_loop():
-    logger.info("🕓 IntelliAgent Post Scheduler gestartet")
-
-    while True:
-        try:
-            due_posts = get_due_posts()
-
-            if due_posts:
-                logger.info(f"[Scheduler] 🔔 {len(due_posts)} Posts fällig")
-
-            for post in due_posts:
-                post_id = post["id"]
-
-                try:
-                    # 🔑 EINZIGER CALL
-                    publish_post(post_id)
-
-                    logger.info(f"[Scheduler] ✅ Published: {post_id}")
-
-                except Exception as e:
-                    logger.error(f"[Scheduler] ❌ Publish-Fehler ({post_id}): {e}")
-
-        except Exception as loop_error:
-            logger.error(f"[Scheduler] ❌ Loop-Fehler: {loop_error}")
+    logger.warning(
+        "[Scheduler] ⚠ scheduler.post_scheduler ist veraltet → scheduler.supervisor; "
+        "starte den lease-basierten Worker"
+    )
+    from scheduler import worker
 
-        time.sleep(POLL_INTERVAL_SECONDS)
+    worker.loop(poll_seconds=POLL_INTERVAL_SECONDS)
 
 
 if __name__ == "__main__":
-    scheduler_loop()
\ No newline at end of file
+    scheduler_loop()
@@ -0,0 +1,291 @@
+"""
+🧭 IntelliAgent Supervisor – EIN Prozess für alle periodischen Jobs
+------------------------------------------------------------------
+- Ersetzt die einzelnen Loops (worker, foundation_scheduler,
+  analytics_worker, archive_worker, ig_prestage, Notification-Outbox)
+  und die Cron-Läufe (token_scheduler, approval_scheduler) → ein Python-Prozess,
+  ein Agent-Stack, gemeinsame Store-Caches
+- Job-Registry: Intervall (Sekunden) oder täglich zu fester UTC-Uhrzeit
+- Ein asyncio-Event-Loop plant, Jobs laufen in Threads (blocking I/O)
+- Kein Overlap: ein Job startet erst wieder, wenn sein letzter Lauf
+  beendet ist; der nächste Termin wird ab Lauf-Ende berechnet
+- Timeout pro Job: Überschreitung wird geloggt + gezählt
+  (Threads lassen sich nicht abbrechen → der Job bleibt bis zum Ende gesperrt)
+- publish-Job ist event-driven (core/wakeup.py) wie scheduler/worker.py
+- SUPERVISOR_JOBS=publish,archive → nur diese Jobs (Default: alle);
+  unbekannte Namen (Tippfehler) → Fehler + Exit statt stillem Leerlauf
+- Start: python -m scheduler.supervisor
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from core.logger import logger
+from core import scheduler_metrics, wakeup
+
+PUBLISH_MAX_SLEEP = int(os.getenv("SCHEDULER_POLL_SECONDS", "30"))
+
+_jobs: Dict[str, Dict[str, Any]] = {}
+
+
+# ============================================================
+# 📋 REGISTRY
+# ============================================================
+
+def register_job(
+    name: str,
+    fn: Callable[[], Any],
+    interval: Optional[float] = None,
+    daily_at: Optional[str] = None,
+    next_in: Optional[Callable[[], float]] = None,
+    timeout: float = 900,
+    run_on_start: bool = True,
+) -> Dict[str, Any]:
+    """
+    Genau eins von interval / daily_at ("HH:MM", UTC) / next_in
+    (Callable → Sekunden bis zum nächsten Lauf, nach jedem Lauf neu gefragt).
+    """
+    if sum(x is not None for x in (interval, daily_at, next_in)) != 1:
+        raise ValueError(f"Job {name}: genau eins von interval/daily_at/next_in angeben")
+
+    job = {
+        "name": name,
+        "fn": fn,
+        "interval": interval,
+        "daily_at": daily_at,
+        "next_in": next_in,
+        "timeout": timeout,
+        "running": False,
+        "rerun": False,
+        "started": None,
+        "next_ts": time.time() if run_on_start else None,
+        "runs": 0,
+        "last_error": None,
+    }
+    if job["next_ts"] is None:
+        job["next_ts"] = time.time() + _seconds_until_next(job)
+    _jobs[name] = job
+    return job
+
+
+def _seconds_until_daily(daily_at: str, now: datetime) -> float:
+    hour, minute = (int(x) for x in daily_at.split(":", 1))
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+def _seconds_until_next(job: Dict[str, Any]) -> float:
+    if job["interval"] is not None:
+        return float(job["interval"])
+    if job["daily_at"] is not None:
+        return _seconds_until_daily(job["daily_at"], datetime.now(timezone.utc))
+    return max(0.0, float(job["next_in"]()))
+
+
+def trigger(name: str) -> None:
+    """
+    Job sofort fällig machen (läuft er gerade → direkt danach noch einmal).
+    """
+    job = _jobs[name]
+    if job["running"]:
+        job["rerun"] = True
+    else:
+        job["next_ts"] = time.time()
+
+
+# ============================================================
+# ▶️ RUN
+# ============================================================
+
+def _start(job: Dict[str, Any], loop: asyncio.AbstractEventLoop, executor, wake: asyncio.Event) -> None:
+    job["running"] = True
+    job["started"] = time.monotonic()
+    job["next_ts"] = float("inf")
+
+    future = loop.run_in_executor(executor, job["fn"])
+
+    def timed_out():
+        if not future.done():
+            scheduler_metrics.count_error(f"timeout:{job['name']}")
+            logger.error(
+                f"[Supervisor] ⏱ Job {job['name']} läuft länger als {job['timeout']}s – kein Neustart bis Ende"
+            )
+
+    timer = loop.call_later(job["timeout"], timed_out)
+
+    def finished(f: asyncio.Future):
+        timer.cancel()
+        duration = time.monotonic() - job["started"]
+        job["running"] = False
+        job["runs"] += 1
+
+        if f.cancelled():
+            return
+        if f.exception() is not None:
+            job["last_error"] = str(f.exception())
+            scheduler_metrics.count_error(f.exception())
+            logger.error(f"[Supervisor] ❌ Job {job['name']} fehlgeschlagen nach {duration:.1f}s: {f.exception()}")
+        else:
+            job["last_error"] = None
+            logger.info(f"[Supervisor] ✅ Job {job['name']} fertig in {duration:.1f}s")
+
+        try:
+            delay = 0.0 if job["rerun"] else _seconds_until_next(job)
+        except Exception as e:
+            logger.error(f"[Supervisor] ❌ Nächster Termin für {job['name']} unbekannt: {e}")
+            delay = float(job["interval"] or PUBLISH_MAX_SLEEP)
+        job["rerun"] = False
+        job["next_ts"] = time.time() + delay
+        wake.set()
+
+    future.add_done_callback(finished)
+
+
+async def _run(jobs: List[Dict[str, Any]], stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=max(1, len(jobs)), thread_name_prefix="job")
+    wake = asyncio.Event()
+
+    # 🔔 Notify eines Writers → publish-Job sofort
+    if "publish" in _jobs and wakeup.listen():
+        def on_notify():
+            if wakeup.drain():
+                trigger("publish")
+                wake.set()
+        loop.add_reader(wakeup.fileno(), on_notify)
+
+    try:
+        while not stop.is_set():
+            now = time.time()
+            for job in jobs:
+                if not job["running"] and job["next_ts"] <= now:
+                    _start(job, loop, executor, wake)
+
+            delay = min((job["next_ts"] for job in jobs), default=now + PUBLISH_MAX_SLEEP) - time.time()
+            wake.clear()
+            waiters = [asyncio.ensure_future(wake.wait()), asyncio.ensure_future(stop.wait())]
+            _, pending = await asyncio.wait(
+                waiters,
+                timeout=max(0.0, min(delay, PUBLISH_MAX_SLEEP)),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for w in pending:
+                w.cancel()
+    finally:
+        if wakeup.fileno() is not None:
+            loop.remove_reader(wakeup.fileno())
+        wakeup.close()
+        executor.shutdown(wait=False)
+
+
+# ============================================================
+# 🧩 STANDARD-JOBS
+# ============================================================
+
+def register_default_jobs() -> None:
+    # Imports hier: ein Prozess, ein Agent-Stack – aber nur, wenn gebraucht
+    from core import notify_outbox
+    from scheduler import (
+        analytics_worker,
+        approval_scheduler,
+        archive_worker,
+        foundation_scheduler,
+        ig_prestage,
+        token_scheduler,
+        worker,
+    )
+
+    register_job(
+        "publish",
+        worker.tick,
+        next_in=lambda: worker.next_sleep_seconds(PUBLISH_MAX_SLEEP),
+        timeout=worker.LEASE_SECONDS,
+    )
+    register_job(
+        "prestage",
+        ig_prestage.run_once,
+        interval=ig_prestage.POLL_INTERVAL_SECONDS,
+        timeout=600,
+    )
+    register_job(
+        "approval",
+        approval_scheduler.run_approval_scheduler,
+        interval=int(os.getenv("APPROVAL_POLL_SECONDS", "900")),
+    )
+    register_job(
+        "foundation",
+        foundation_scheduler.run_once,
+        interval=foundation_scheduler.POLL_INTERVAL_SECONDS,
+    )
+    register_job(
+        "notify",
+        notify_outbox.dispatch,
+        interval=int(os.getenv("NOTIFY_POLL_SECONDS", "60")),
+        timeout=300,
+    )
+    register_job(
+        "analytics",
+        analytics_worker.run_once,
+        interval=int(os.getenv("ANALYTICS_POLL_SECONDS", "3600")),
+        timeout=1800,
+    )
+    register_job(
+        "tokens",
+        token_scheduler.refresh_tokens,
+        daily_at=os.getenv("TOKEN_REFRESH_AT", "03:00"),
+        timeout=120,
+        run_on_start=False,
+    )
+    register_job(
+        "archive",
+        archive_worker.run_once,
+        interval=int(os.getenv("ARCHIVE_POLL_SECONDS", "86400")),
+        timeout=1800,
+    )
+
+
+def main() -> None:
+    from agents.publish_agent import platforms
+
+    platforms.load_adapters()  # einmal beim Start, setzt die Plattform-Caps
+    register_default_jobs()
+
+    enabled = [n.strip() for n in os.getenv("SUPERVISOR_JOBS", "").split(",") if n.strip()]
+    unknown = [n for n in enabled if n not in _jobs]
+    if unknown:
+        logger.error(
+            f"[Supervisor] ❌ SUPERVISOR_JOBS unbekannt: {', '.join(unknown)} "
+            f"(verfügbar: {', '.join(_jobs)})"
+        )
+        raise SystemExit(2)
+    for name in list(_jobs):
+        if enabled and name not in enabled:
+            del _jobs[name]
+
+    logger.info(f"[Supervisor] 🚀 gestartet | jobs={', '.join(_jobs)}")
+
+    async def runner():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+        await _run(list(_jobs.values()), stop)
+
+    asyncio.run(runner())
+    logger.info("[Supervisor] 🛑 beendet")
+
+
+if __name__ == "__main__":
+    main()
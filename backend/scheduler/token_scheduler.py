@@ -18,6 +18,7 @@ from pathlib import Path
 from datetime import datetime, timedelta
 
 from agents.analytics_agent.agent import run as run_analytics
+from core import graph_client
 
 
 # =====================================================
@@ -63,18 +64,20 @@ def refresh_meta():
         logging.warning("Meta: ENV fehlt – übersprungen")
         return
 
-    r = requests.get(
-        "https://graph.facebook.com/v21.0/oauth/access_token",
-        params={
-            "grant_type": "fb_exchange_token",
-            "client_id": app_id,
-            "client_secret": app_secret,
-            "fb_exchange_token": token,
-        },
-        timeout=10
-    )
+    try:
+        data = graph_client.get(
+            "oauth/access_token",
+            params={
+                "grant_type": "fb_exchange_token",
+                "client_id": app_id,
+                "client_secret": app_secret,
+                "fb_exchange_token": token,
+            },
+            timeout=10
+        )
+    except graph_client.GraphAPIError as e:
+        data = {"error": e.error or str(e)}
 
-    data = r.json()
     if "access_token" not in data:
         logging.error(f"Meta Fehler: {data}")
         return
@@ -194,13 +197,17 @@ def run_analytics_for_all_clients():
 # =====================================================
 # RUN
 # =====================================================
-def run():
-    logging.info("🚀 Token & Analytics Scheduler gestartet")
-
+def refresh_tokens():
     refresh_meta()
     refresh_linkedin()
     refresh_tiktok()
 
+
+def run():
+    logging.info("🚀 Token & Analytics Scheduler gestartet")
+
+    refresh_tokens()
+
     run_analytics_for_all_clients()
 
     logging.info("🏁 Token & Analytics Scheduler abgeschlossen")
@@ -3,161 +3,319 @@
 -------------------------------------------------
 - RUFT NICHT master_agent/master.py
 - Holt Posts aus core.post_store (pro Client)
-- Filter: status == "scheduled" und publish_at <= now
-- Ruft publish_post(post_id)
-- Loop-fähig für Render Worker
+- Filter: status == "scheduled" und nächster Plattform-Termin <= now (Due-Index im Store)
+- Ruft publish_post(post_id) – fällige Posts parallel (publish_many)
+- Mehrere Worker parallel möglich: Posts werden vor dem Publish per
+  Lease geclaimt (status "publishing", Owner + Ablauf)
+- Pro Post nur die fälligen Plattformen (platform_times, z.B. facebook
+  +5 min): spätere Plattformen bleiben offen, der Due-Index des Stores
+  liefert den Post zu deren Termin erneut; manuelle → "manual required"
+- Fällige Retry-Jobs (core/publish_queue.py) → publish_post(post_id, platforms=[...])
+- Vor dem Publish: Adapter-Vorarbeit für alle Posts des Ticks gemeinsam
+  (Instagram: Container anlegen + Status pollen → Tick ≈ langsamster
+  Container; Facebook: ein Batch-Request pro Page statt Call pro Post)
+- Loop-fähig für Render Worker, event-driven:
+  schläft bis zum nächsten publish_at (next_due_at) und wird über
+  core/wakeup.py früher geweckt, wenn ein Termin neu/verschoben wird;
+  SCHEDULER_POLL_SECONDS (Default 30) bleibt das Poll-Intervall als
+  Obergrenze → Writer ohne Zugriff auf den Socket (anderer Host/Container,
+  fehlgeschlagenes notify()) warten höchstens so lange
+- Metriken (core/scheduler_metrics.py): Tick-Dauer, Backlog pro Client,
+  Schedule-Lag, Publish-Latenz, Fehlerklassen → nach jedem Tick
+  runtime/metrics/scheduler-<worker>.json (API: /api/scheduler/metrics)
+- Fair über Clients: gewichtetes Round-Robin mit Quote pro Tick
+  (core/publish_executor.fair_order) – ein Client-Backlog hungert
+  die anderen nicht aus; über die Quote zurückgestellte Posts kommen
+  nach SCHEDULER_QUOTA_WAKE_SECONDS im nächsten Durchlauf dran
+- Catch-up nach Downtime (scheduler/catchup.py): Burst-Limit, Abstand
+  pro Account, stark überfällige Posts → reschedule / skip
+- Standalone (python -m scheduler.worker): leert nach jedem Tick auch die
+  Notification-Outbox (im Supervisor macht das der Job "notify")
 - Optional: RUN_ONCE=1 für lokalen Test
 """
 
 from __future__ import annotations
 
+import itertools
 import os
+import socket
 import time
 from datetime import datetime, timezone
-from pathlib import Path
 from typing import Optional, Dict, Any, List
 
 from core.logger import logger
-from core import post_store
-from agents.publish_agent.agent import publish_post
+from core import notify_outbox, post_store, publish_queue, scheduler_metrics, wakeup
+from core.platform_times import due_platforms, platform_due_ts
+from core.publish_executor import fair_order, publish_many
+from scheduler import catchup
+from agents.publish_agent.agent import discard_prepared, prepare_platforms, publish_post
 
 
-BASE_DIR = Path(__file__).resolve().parents[2]  # -> backend/
-CLIENTS_DIR = BASE_DIR / "clients"
+# 🔐 Lease: Identität dieses Workers + Dauer, nach der ein Claim eines
+# abgestürzten Workers verfällt (muss länger sein als ein Publish)
+WORKER_ID = os.getenv("SCHEDULER_WORKER_ID") or f"{socket.gethostname()}:{os.getpid()}"
+LEASE_SECONDS = int(os.getenv("SCHEDULER_LEASE_SECONDS", "600"))
 
+# Fällige Posts, die nach einem Lauf noch "scheduled" sind (Fehler),
+# frühestens nach dieser Zeit erneut versuchen – kein Busy-Loop
+RETRY_SECONDS = int(os.getenv("SCHEDULER_RETRY_SECONDS", "30"))
 
-def _parse_iso_datetime(value: Optional[str]) -> Optional[datetime]:
-    """
-    Robust ISO parse:
-    - akzeptiert "...Z" oder "+00:00"
-    - liefert timezone-aware datetime in UTC zurück
-    """
-    if not value or not isinstance(value, str):
-        return None
+# Über die Client-Quote zurückgestellte Posts sind schon fällig → nächster
+# Durchlauf nach dieser kurzen Pause statt nach RETRY_SECONDS
+QUOTA_WAKE_SECONDS = float(os.getenv("SCHEDULER_QUOTA_WAKE_SECONDS", "1"))
 
-    v = value.strip()
-    try:
-        if v.endswith("Z"):
-            v = v[:-1] + "+00:00"
-        dt = datetime.fromisoformat(v)
-        if dt.tzinfo is None:
-            # defensiv: treat as UTC
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt.astimezone(timezone.utc)
-    except Exception:
-        return None
+# Round-Robin-Start rotiert pro Tick
+_fair_round = itertools.count()
+_quota_wake_ts: Optional[float] = None
 
 
 def _list_clients() -> List[str]:
-    if not CLIENTS_DIR.exists():
-        logger.warning(f"[Scheduler] CLIENTS_DIR fehlt: {CLIENTS_DIR}")
-        return []
-
-    out: List[str] = []
-    for p in CLIENTS_DIR.iterdir():
-        if p.is_dir() and not p.name.startswith("--"):
-            out.append(p.name)
-    return out
+    # Clients aus dem Store (nicht aus dem Dateisystem) → keine leeren Läufe
+    return post_store.list_clients()
 
 
 def _due_scheduled_posts_for_client(client: str, now_utc: datetime) -> List[Dict[str, Any]]:
-    posts = post_store.get_posts(client)
-
-    due: List[Dict[str, Any]] = []
-    for p in posts:
-        status = str(p.get("status") or "").lower().strip()
-        if status != "scheduled":
-            continue
-
-        publish_at = _parse_iso_datetime(p.get("publish_at"))
-        if publish_at is None:
-            # scheduled ohne publish_at -> konservativ NICHT posten
-            continue
-
-        if publish_at <= now_utc:
-            due.append(p)
-
-    # deterministisch: älteste zuerst
-    due.sort(key=lambda x: str(x.get("publish_at") or ""))
-    return due
+    # Due-Index im Store: status == "scheduled" und publish_at <= now,
+    # älteste zuerst (scheduled ohne publish_at → konservativ NICHT posten)
+    return post_store.get_due_posts(now_utc, client=client)
 
 
 def run_once() -> Dict[str, Any]:
+    global _quota_wake_ts
+    started = time.monotonic()
     now_utc = datetime.now(timezone.utc)
+
+    # 🔐 Leases abgestürzter Worker freigeben → Posts wieder fällig
+    recovered = post_store.recover_expired_leases(now_utc)
+    if recovered:
+        logger.warning(f"[Scheduler] ♻️ Abgelaufene Leases freigegeben: {recovered}")
+
     clients = _list_clients()
 
     total_due = 0
     total_published = 0
     total_errors = 0
+    due_posts: List[Dict[str, Any]] = []
+    backlog: Dict[str, int] = {}
 
     for client in clients:
         try:
             due = _due_scheduled_posts_for_client(client, now_utc)
         except Exception as e:
             logger.error(f"[Scheduler] ❌ Fehler beim Laden der Posts für client={client}: {e}")
+            scheduler_metrics.count_error("load_posts")
             total_errors += 1
             continue
 
+        backlog[client] = len(due)
         if not due:
             continue
 
         logger.info(f"[Scheduler] 🕒 Due Posts: client={client} count={len(due)}")
         total_due += len(due)
+        due_posts.extend(p for p in due if p.get("id"))
+
+    # ⏪ Catch-up: stark überfällige Posts umplanen/überspringen,
+    # den Rest gedrosselt (Burst + Abstand pro Account) abarbeiten
+    overdue: Dict[str, Dict[str, Any]] = {}
+    for p in due_posts:
+        patch = catchup.overdue_patch(p, now_utc)
+        if patch is not None:
+            overdue[p["id"]] = patch
+
+    # ⚖️ Fair Queue: pro Client älteste zuerst, Clients im Round-Robin
+    by_client: Dict[str, List[Dict[str, Any]]] = {}
+    for p in due_posts:
+        if p["id"] not in overdue:
+            by_client.setdefault(str(p.get("client") or ""), []).append(p)
+    for posts in by_client.values():
+        posts.sort(key=lambda p: (catchup.due_ts(p) or 0, p["id"]))
+    fair = fair_order(by_client, start=next(_fair_round))
+
+    selected, deferred = catchup.select(fair, now_utc.timestamp())
+    over_quota = sum(len(v) for v in by_client.values()) - len(fair)
+    deferred += over_quota
+    _quota_wake_ts = now_utc.timestamp() + QUOTA_WAKE_SECONDS if over_quota else None
+    if deferred:
+        logger.info(f"[Scheduler] 🚦 {deferred} Posts zurückgestellt (Quote/Burst/Abstand)")
+    due_ids = [p["id"] for p in selected]
+
+    # 🔁 fällige Retry-Jobs: nur die betroffenen Plattformen erneut
+    retry_platforms: Dict[str, List[str]] = {}
+    for job in publish_queue.due_jobs():
+        retry_platforms.setdefault(job["post_id"], []).append(job["platform"])
+    if retry_platforms:
+        logger.info(f"[Scheduler] 🔁 Retry-Jobs fällig: posts={len(retry_platforms)}")
+
+    # 🔐 atomarer Claim: nur Posts, die DIESER Worker hält, werden gepostet
+    candidates = list(dict.fromkeys(due_ids + list(overdue) + list(retry_platforms)))
+    claimed_posts = (
+        post_store.claim_posts(candidates, WORKER_ID, LEASE_SECONDS) if candidates else []
+    )
+    if len(claimed_posts) < len(candidates):
+        logger.info(
+            f"[Scheduler] 🔐 {len(candidates) - len(claimed_posts)} Posts von anderem Worker gehalten"
+        )
+    # ⏪ nur geclaimte Posts verbrauchen Burst/Abstand
+    won = {p["id"] for p in claimed_posts}
+    catchup.refund(pid for pid in due_ids if pid not in won)
+
+    # überfällige (und nicht zusätzlich im Retry) → ein Write, Lease zurück
+    missed = {
+        p["id"]: {"status": "scheduled", **overdue[p["id"]], "lease": {}}
+        for p in claimed_posts
+        if p["id"] in overdue and p["id"] not in retry_platforms
+    }
+    if missed:
+        post_store.update_posts_many(missed)
+        logger.warning(
+            f"[Scheduler] ⏪ Überfällig > {catchup.OVERDUE_HOURS:g}h ({catchup.OVERDUE_ACTION}): {sorted(missed)}"
+        )
+    claimed_posts = [p for p in claimed_posts if p["id"] not in missed]
+    claimed = [p["id"] for p in claimed_posts]
+
+    # 🕒 Pro-Plattform-Jobs: fällig laut platform_times + fällige Retries
+    now_ts = now_utc.timestamp()
+    jobs: Dict[str, List[str]] = {
+        p["id"]: list(dict.fromkeys(due_platforms(p, now_ts) + retry_platforms.get(p["id"], [])))
+        for p in claimed_posts
+    }
+
+    # 📊 Schedule-Lag: wie spät feuert der Job gegenüber seinem Termin
+    for p in claimed_posts:
+        for pf in due_platforms(p, now_ts):
+            scheduler_metrics.observe_lag(pf, now_ts - platform_due_ts(p, pf))
+
+    def _publish(post_id: str) -> Dict[str, Any]:
+        return publish_post(post_id, platforms=jobs[post_id])
+
+    # ⏩ Vorarbeit aller Posts gemeinsam (IG-Container, FB-Batch)
+    prepare_platforms(claimed_posts, jobs)
 
-        for p in due:
-            post_id = str(p.get("id") or "")
-            if not post_id:
-                continue
-
-            try:
-                res = publish_post(post_id)
-                if res.get("status") == "published":
-                    total_published += 1
-                elif res.get("status") == "skipped":
-                    # z.B. already_published – ok
-                    pass
-                else:
-                    # error oder anderes
-                    total_errors += 1
-                logger.info(f"[Scheduler] ✅ publish_post result post_id={post_id} -> {res.get('status')}")
-            except Exception as e:
-                total_errors += 1
-                logger.error(f"[Scheduler] ❌ publish_post crashed post_id={post_id}: {e}")
+    # ⚡ unabhängige Posts parallel (Caps: core/publish_executor.py)
+    try:
+        results = publish_many(_publish, claimed)
+    finally:
+        discard_prepared(claimed, [pf for pfs in jobs.values() for pf in pfs])
+
+    for post_id, res in results.items():
+        if isinstance(res, Exception):
+            total_errors += 1
+            logger.error(f"[Scheduler] ❌ publish_post crashed post_id={post_id}: {res}")
+            scheduler_metrics.count_error(res)
+            # Lease sofort zurückgeben statt auf den Ablauf zu warten
+            post_store.release_post(post_id, WORKER_ID)
+            continue
+
+        if res.get("status") == "published":
+            total_published += 1
+        elif res.get("status") in ("skipped", "retrying", "scheduled", "scheduled_manual"):
+            # z.B. already_published – ok / Retry bzw. spätere Plattform
+            # eingeplant / nur noch manuelle Plattformen offen
+            pass
+        else:
+            # error oder anderes
+            total_errors += 1
+        logger.info(f"[Scheduler] ✅ publish_post result post_id={post_id} -> {res.get('status')}")
+
+    scheduler_metrics.observe_tick(time.monotonic() - started, len(clients), backlog)
 
     return {
         "now_utc": now_utc.isoformat(),
         "clients": len(clients),
         "due": total_due,
+        "claimed": len(claimed),
+        "deferred": deferred,
+        "quota_wake_ts": _quota_wake_ts,
+        "overdue": len(missed),
         "published": total_published,
         "errors": total_errors,
     }
 
 
+def _sleep_seconds(now_utc: datetime, next_due: Optional[datetime], max_sleep: float) -> float:
+    """
+    Bis zum nächsten Termin schlafen (max. max_sleep). Schon überfällig
+    = letzter Versuch fehlgeschlagen → RETRY_SECONDS warten.
+    """
+    if next_due is None:
+        return max_sleep
+
+    delta = (next_due - now_utc).total_seconds()
+    if delta <= 0:
+        return min(RETRY_SECONDS, max_sleep)
+    return min(delta, max_sleep)
+
+
+def tick() -> Dict[str, Any]:
+    """
+    Ein Lauf inkl. Log + Metrik-Datei (auch vom Supervisor genutzt).
+    """
+    summary = run_once()
+    logger.info(
+        f"[Scheduler] 📊 tick done due={summary['due']} published={summary['published']} errors={summary['errors']}"
+    )
+    try:
+        scheduler_metrics.write(WORKER_ID)
+    except OSError as e:
+        logger.warning(f"[Scheduler] ⚠ Metriken nicht geschrieben: {e}")
+    return summary
+
+
+def dispatch_notifications() -> None:
+    """
+    Standalone-Worker ohne Supervisor: Outbox selbst leeren.
+    """
+    try:
+        notify_outbox.dispatch()
+    except OSError as e:
+        logger.error(f"[Scheduler] ❌ Notification-Outbox nicht lesbar: {e}")
+
+
+def next_sleep_seconds(max_sleep: float) -> float:
+    now_utc = datetime.now(timezone.utc)
+    wake_times = [t for t in (post_store.next_due_at(), publish_queue.next_retry_at()) if t]
+    next_due = min(wake_times) if wake_times else None
+    sleep_s = _sleep_seconds(now_utc, next_due, max_sleep)
+
+    # ⏪ Catch-up: zurückgestellte Posts genau dann, wenn ihr Slot frei wird;
+    # ⚖️ über die Quote zurückgestellte im nächsten Durchlauf
+    for deferred_ts in (catchup.deferred_until(), _quota_wake_ts):
+        if deferred_ts is not None:
+            sleep_s = min(sleep_s, max(0.0, deferred_ts - now_utc.timestamp()))
+    return sleep_s
+
+
 def loop(poll_seconds: int = 30) -> None:
-    logger.info(f"[Scheduler] 🚀 Worker gestartet | poll_seconds={poll_seconds}")
+    """
+    poll_seconds = maximale Schlafdauer (Sicherheitsnetz, falls ein
+    Notify verloren geht oder posts.json von Hand geändert wird).
+    """
+    event_driven = wakeup.listen()
+    logger.info(
+        f"[Scheduler] 🚀 Worker gestartet | max_sleep={poll_seconds}s event_driven={event_driven}"
+    )
 
-    while True:
-        summary = run_once()
-        logger.info(
-            f"[Scheduler] 📊 tick done due={summary['due']} published={summary['published']} errors={summary['errors']}"
-        )
+    try:
+        while True:
+            tick()
+            dispatch_notifications()
 
-        # RUN_ONCE=1 -> nach einem Lauf beenden (lokal/test)
-        if os.getenv("RUN_ONCE", "").strip() == "1":
-            logger.info("[Scheduler] 🧪 RUN_ONCE=1 -> exit")
-            return
+            # RUN_ONCE=1 -> nach einem Lauf beenden (lokal/test)
+            if os.getenv("RUN_ONCE", "").strip() == "1":
+                logger.info("[Scheduler] 🧪 RUN_ONCE=1 -> exit")
+                return
 
-        time.sleep(poll_seconds)
+            sleep_s = next_sleep_seconds(poll_seconds)
+            notify_ts = notify_outbox.next_dispatch_ts()
+            if notify_ts is not None:
+                sleep_s = min(sleep_s, max(0.0, notify_ts - time.time()))
+            if wakeup.wait(sleep_s):
+                logger.info("[Scheduler] 🔔 Wakeup: Termine geändert")
+    finally:
+        wakeup.close()
 
 
 if __name__ == "__main__":
     poll = int(os.getenv("SCHEDULER_POLL_SECONDS", "30"))
     loop(poll_seconds=poll)
-from scheduler.publish_guard import should_auto_publish, is_manual
-from core.post_store import mark_manual_required
-
-def handle_platform_publish(post, platform):
-    if should_auto_publish(platform):
-        publish(platform, post)
-    elif is_manual(platform):
-        mark_manual_required(post["id"], platform)
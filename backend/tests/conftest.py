@@ -0,0 +1,40 @@
+import pytest
+
+from core import post_archive, post_store, post_sync, publish_queue
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """
+    Post-Store (JSON-Shards), Sync-Index, Archiv und Retry-Queue in tmp_path.
+    """
+    for mod in (post_store, post_sync, post_archive):
+        monkeypatch.setattr(mod, "CLIENTS_DIR", tmp_path / "clients")
+    monkeypatch.setattr(post_store, "LEGACY_STORE_PATH", tmp_path / "runtime" / "posts.json")
+    monkeypatch.setattr(publish_queue, "QUEUE_PATH", tmp_path / "publish_queue.json")
+    monkeypatch.setattr(post_store, "_routes", {})
+    post_sync.reset_index()
+    yield post_store
+    post_sync.reset_index()
+
+
+@pytest.fixture
+def adapters(monkeypatch):
+    """
+    Registry-Ersatz: adapters(lambda pf: publish | None) – None = Simulation.
+    """
+    from agents.publish_agent import platforms
+
+    def install(factory):
+        def get_adapter(platform):
+            publish = factory(platform)
+            if publish is None:
+                return None
+            return {
+                "name": platform, "publish": publish, "prepare": None, "discard": None,
+                "state_field": None, "capabilities": dict(platforms.DEFAULT_CAPABILITIES),
+            }
+
+        monkeypatch.setattr(platforms, "get_adapter", get_adapter)
+
+    return install
@@ -0,0 +1,68 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from core import post_store
+from scheduler import approval_scheduler as sched
+
+PLAN = {
+    "slot_capacity": 2,
+    "min_spacing_minutes": 30,
+    "week": {
+        "monday": [{"content_category": "service", "publish_time": "09:00"}],
+        "wednesday": [
+            {"content_category": "service", "publish_time": "12:00", "capacity": 1},
+            {"content_category": "team", "publish_time": "15:00"},
+        ],
+    },
+    "fallback": {"manual": "team"},
+}
+
+# Sonntag → nächster Montag 09:00 ist der erste Slot
+NOW = datetime(2030, 1, 6, 8, 0, tzinfo=timezone.utc)
+MONDAY_9 = datetime(2030, 1, 7, 9, 0, tzinfo=timezone.utc)
+WEDNESDAY_12 = datetime(2030, 1, 9, 12, 0, tzinfo=timezone.utc)
+
+
+def _posts(n, cc="service"):
+    return [{"id": f"{cc}{i}", "content_category": cc} for i in range(n)]
+
+
+def test_batch_respects_capacity_spacing_and_occupied_slots():
+    index = sched.compile_plan(PLAN)
+
+    out = sched.allocate_slots(index, _posts(4), occupied=[MONDAY_9], now=NOW, weeks=2)
+
+    assert out == {
+        "service0": MONDAY_9 + timedelta(minutes=30),  # 09:00 schon belegt
+        "service1": WEDNESDAY_12,                       # Montag voll (capacity 2)
+        "service2": MONDAY_9 + timedelta(weeks=1),
+        "service3": MONDAY_9 + timedelta(weeks=1, minutes=30),
+    }
+
+
+def test_fallback_category_and_no_free_slot():
+    index = sched.compile_plan(PLAN)
+
+    out = sched.allocate_slots(index, _posts(1, "manual") + _posts(1, "unknown"), [], now=NOW, weeks=1)
+
+    assert out == {"manual0": datetime(2030, 1, 9, 15, 0, tzinfo=timezone.utc)}
+
+
+def test_run_writes_all_assignments_in_one_save(tmp_path, monkeypatch, store):
+    plan_path = tmp_path / "weekly_plan.json"
+    plan_path.write_text(json.dumps(PLAN), encoding="utf-8")
+    monkeypatch.setattr(sched, "WEEKLY_PLAN_PATH", plan_path)
+    monkeypatch.setattr(sched, "_plan_cache", {"sig": None, "index": None})
+
+    post_store.add_posts([
+        {"id": f"appr{i}", "client": sched.CLIENT, "status": "approved", "content_category": "service"}
+        for i in range(3)
+    ])
+    saves = post_store.cache_stats()["saves"]
+
+    res = sched.run_approval_scheduler()
+
+    assert res == {"scheduled": 3, "unassigned": []}
+    assert post_store.cache_stats()["saves"] == saves + 1
+    times = sorted(post_store.get_post_by_id(f"appr{i}")["publish_at"] for i in range(3))
+    assert len(set(times)) == 3
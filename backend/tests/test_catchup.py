@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core import post_store
+from scheduler import catchup, worker
+
+
+@pytest.fixture
+def policy(monkeypatch):
+    monkeypatch.setattr(catchup, "MAX_BURST", 2)
+    monkeypatch.setattr(catchup, "BURST_WINDOW_SECONDS", 60)
+    monkeypatch.setattr(catchup, "ACCOUNT_SPACING_SECONDS", 120)
+    monkeypatch.setattr(catchup, "CATCHUP_AFTER_SECONDS", 60)
+    catchup.reset()
+    return catchup
+
+
+def _post(pid, client, publish_at, **extra):
+    return {
+        "id": pid, "client": client, "status": "scheduled",
+        "publish_at": publish_at.isoformat(), "platforms": ["instagram"], "results": {},
+        **extra,
+    }
+
+
+def test_burst_and_account_spacing(policy):
+    now = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    late = now - timedelta(minutes=10)
+    posts = [_post("a1", "a", late), _post("a2", "a", late), _post("b1", "b", late), _post("c1", "c", late)]
+
+    selected, deferred = policy.select(posts, now.timestamp())
+    assert [p["id"] for p in selected] == ["a1", "b1"]
+    assert deferred == 2
+    assert policy.deferred_until() == now.timestamp() + 60  # Burst-Fenster zuerst frei
+
+    selected, _ = policy.select([posts[1], posts[3]], now.timestamp() + 60)
+    assert [p["id"] for p in selected] == ["c1"]  # a2 wartet auf den Abstand
+    assert policy.deferred_until() == now.timestamp() + 120
+
+
+def test_spacing_only_for_catch_up_posts(policy):
+    now = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    on_time = [_post("a1", "a", now), _post("a2", "a", now)]
+    selected, deferred = policy.select(on_time, now.timestamp())
+    assert [p["id"] for p in selected] == ["a1", "a2"] and deferred == 0
+
+    # Catch-up-Post desselben Accounts hält den Abstand zum letzten Post
+    policy.reset()
+    late = _post("a0", "a", now - timedelta(minutes=10))
+    selected, _ = policy.select([on_time[0], late], now.timestamp())
+    assert [p["id"] for p in selected] == ["a1"]
+
+
+def test_refund_returns_unclaimed_slots(policy):
+    now = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    late = now - timedelta(minutes=10)
+    posts = [_post("a1", "a", late), _post("b1", "b", late), _post("c1", "c", late)]
+
+    selected, deferred = policy.select(posts, now.timestamp())
+    assert [p["id"] for p in selected] == ["a1", "b1"] and deferred == 1
+
+    # a1 hat ein anderer Worker geclaimt → Slot + Abstand von "a" frei
+    assert policy.refund(["a1", "zz"]) == 1
+    selected, _ = policy.select([posts[0], posts[2]], now.timestamp() + 1)
+    assert [p["id"] for p in selected] == ["a1"]
+
+
+def test_overdue_reschedule_keeps_time_of_day(policy, monkeypatch):
+    now = datetime(2030, 1, 3, 12, 0, tzinfo=timezone.utc)
+    post = _post("p", "a", datetime(2030, 1, 1, 9, 0, tzinfo=timezone.utc))
+
+    monkeypatch.setattr(policy, "OVERDUE_ACTION", "reschedule")
+    assert policy.overdue_patch(post, now)["publish_at"] == "2030-01-04T09:00:00+00:00"
+
+    monkeypatch.setattr(policy, "OVERDUE_ACTION", "skip")
+    assert policy.overdue_patch(post, now)["status"] == "missed"
+
+    # teilweise veröffentlicht → immer fertig posten
+    post["results"] = {"instagram": {"status": "ok"}}
+    post["platforms"] = ["instagram", "facebook"]
+    assert policy.overdue_patch(post, now) is None
+
+    monkeypatch.setattr(policy, "OVERDUE_ACTION", "publish")
+    assert policy.overdue_patch(_post("q", "a", now - timedelta(days=3)), now) is None
+
+
+def test_run_once_drains_backlog_in_bursts(monkeypatch, store, adapters, policy):
+    from agents.publish_agent import agent
+
+    adapters(lambda pf: lambda post: None)
+    monkeypatch.setattr(agent, "_notify_client", lambda *a: None)
+    monkeypatch.setattr(policy, "OVERDUE_ACTION", "reschedule")
+
+    now = datetime.now(timezone.utc)
+    post_store.add_posts([
+        _post("cu_late", "k1", now - timedelta(days=1)),
+        _post("cu_1", "k1", now - timedelta(minutes=5)),
+        _post("cu_2", "k1", now - timedelta(minutes=4)),
+        _post("cu_3", "k2", now - timedelta(minutes=3)),
+    ])
+
+    summary = worker.run_once()
+
+    assert summary["overdue"] == 1
+    assert summary["published"] == 2  # cu_1 (k1) + cu_3 (k2); cu_2 wartet
+    assert summary["deferred"] == 1
+    late = post_store.get_post_by_id("cu_late")
+    assert late["status"] == "scheduled" and late["lease"] == {}
+    assert late["rescheduled_from"] and late["publish_at"] > now.isoformat()
+    assert post_store.get_post_by_id("cu_2")["status"] == "scheduled"
+    assert worker.next_sleep_seconds(300) <= 120
+
+
+def test_run_once_on_time_posts_are_not_throttled(monkeypatch, store, adapters, policy):
+    from agents.publish_agent import agent
+
+    adapters(lambda pf: lambda post: None)
+    monkeypatch.setattr(agent, "_notify_client", lambda *a: None)
+
+    now = datetime.now(timezone.utc)
+    post_store.add_posts([
+        _post(f"ot_{i}", f"k{i}", now - timedelta(seconds=5)) for i in range(policy.MAX_BURST * 4)
+    ])
+
+    summary = worker.run_once()
+    assert summary["published"] == policy.MAX_BURST * 4
+    assert summary["deferred"] == 0
+    assert len(policy._fired) == 0
+
+
+def test_run_once_posts_lost_to_other_worker_use_no_budget(monkeypatch, store, adapters, policy):
+    from agents.publish_agent import agent
+
+    adapters(lambda pf: lambda post: None)
+    monkeypatch.setattr(agent, "_notify_client", lambda *a: None)
+
+    now = datetime.now(timezone.utc)
+    post_store.add_posts([
+        _post("lost_1", "k1", now - timedelta(minutes=5)),
+        _post("lost_2", "k2", now - timedelta(minutes=4)),
+    ])
+    post_store.claim_posts(["lost_1", "lost_2"], "other-worker", 60)
+    # veralteter Due-Index: Posts erscheinen noch fällig, Claim verliert
+    held = {pid: {**post_store.get_post_by_id(pid), "status": "scheduled"} for pid in ("lost_1", "lost_2")}
+    monkeypatch.setattr(post_store, "get_due_posts", lambda now=None, client=None, **k: [
+        p for p in held.values() if p["client"] == client
+    ])
+
+    summary = worker.run_once()
+    assert summary["published"] == 0
+    assert len(policy._fired) == 0 and policy._last_by_client == {}
+
+
+def test_quota_deferred_posts_wake_next_pass(monkeypatch, store, adapters, policy):
+    from agents.publish_agent import agent
+    from core import publish_executor
+
+    adapters(lambda pf: lambda post: None)
+    monkeypatch.setattr(agent, "_notify_client", lambda *a: None)
+    monkeypatch.setattr(publish_executor, "CLIENT_QUOTA", 2)
+    monkeypatch.setattr(worker, "QUOTA_WAKE_SECONDS", 1)
+
+    now = datetime.now(timezone.utc)
+    post_store.add_posts([_post(f"q_{i}", "k1", now - timedelta(seconds=5)) for i in range(4)])
+
+    summary = worker.run_once()
+    assert summary["published"] == 2 and summary["deferred"] == 2
+    # publish_at liegt in der Vergangenheit → ohne Quote-Wake RETRY_SECONDS
+    assert worker.next_sleep_seconds(300) <= 1
+
+    summary = worker.run_once()
+    assert summary["published"] == 2 and summary["quota_wake_ts"] is None
@@ -0,0 +1,122 @@
+import json
+from urllib.parse import parse_qs
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from agents.publish_agent import platforms
+from agents.publish_agent.platforms import facebook
+from core import graph_client, post_store, publish_queue
+
+
+class _BatchAdapter(BaseAdapter):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+        self.fail_with = None
+
+    def send(self, request, **kwargs):
+        form = parse_qs(request.body)
+        ops = json.loads(form["batch"][0])
+        self.calls.append(ops)
+
+        if self.fail_with is not None:
+            raise self.fail_with
+
+        items = []
+        for op in ops:
+            caption = parse_qs(op["body"])["caption"][0]
+            if caption == "bad":
+                err = {"error": {"code": 100, "message": "Invalid parameter"}}
+                items.append({"code": 400, "body": json.dumps(err)})
+            else:
+                items.append({"code": 200, "body": json.dumps({"id": f"photo-{caption}"})})
+
+        r = requests.Response()
+        r.status_code = 200
+        r._content = json.dumps(items).encode()
+        r.request = request
+        return r
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def adapter(store, monkeypatch):
+    monkeypatch.setenv("META_PAGE_ID", "page1")
+    monkeypatch.setenv("META_PAGE_TOKEN", "tok")
+    monkeypatch.setattr(graph_client, "GRAPH_BASE_URL", "https://graph.test")
+    monkeypatch.setitem(facebook.CAPABILITIES, "max_batch", 2)
+    platforms.load_adapters(reload=True)
+    graph_client.close()
+    fake = _BatchAdapter()
+    graph_client.session().mount("https://graph.test", fake)
+    yield fake
+    graph_client.close()
+    monkeypatch.undo()
+    platforms.load_adapters(reload=True)
+
+
+def _post(i, caption):
+    post = {
+        "id": f"fb-{i}", "client": "fbc", "status": "publishing",
+        "results": {"facebook": {"preview_url": f"/p/{i}.png", "caption": caption}},
+    }
+    post_store.add_post(post)
+    return post
+
+
+def test_batch_results_are_stored_on_the_post(adapter):
+    posts = [_post(0, "a"), _post(1, "bad"), _post(2, "c")]
+
+    assert facebook.prepare(posts) == ["fb-0", "fb-1", "fb-2"]
+    # 3 Operationen, max. 2 pro Request → 2 Batch-Requests statt 3 Calls
+    assert [len(ops) for ops in adapter.calls] == [2, 1]
+    assert adapter.calls[0][0]["relative_url"] == "page1/photos"
+
+    # publish() liest vom Post (z.B. nach Neustart) → kein weiterer Call
+    stored = [post_store.get_post_by_id(p["id"]) for p in posts]
+    assert facebook.publish(stored[0]) == {"id": "photo-a"}
+    assert facebook.publish(stored[2]) == {"id": "photo-c"}
+    with pytest.raises(graph_client.GraphAPIError) as info:
+        facebook.publish(stored[1])
+    assert info.value.error["code"] == 100
+    assert not publish_queue.is_retryable(info.value)
+
+    # schon gebatcht → zweiter Tick sendet nichts erneut
+    assert facebook.prepare(stored) == []
+    assert len(adapter.calls) == 2
+
+
+def test_ambiguous_batch_failure_needs_manual_check(adapter):
+    adapter.fail_with = requests.ReadTimeout("read timeout")
+    posts = [_post(10, "a"), _post(11, "b")]
+
+    facebook.prepare(posts)
+    stored = post_store.get_post_by_id("fb-10")
+    assert stored["fb_batch"]["state"] == "unknown"
+    with pytest.raises(publish_queue.PublishStateUnknown):
+        facebook.publish(stored)
+    assert len(adapter.calls) == 1  # kein Einzel-Call als Fallback
+
+
+def test_unknown_outcome_goes_to_manual_check(adapter, monkeypatch):
+    from agents.publish_agent import agent
+
+    monkeypatch.setattr(agent, "_notify_client", lambda *a: None)
+    post = _post(20, "a")
+    post_store.update_post(post["id"], {
+        "status": "scheduled", "platforms": ["facebook"],
+        "fb_batch": {"state": "sending", "at": "2026-01-01T00:00:00+00:00"},
+    })
+
+    res = agent.publish_post(post["id"], platforms=["facebook"])
+
+    stored = post_store.get_post_by_id(post["id"])
+    assert res["results"]["facebook"]["status"] == "unknown"
+    assert stored["platform_status"]["facebook"] == "manual"
+    assert stored["fb_batch"]["state"] == "sending"  # bleibt für den Abgleich
+    assert adapter.calls == []
+    assert publish_queue.list_jobs() == []  # kein Retry
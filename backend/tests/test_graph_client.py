@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from core import graph_client, publish_queue
+
+
+class _FakeAdapter(BaseAdapter):
+    def __init__(self, handler):
+        super().__init__()
+        self.handler = handler
+        self.calls = []
+
+    def send(self, request, **kwargs):
+        self.calls.append(request)
+        status, body = self.handler(request)
+        r = requests.Response()
+        r.status_code = status
+        r._content = json.dumps(body).encode()
+        r.url = request.url
+        r.request = request
+        return r
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(graph_client, "GRAPH_BASE_URL", "https://graph.test")
+    monkeypatch.setattr(graph_client, "GRAPH_API_VERSION", "v99.0")
+    graph_client.close()
+    yield graph_client
+    graph_client.close()
+
+
+def test_calls_share_one_session_with_configured_version(client):
+    adapter = _FakeAdapter(lambda req: (200, {"id": "c1"}))
+    client.session().mount("https://graph.test", adapter)
+
+    assert client.post("123/media", data={"caption": "x"}) == {"id": "c1"}
+    assert client.get("123", params={"fields": "id"}) == {"id": "c1"}
+
+    assert client.session() is client.session()
+    assert [r.url for r in adapter.calls] == [
+        "https://graph.test/v99.0/123/media",
+        "https://graph.test/v99.0/123?fields=id",
+    ]
+
+
+def test_errors_keep_graph_payload_for_retry_classification(client):
+    body = {"error": {"code": 190, "message": "token expired"}}
+    client.session().mount("https://graph.test", _FakeAdapter(lambda req: (400, body)))
+
+    with pytest.raises(graph_client.GraphAPIError) as info:
+        client.post("123/photos")
+
+    assert info.value.status_code == 400
+    assert info.value.error["code"] == 190
+    assert json.loads(str(info.value)) == body
+    assert not publish_queue.is_retryable(info.value)
+
+
+def test_async_client_maps_errors(client, monkeypatch):
+    def handler(request):
+        if request.url.path.endswith("/down"):
+            raise httpx.ConnectError("refused", request=request)
+        if request.url.path.endswith("/busy"):
+            return httpx.Response(503, json={"error": {"code": 2, "message": "busy"}})
+        return httpx.Response(200, json={"id": "m1"})
+
+    monkeypatch.setattr(graph_client, "_async_transport", lambda: httpx.MockTransport(handler))
+
+    async def run():
+        try:
+            ok = await client.apost("123/media_publish", data={"creation_id": "c1"})
+            with pytest.raises(graph_client.GraphAPIError) as busy:
+                await client.aget("busy")
+            with pytest.raises(requests.ConnectionError) as down:
+                await client.aget("down")
+            return ok, busy.value, down.value
+        finally:
+            await client.aclose()
+
+    ok, busy, down = asyncio.run(run())
+    assert ok == {"id": "m1"}
+    assert busy.status_code == 503 and publish_queue.is_retryable(busy)
+    assert publish_queue.is_retryable(down)
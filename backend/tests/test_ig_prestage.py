@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from agents.publish_agent.platforms import instagram
+from core import graph_client, post_store
+from core.platform_times import build_platform_times
+from scheduler import ig_prestage
+
+
+@pytest.fixture
+def env(store, monkeypatch):
+    monkeypatch.setenv("INSTAGRAM_BUSINESS_ID", "ig1")
+    monkeypatch.setenv("META_PAGE_TOKEN", "tok")
+    monkeypatch.setattr(graph_client, "GRAPH_BASE_URL", "https://graph.test")
+
+    calls = []
+
+    def handler(request):
+        path = request.url.path
+        calls.append(path.rsplit("/", 1)[-1])
+        if path.endswith("/media"):
+            return httpx.Response(200, json={"id": f"c{len(calls)}"})
+        if path.endswith("/media_publish"):
+            return httpx.Response(200, json={"id": "m1"})
+        return httpx.Response(200, json={"status_code": "FINISHED"})
+
+    monkeypatch.setattr(graph_client, "_async_transport", lambda: httpx.MockTransport(handler))
+    graph_client.run(graph_client.aclose())
+    yield calls
+    graph_client.run(graph_client.aclose())
+
+
+def _post(post_id, publish_at):
+    return {
+        "id": post_id, "client": "c1", "status": "scheduled",
+        "publish_at": publish_at.isoformat(),
+        "platform_times": build_platform_times(publish_at),
+        "platforms": ["instagram"],
+        "results": {"instagram": {"preview_url": f"/p/{post_id}.png", "caption": "hi"}},
+    }
+
+
+def test_prestage_stores_container_and_publish_only_publishes(env):
+    now = datetime.now(timezone.utc)
+    post_store.add_post(_post("stage-soon", now + timedelta(minutes=10)))
+    post_store.add_post(_post("stage-later", now + timedelta(hours=2)))
+
+    assert ig_prestage.run_once(now) == {"staged": 1, "errors": 0}
+    post = post_store.get_post_by_id("stage-soon")
+    assert post["ig_container"]["creation_id"]
+    assert "ig_container" not in post_store.get_post_by_id("stage-later")
+
+    # zweiter Lauf: Container noch gültig → nichts neu
+    assert ig_prestage.run_once(now)["staged"] == 0
+
+    env.clear()
+    assert instagram.publish(post) == {"id": "m1"}
+    assert env == ["media_publish"]
+
+
+def test_expired_or_changed_container_is_restaged(env):
+    now = datetime.now(timezone.utc)
+    post = _post("stage-exp", now + timedelta(minutes=5))
+    post["ig_container"] = {
+        "creation_id": "old", "image_url": "http://127.0.0.1:8000/p/stage-exp.png", "caption": "hi",
+        "created_at": (now - timedelta(hours=24)).isoformat(),
+        "expires_at": (now + timedelta(minutes=5)).isoformat(),
+    }
+    assert instagram.staged_creation_id(post, now.timestamp()) is None
+
+    post["ig_container"]["expires_at"] = (now + timedelta(hours=10)).isoformat()
+    assert instagram.staged_creation_id(post, now.timestamp()) == "old"
+    post["results"]["instagram"]["caption"] = "neu"
+    assert instagram.staged_creation_id(post, now.timestamp()) is None
+
+    post_store.add_post(post)
+    assert ig_prestage.run_once(now)["staged"] == 1
+    assert post_store.get_post_by_id("stage-exp")["ig_container"]["caption"] == "neu"
+
+
+def test_leased_or_removed_posts_are_not_staged(env, monkeypatch):
+    now = datetime.now(timezone.utc)
+    post_store.add_post(_post("stage-busy", now + timedelta(minutes=5)))
+    post_store.add_post(_post("stage-gone", now + timedelta(minutes=5)))
+    post_store.claim_posts(["stage-busy"], "worker-1", 60)
+
+    stage = instagram.stage
+
+    def stage_and_remove(posts):
+        assert [p["id"] for p in posts] == ["stage-gone"]
+        post_store.remove_posts("c1", ["stage-gone"])
+        return stage(posts)
+
+    monkeypatch.setattr(instagram, "stage", stage_and_remove)
+    assert ig_prestage.run_once(now) == {"staged": 0, "errors": 0}
+
+    busy = post_store.get_post_by_id("stage-busy")
+    assert busy["status"] == "publishing" and busy["lease"]["owner"] == "worker-1"
+    assert "ig_container" not in busy
+    assert post_store.get_post_by_id("stage-gone") is None
+
+
+def test_prestage_releases_claim(env):
+    now = datetime.now(timezone.utc)
+    post_store.add_post(_post("stage-free", now + timedelta(minutes=5)))
+
+    assert ig_prestage.run_once(now)["staged"] == 1
+    post = post_store.get_post_by_id("stage-free")
+    assert post["status"] == "scheduled" and not post.get("lease")
@@ -0,0 +1,67 @@
+import itertools
+import time
+
+import httpx
+import pytest
+
+from agents.publish_agent.platforms import instagram
+from core import graph_client, publish_queue
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    monkeypatch.setenv("INSTAGRAM_BUSINESS_ID", "ig1")
+    monkeypatch.setenv("META_PAGE_TOKEN", "tok")
+    monkeypatch.setattr(graph_client, "GRAPH_BASE_URL", "https://graph.test")
+    monkeypatch.setattr(instagram, "POLL_SECONDS", 0.02)
+    monkeypatch.setattr(instagram, "POLL_MAX_SECONDS", 0.05)
+
+    state = {"ready_at": {}, "status": "FINISHED", "published": [], "processing": 0.3}
+    ids = itertools.count()
+
+    def handler(request):
+        path = request.url.path
+        if path.endswith("/ig1/media"):
+            creation_id = f"c{next(ids)}"
+            state["ready_at"][creation_id] = time.monotonic() + state["processing"]
+            return httpx.Response(200, json={"id": creation_id})
+        if path.endswith("/ig1/media_publish"):
+            creation_id = dict(httpx.QueryParams(request.content.decode()))["creation_id"]
+            state["published"].append(creation_id)
+            return httpx.Response(200, json={"id": f"m-{creation_id}"})
+        creation_id = path.rsplit("/", 1)[-1]
+        done = time.monotonic() >= state["ready_at"][creation_id]
+        return httpx.Response(200, json={"status_code": state["status"] if done else "IN_PROGRESS"})
+
+    monkeypatch.setattr(graph_client, "_async_transport", lambda: httpx.MockTransport(handler))
+    graph_client.run(graph_client.aclose())
+    yield state
+    graph_client.run(graph_client.aclose())
+
+
+def _post(i):
+    return {"id": f"ig-{i}", "results": {"instagram": {"preview_url": f"/p/{i}.png", "caption": "x"}}}
+
+
+def test_prepared_containers_process_concurrently(graph):
+    posts = [_post(i) for i in range(4)]
+    started = time.monotonic()
+
+    assert instagram.prepare(posts) == [p["id"] for p in posts]
+    results = [instagram.publish(p) for p in posts]
+
+    # 4 Container à 0.3s → gemeinsam statt nacheinander (1.2s)
+    assert time.monotonic() - started < 0.9
+    assert sorted(graph["published"]) == ["c0", "c1", "c2", "c3"]
+    assert all(r["id"].startswith("m-c") for r in results)
+
+
+def test_container_error_is_not_retried(graph):
+    graph["status"] = "ERROR"
+    graph["processing"] = 0
+
+    with pytest.raises(graph_client.GraphAPIError) as info:
+        instagram.publish(_post(9))
+
+    assert graph["published"] == []
+    assert not publish_queue.is_retryable(info.value)
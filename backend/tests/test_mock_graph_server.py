@@ -0,0 +1,48 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from tools import publish_benchmark
+from tools.mock_graph_server import create_app
+
+
+def _client(**config):
+    return TestClient(create_app({"latency_ms": 0, "jitter_ms": 0, **config}, seed=1))
+
+
+def test_instagram_container_flow_and_batch():
+    api = _client(container_seconds=60)
+
+    container = api.post("/v24.0/ig1/media", data={"image_url": "http://x/a.png", "access_token": "t"}).json()["id"]
+    assert api.get(f"/v24.0/{container}", params={"fields": "status_code", "access_token": "t"}).json()[
+        "status_code"] == "IN_PROGRESS"
+    early = api.post("/v24.0/ig1/media_publish", data={"creation_id": container, "access_token": "t"})
+    assert early.status_code == 400 and early.json()["error"]["code"] == 9007
+
+    ops = [{"method": "POST", "relative_url": "page1/photos", "body": "url=u&caption=c"},
+           {"method": "GET", "relative_url": "page1/insights?metric=page_impressions"}]
+    items = api.post("/v24.0/", data={"batch": json.dumps(ops), "access_token": "t"}).json()
+    assert [i["code"] for i in items] == [200, 200]
+    assert json.loads(items[1]["body"])["data"][0]["name"] == "page_impressions"
+    assert api.get("/__stats").json()["operations"] == 5
+
+
+def test_rate_limit_and_token_errors():
+    api = _client(rate_limit=2)
+
+    ok = api.get("/v24.0/oauth/access_token", params={"grant_type": "fb_exchange_token", "fb_exchange_token": "x"})
+    assert ok.json()["access_token"].startswith("mock-long-lived")
+    assert json.loads(ok.headers["X-App-Usage"])["call_count"] == 50
+
+    assert api.post("/v24.0/page1/photos", data={"url": "u"}).json()["error"]["code"] == 190
+    assert api.post("/v24.0/page1/photos", data={"url": "u", "access_token": "t"}).json()["error"]["code"] == 4
+
+
+def test_benchmark_publishes_all_posts_against_mock():
+    url = publish_benchmark.start_mock_server({"latency_ms": 0, "jitter_ms": 0, "container_seconds": 0})
+    result = publish_benchmark.run_benchmark(clients=2, posts=2, graph_url=url, max_seconds=30)
+
+    assert result["published"] == 4
+    assert result["latency_seconds"]["p99"] is not None
+    assert publish_benchmark.percentile([1, 2, 3, 4], 50) == 2
+    assert publish_benchmark.check_token_refresh(url)
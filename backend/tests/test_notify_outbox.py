@@ -0,0 +1,100 @@
+import pytest
+
+from core import notify_outbox
+
+
+class _FakeSMTP:
+    instances = []
+
+    def __init__(self, host, port, timeout=None):
+        self.sent = []
+        _FakeSMTP.instances.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def send_message(self, msg):
+        if _FakeSMTP.fail_next:
+            _FakeSMTP.fail_next = False
+            raise OSError("connection reset")
+        self.sent.append(msg)
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def outbox(tmp_path, monkeypatch):
+    monkeypatch.setattr(notify_outbox, "OUTBOX_PATH", tmp_path / "notify_outbox.json")
+    monkeypatch.setattr(notify_outbox, "DIGEST_SECONDS", 60)
+    for key, val in {
+        "SMTP_HOST": "smtp.test", "SMTP_USER": "u", "SMTP_PASS": "p", "NOTIFY_EMAIL": "to@test",
+    }.items():
+        monkeypatch.setenv(key, val)
+    monkeypatch.delenv("TEAMS_WEBHOOK", raising=False)
+    monkeypatch.setattr(notify_outbox.smtplib, "SMTP", _FakeSMTP)
+    _FakeSMTP.instances = []
+    _FakeSMTP.fail_next = False
+    return notify_outbox
+
+
+def test_digest_per_client_over_one_connection(outbox):
+    outbox.enqueue("c1", ["instagram"], "Post A")
+    outbox.enqueue("c1", ["facebook"], "Post B")
+    outbox.enqueue("c2", ["instagram"], "Post C")
+    now = outbox.list_items()[0]["created_ts"]
+
+    # Sammelfenster noch offen → nichts senden
+    assert outbox.dispatch(now + 10)["sent"] == 0
+    assert _FakeSMTP.instances == []
+
+    assert outbox.dispatch(now + 61) == {"sent": 2, "failed": 0, "dead": 0}
+    assert len(_FakeSMTP.instances) == 1  # ein Login für beide Digests
+    bodies = [m.get_payload(decode=True).decode() for m in _FakeSMTP.instances[0].sent]
+    assert "2 Updates" in bodies[0] and "Post A" in bodies[0] and "Post B" in bodies[0]
+    assert outbox.list_items() == []
+
+
+def test_failed_delivery_is_retried_with_backoff(outbox, monkeypatch):
+    monkeypatch.setattr(outbox, "MAX_ATTEMPTS", 2)
+    outbox.enqueue("c1", ["instagram"], "Post A")
+    now = outbox.list_items()[0]["created_ts"] + 61
+
+    _FakeSMTP.fail_next = True
+    assert outbox.dispatch(now) == {"sent": 0, "failed": 1, "dead": 0}
+    item = outbox.list_items("pending")[0]
+    assert item["attempts"] == 1 and item["next_attempt_ts"] > now
+
+    assert outbox.dispatch(item["next_attempt_ts"])["sent"] == 1
+    assert outbox.list_items() == []
+
+
+def test_backoff_is_independent_of_publish_retries(outbox, monkeypatch):
+    from core import publish_queue
+
+    monkeypatch.setattr(publish_queue, "BACKOFF_BASE_SECONDS", 10 ** 6)
+    monkeypatch.setattr(outbox, "BACKOFF_BASE_SECONDS", 10)
+    outbox.enqueue("c1", ["instagram"], "Post A")
+    created = outbox.list_items()[0]["created_ts"]
+    assert outbox.next_dispatch_ts() == created + 60  # Sammelfenster
+
+    _FakeSMTP.fail_next = True
+    outbox.dispatch(created + 61)
+    assert outbox.next_dispatch_ts() <= created + 61 + 10
+
+
+def test_standalone_worker_loop_dispatches(outbox, tmp_path, monkeypatch):
+    from core import wakeup
+    from scheduler import worker
+
+    monkeypatch.setattr(wakeup, "SOCKET_PATH", tmp_path / "s.sock")
+    monkeypatch.setattr(worker, "tick", lambda: {})
+    monkeypatch.setenv("RUN_ONCE", "1")
+    runs = []
+    monkeypatch.setattr(outbox, "dispatch", lambda: runs.append(1))
+
+    worker.loop(poll_seconds=1)
+    assert runs == [1]
@@ -0,0 +1,50 @@
+from agents.publish_agent import agent, platforms
+from agents.publish_agent.platforms import facebook, instagram
+from core import publish_executor
+
+
+def test_adapters_are_loaded_once(monkeypatch):
+    registry = platforms.load_adapters(reload=True)
+    imports = []
+    monkeypatch.setattr(platforms.importlib, "import_module", imports.append)
+
+    assert platforms.load_adapters() is registry
+    assert platforms.get_adapter("instagram")["publish"] is instagram.publish
+    assert platforms.get_adapter("facebook")["state_field"] == "fb_batch"
+    assert platforms.get_adapter("instagram")["state_field"] == "ig_container"
+    assert platforms.get_adapter("tiktok") is None
+    assert imports == []
+
+    assert agent._prepare_hooks("facebook") == (facebook.prepare, None)
+    assert agent._prepare_hooks("linkedin") is None
+
+
+def test_capability_caps_reach_executor(monkeypatch):
+    monkeypatch.delenv("PUBLISH_CONCURRENCY_FACEBOOK", raising=False)
+    platforms.load_adapters(reload=True)
+    assert publish_executor.platform_limit("facebook") == facebook.CAPABILITIES["max_concurrency"]
+
+    monkeypatch.setenv("PUBLISH_CONCURRENCY_FACEBOOK", "1")
+    assert publish_executor.platform_limit("facebook") == 1
+
+
+def test_batch_capabilities_reach_executor():
+    platforms.load_adapters(reload=True)
+    caps = facebook.CAPABILITIES
+    assert caps["batch"] and caps["max_batch"]
+
+    items = list(range(caps["max_batch"] + 1))
+    assert [len(c) for c in publish_executor.batch_chunks("facebook", items)] == [caps["max_batch"], 1]
+    assert publish_executor.batch_chunks("facebook", items[:caps["min_batch"] - 1]) == []
+    assert publish_executor.batch_chunks("instagram", items) == []  # bündelt nicht
+
+
+def test_broken_adapter_is_skipped(monkeypatch):
+    monkeypatch.setitem(platforms.ADAPTER_MODULES, "broken", "agents.publish_agent.platforms.nope")
+    try:
+        registry = platforms.load_adapters(reload=True)
+        assert registry["broken"] is None
+        assert registry["instagram"]["publish"] is instagram.publish
+    finally:
+        monkeypatch.undo()
+        platforms.load_adapters(reload=True)
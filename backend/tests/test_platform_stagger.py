@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.platform_times import build_platform_times, due_platforms, next_platform_due_ts
+from scheduler import catchup, worker
+
+
+@pytest.fixture(autouse=True)
+def no_spacing(monkeypatch):
+    monkeypatch.setattr(catchup, "ACCOUNT_SPACING_SECONDS", 0)
+    catchup.reset()
+
+
+def _post(publish_at, **extra):
+    return {
+        "id": "p1", "client": "c1", "status": "scheduled",
+        "publish_at": publish_at.isoformat(),
+        "platform_times": build_platform_times(publish_at),
+        "platforms": ["instagram", "facebook", "linkedin"],
+        "results": {},
+        **extra,
+    }
+
+
+def test_due_platforms_follow_platform_times():
+    base = datetime(2030, 1, 1, 10, 0, tzinfo=timezone.utc)
+    post = _post(base)
+
+    assert due_platforms(post, base.timestamp()) == ["instagram", "linkedin"]
+    assert due_platforms(post, (base + timedelta(minutes=5)).timestamp()) == [
+        "instagram", "facebook", "linkedin",
+    ]
+
+    post["results"] = {"instagram": {"status": "ok"}}
+    post["platform_status"] = {"linkedin": "manual"}
+    assert next_platform_due_ts(post) == (base + timedelta(minutes=5)).timestamp()
+
+    # Plattform in der Retry-Queue → kein eigener Termin mehr
+    post["results"]["facebook"] = {"status": "retrying"}
+    assert next_platform_due_ts(post) is None
+
+
+def test_worker_publishes_platforms_at_their_own_time(store, adapters, monkeypatch):
+    from agents.publish_agent import agent
+
+    calls = []
+    adapters(lambda pf: calls.append)
+    monkeypatch.setattr(agent, "_notify_client", lambda *a: None)
+
+    base = datetime.now(timezone.utc) - timedelta(minutes=1)
+    store.add_post(_post(base))
+
+    assert worker.run_once()["claimed"] == 1
+    post = store.get_post_by_id("p1")
+    assert len(calls) == 1  # nur instagram, facebook erst +5 min
+    assert post["status"] == "scheduled"
+    assert post["platform_status"] == {"instagram": "posted", "linkedin": "manual"}
+    assert store.next_due_at() == datetime.fromisoformat(post["platform_times"]["facebook"])
+
+    # noch nicht fällig → kein Claim
+    assert worker.run_once()["claimed"] == 0
+
+    # facebook-Termin erreicht → Rest veröffentlichen + finalisieren
+    past = (datetime.now(timezone.utc) - timedelta(seconds=1)).isoformat()
+    store.update_post("p1", {"platform_times": {**post["platform_times"], "facebook": past}})
+    worker.run_once()
+
+    post = store.get_post_by_id("p1")
+    assert len(calls) == 2
+    assert post["platform_status"]["facebook"] == "posted"
+    assert post["status"] == "scheduled_manual"  # LinkedIn wartet auf manuelles Posten
+    assert store.get_due_posts() == []
+
+
+def test_finalize_uses_auto_publish_status(store, adapters, monkeypatch):
+    from agents.publish_agent import agent
+
+    adapters(lambda pf: None)
+    monkeypatch.setattr(agent, "_notify_client", lambda *a: None)
+
+    base = datetime.now(timezone.utc) - timedelta(minutes=10)
+    store.add_post(_post(base, platforms=["instagram", "facebook"]))
+
+    assert worker.run_once()["published"] == 1
+    post = store.get_post_by_id("p1")
+    assert post["status"] == "published"
+    assert post["published_at"] and post["posted_at"]
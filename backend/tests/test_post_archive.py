@@ -0,0 +1,93 @@
+from core import post_archive, post_store
+from scheduler import archive_worker
+
+
+def _done(post_id, when="2026-01-05T10:00:00Z", status="published"):
+    return {
+        "id": post_id,
+        "client": "c1",
+        "status": status,
+        "published_at": when,
+        "platforms": ["instagram"],
+        "results": {},
+    }
+
+
+def test_archive_client_moves_old_terminal_posts(store):
+    post_store.add_posts([
+        _done("old"),
+        _done("old_posted", status="posted", when="2025-12-30T10:00:00Z"),
+        _done("fresh", when="2099-01-01T00:00:00Z"),
+        {**_done("draft"), "status": "scheduled"},
+    ])
+
+    assert archive_worker.archive_client("c1", older_than_days=1) == 2
+    assert sorted(p["id"] for p in post_store.get_posts("c1", sync=False)) == ["draft", "fresh"]
+
+    segments = sorted(p.name for p in post_archive.archive_dir("c1").glob("*.gz"))
+    assert segments == ["2025-12.ndjson.gz", "2026-01.ndjson.gz"]
+
+    # Fall-Through: get_post_by_id findet archivierte Posts
+    assert post_store.get_post_by_id("old")["status"] == "published"
+    assert post_store.get_post_by_id("nope") is None
+
+
+def test_archive_is_append_only_and_latest_entry_wins(store):
+    post_archive.archive_posts("c1", [_done("a"), _done("b")])
+    post_archive.archive_posts("c1", [{**_done("a"), "caption": "v2"}])
+
+    assert post_archive.get_archived_post("a", "c1")["caption"] == "v2"
+    assert sorted(p["id"] for p in post_archive.iter_archived_posts("c1")) == ["a", "b"]
+
+
+def test_sync_does_not_resurrect_archived_posts(tmp_path, store):
+    used = tmp_path / "clients" / "c1" / "output" / "approved" / "used"
+    used.mkdir(parents=True)
+    (used / "old.png").write_bytes(b"")
+    post_archive.archive_posts("c1", [_done("old")])
+
+    assert post_store.get_posts("c1") == []
+
+
+def test_scheduled_manual_survives_sync_and_archives_after_finalize(tmp_path, store):
+    preview = tmp_path / "clients" / "c1" / "output" / "preview"
+    preview.mkdir(parents=True)
+    (preview / "mix.png").write_bytes(b"")
+    post_store.get_posts("c1")
+    post_store.update_post("mix", {
+        "status": "scheduled_manual",
+        "platform_status": {"instagram": "posted", "linkedin": "manual"},
+        "results": {"instagram": {"status": "ok", "platform_post_id": "m1"}},
+    })
+
+    # PNG verlässt preview/approved → Post bleibt samt results
+    (preview / "mix.png").unlink()
+    [post] = post_store.get_posts("c1")
+    assert post["results"]["instagram"]["platform_post_id"] == "m1"
+
+    # offen → nicht archivierbar; nach manuellem Abschluss terminal
+    assert archive_worker.archive_client("c1", older_than_days=-1) == 0
+    post_store.update_post("mix", {"platform_status": {"linkedin": "posted"}})
+    assert post_store.finalize_post_if_done("mix")
+    assert archive_worker.archive_client("c1", older_than_days=-1) == 1
+
+
+def test_dashboard_actions_on_archived_post_return_409(store):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from api import dashboard_actions, dashboard_meta
+
+    app = FastAPI()
+    app.include_router(dashboard_actions.router)
+    app.include_router(dashboard_meta.router)
+    client = TestClient(app)
+    post_archive.archive_posts("c1", [_done("old")])
+
+    assert post_store.get_post_by_id("old") is not None
+    assert post_store.get_hot_post("old") is None
+    assert client.post("/api/dashboard/approve/old").status_code == 409
+    assert client.post("/api/dashboard/post/old").status_code == 409
+    assert client.post("/api/dashboard/c1/linkedin/mark-posted/old").status_code == 409
+    assert client.post("/api/dashboard/update-meta/old", json={"caption": "x"}).status_code == 409
+    assert client.post("/api/dashboard/approve/nope").status_code == 404
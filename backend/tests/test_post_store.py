@@ -0,0 +1,395 @@
+import json
+
+import pytest
+
+from core import post_store, post_store_sqlite, post_sync
+
+
+@pytest.fixture
+def json_store(store):
+    return post_store.shard_path("c1")
+
+
+@pytest.fixture
+def sqlite_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(post_store_sqlite, "DB_PATH", tmp_path / "posts.sqlite")
+    monkeypatch.setattr(post_sync, "CLIENTS_DIR", tmp_path / "clients")
+    return post_store_sqlite
+
+
+def _post(post_id, client="c1", status="scheduled", publish_at="2026-02-20T13:00:00Z"):
+    return {
+        "id": post_id,
+        "client": client,
+        "status": status,
+        "publish_at": publish_at,
+        "results": {"instagram": {"caption": "hi"}},
+    }
+
+
+def test_json_update_post_merges_results(json_store):
+    post_store.add_post(_post("p1"))
+    updated = post_store.update_post("p1", {"results": {"instagram": {"preview_url": "/x.png"}}})
+
+    assert updated["results"]["instagram"] == {"caption": "hi", "preview_url": "/x.png"}
+    assert updated["category"] == "finished_work"
+
+
+def test_sqlite_roundtrip(sqlite_store):
+    sqlite_store.add_post(_post("p1"))
+    sqlite_store.add_post(_post("p2", status="preview"))
+    sqlite_store.update_status("p1", "posted")
+    updated = sqlite_store.update_post("p2", {"results": {"instagram": {"preview_url": "/x.png"}}})
+
+    assert sqlite_store.get_post_by_id("p1")["posted_at"]
+    assert updated["results"]["instagram"] == {"caption": "hi", "preview_url": "/x.png"}
+    assert [p["id"] for p in sqlite_store.get_posts_by_status("c1", "preview")] == ["p2"]
+
+    with pytest.raises(KeyError):
+        sqlite_store.update_post("missing", {"status": "x"})
+
+
+def test_sqlite_uses_indexes(sqlite_store):
+    conn = sqlite_store._conn()
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT data FROM posts WHERE client = ? AND status = ?",
+        ("c1", "scheduled"),
+    ).fetchall()
+    assert "idx_posts_client_status" in " ".join(r["detail"] for r in plan)
+
+
+def test_sqlite_sync_filesystem_matches_json(tmp_path, json_store, sqlite_store):
+    preview = tmp_path / "clients" / "c1" / "output" / "preview"
+    preview.mkdir(parents=True)
+    (preview / "new_01.png").write_bytes(b"")
+    (preview / "new_01_facebook.png").write_bytes(b"")
+
+    for store in (post_store, sqlite_store):
+        post_sync.reset_index()
+        store.add_post(_post("orphan", status="preview"))
+        store.add_post(_post("keep", status="scheduled"))
+        ids = sorted(p["id"] for p in store.get_posts("c1"))
+        assert ids == ["keep", "new_01"]
+
+        new = store.get_post_by_id("new_01")
+        assert new["preview"] == "/static/c1/output/preview/new_01.png"
+        assert new["results"]["facebook"]["preview_url"].endswith("new_01_facebook.png")
+
+
+def test_migrate_from_json(tmp_path, sqlite_store):
+    src = tmp_path / "legacy.json"
+    src.write_text(json.dumps({"posts": [_post("a"), _post("b"), {"no": "id"}]}), encoding="utf-8")
+
+    assert sqlite_store.migrate_from_json(src) == 2
+    assert sqlite_store.migrate_from_json(src) == 2  # idempotent
+    assert sqlite_store.get_post_by_id("b")["publish_at"] == "2026-02-20T13:00:00Z"
+
+
+def test_incremental_sync_skips_save_when_unchanged(tmp_path, json_store, monkeypatch):
+    preview = tmp_path / "clients" / "c1" / "output" / "preview"
+    preview.mkdir(parents=True)
+    (preview / "a.png").write_bytes(b"")
+
+    saves = []
+    real_save = post_store._save
+    monkeypatch.setattr(post_store, "_save", lambda *a: (saves.append(1), real_save(*a)))
+
+    assert [p["id"] for p in post_store.get_posts("c1")] == ["a"]
+    assert len(saves) == 1  # erster Lauf: kompletter Abgleich
+
+    post_store.get_posts("c1")
+    assert len(saves) == 1  # nichts geändert → kein Save
+
+    (preview / "b_facebook.png").write_bytes(b"")
+    (preview / "a.png").unlink()
+    posts = {p["id"]: p for p in post_store.get_posts("c1")}
+    assert list(posts) == ["b"]
+    assert posts["b"]["results"]["facebook"]["preview_url"].endswith("b_facebook.png")
+    assert len(saves) == 2
+
+
+def test_full_sync_after_restart_skips_save_when_unchanged(tmp_path, json_store, monkeypatch):
+    preview = tmp_path / "clients" / "c1" / "output" / "preview"
+    preview.mkdir(parents=True)
+    (preview / "a.png").write_bytes(b"")
+    post_store.add_post(_post("keep"))
+    post_store.get_posts("c1")
+
+    saves = []
+    real_save = post_store._save
+    monkeypatch.setattr(post_store, "_save", lambda *a: (saves.append(1), real_save(*a)))
+
+    # neuer Prozess / reset_index() → kompletter Abgleich, Store schon aktuell
+    post_sync.reset_index()
+    assert sorted(p["id"] for p in post_store.get_posts("c1")) == ["a", "keep"]
+    assert saves == []
+
+    (preview / "a.png").unlink()
+    post_sync.reset_index()
+    assert [p["id"] for p in post_store.get_posts("c1")] == ["keep"]
+    assert len(saves) == 1
+
+
+def test_get_posts_without_sync_is_read_only(tmp_path, json_store):
+    preview = tmp_path / "clients" / "c1" / "output" / "preview"
+    preview.mkdir(parents=True)
+    (preview / "a.png").write_bytes(b"")
+    post_store.add_post(_post("s1"))
+
+    assert [p["id"] for p in post_store.get_posts("c1", sync=False)] == ["s1"]
+
+
+def test_cache_hits_and_external_invalidation(json_store):
+    post_store.add_post(_post("p1"))
+    before = post_store.cache_stats()
+
+    for _ in range(5):
+        assert post_store.get_post_by_id("p1")["id"] == "p1"
+
+    after = post_store.cache_stats()
+    assert after["hits"] - before["hits"] == 5
+    assert after["misses"] == before["misses"]
+
+    # Fremdprozess schreibt die Datei neu → Signatur ändert sich
+    json_store.write_text(json.dumps({"posts": [_post("p1"), _post("p2", status="x")]}), encoding="utf-8")
+    assert post_store.get_post_by_id("p2")["status"] == "x"
+    assert post_store.cache_stats()["misses"] == after["misses"] + 1
+
+
+def test_cached_posts_are_returned_as_copies(json_store):
+    post_store.add_post(_post("p1"))
+
+    leaked = post_store.get_post_by_id("p1")
+    leaked["status"] = "tampered"
+    post_store.get_posts("c1", sync=False)[0]["results"]["instagram"]["caption"] = "tampered"
+
+    fresh = post_store.get_post_by_id("p1")
+    assert fresh["status"] == "scheduled"
+    assert fresh["results"]["instagram"]["caption"] == "hi"
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_transaction_commits_once_and_sees_own_writes(backend, json_store, sqlite_store, monkeypatch):
+    store = post_store if backend == "json" else sqlite_store
+    commits = []
+    real_commit = store._commit
+    monkeypatch.setattr(store, "_commit", lambda ops, *a: (commits.append(len(ops)), real_commit(ops, *a)))
+
+    with store.transaction() as tx:
+        for i in range(7):
+            store.add_post(_post(f"w{i}"))
+        tx.update("w0", {"caption": "x"})
+        store.update_status("w1", "posted")
+        assert store.get_post_by_id("w0")["caption"] == "x"
+        assert len(store.get_posts("c1", sync=False)) == 7
+
+    assert commits == [9]
+    assert store.get_post_by_id("w1")["status"] == "posted"
+    assert store.update_posts_many({"w2": {"caption": "a"}, "w3": {"caption": "b"}})[1]["caption"] == "b"
+    assert commits == [9, 2]
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_transaction_rolls_back_on_error(backend, json_store, sqlite_store):
+    store = post_store if backend == "json" else sqlite_store
+
+    with pytest.raises(RuntimeError):
+        with store.transaction():
+            store.add_post(_post("gone"))
+            raise RuntimeError("boom")
+
+    assert store.get_post_by_id("gone") is None
+
+
+def _bump_counter(clients_dir, worker, rounds):
+    # läuft in eigenem Prozess (multiprocessing, spawn-sicher)
+    from core import post_store as ps
+    ps.CLIENTS_DIR = clients_dir
+    for i in range(rounds):
+        with ps.transaction():
+            post = ps.get_post_by_id("counter")
+            ps.update_post("counter", {"n": post.get("n", 0) + 1, f"w{worker}": i})
+
+
+def test_concurrent_processes_do_not_lose_updates(json_store):
+    import multiprocessing
+
+    post_store.add_post(_post("counter"))
+    procs = [
+        multiprocessing.Process(target=_bump_counter, args=(post_store.CLIENTS_DIR, w, 10))
+        for w in range(4)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+        assert p.exitcode == 0
+
+    data = json.loads(json_store.read_text(encoding="utf-8"))
+    post = data["posts"][0]
+    assert all(post[f"w{w}"] == 9 for w in range(4))
+    assert data["version"] >= 41
+    assert not list(json_store.parent.glob(".posts.json.*.tmp"))
+
+
+def test_shards_isolate_clients(json_store):
+    post_store.add_posts([_post("a1"), _post("b1", client="c2")])
+    c1_sig = post_store._file_sig(json_store)
+
+    post_store.update_post("b1", {"caption": "only c2"})
+
+    assert post_store._file_sig(json_store) == c1_sig
+    assert [p["id"] for p in post_store.get_posts("c2", sync=False)] == ["b1"]
+    assert post_store.get_post_by_id("b1")["caption"] == "only c2"
+
+    # frischer Prozess-Zustand: Routing findet den Shard per Scan
+    post_store._routes.clear()
+    post_store._shards.clear()
+    assert post_store.get_post_by_id("b1")["client"] == "c2"
+
+
+def test_legacy_store_is_read_lazily_and_migrated(tmp_path, json_store):
+    legacy = post_store.LEGACY_STORE_PATH
+    legacy.parent.mkdir(parents=True)
+    legacy.write_text(
+        json.dumps({"posts": [_post("l1"), _post("l2", client="c2"), {"id": "orphan"}]}),
+        encoding="utf-8",
+    )
+
+    assert post_store.get_post_by_id("l2")["client"] == "c2"
+    post_store.update_status("l1", "posted")
+    assert json.loads(json_store.read_text(encoding="utf-8"))["posts"][0]["status"] == "posted"
+
+    assert post_store.migrate_legacy_store(legacy) == {"c1": 0, "c2": 0}
+    assert post_store.shard_path("c2").exists()
+    assert post_store.get_post_by_id("l1")["status"] == "posted"
+
+
+def test_corrupt_store_raises_instead_of_returning_empty(json_store):
+    post_store.add_post(_post("p1"))
+    json_store.write_text('{"posts": [{"id": "p1"', encoding="utf-8")
+
+    with pytest.raises(post_store.PostStoreError):
+        post_store.get_posts("c1", sync=False)
+
+
+def test_group_commit_coalesces_and_isolates_failures(json_store, monkeypatch):
+    import threading
+
+    post_store.add_posts([_post(f"g{i}") for i in range(8)])
+    monkeypatch.setattr(post_store, "COALESCE_MS", 50)
+    saves_before = post_store.cache_stats()["saves"]
+    errors = []
+
+    def worker(post_id):
+        try:
+            post_store.update_post(post_id, {"caption": post_id})
+        except KeyError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(f"g{i}",)) for i in range(8)]
+    threads.append(threading.Thread(target=worker, args=("missing",)))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(errors) == 1
+    assert all(post_store.get_post_by_id(f"g{i}")["caption"] == f"g{i}" for i in range(8))
+    assert post_store.cache_stats()["saves"] - saves_before < 8
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_due_index_tracks_scheduled_posts(backend, json_store, sqlite_store):
+    from datetime import datetime, timezone
+
+    store = post_store if backend == "json" else sqlite_store
+    store.add_posts([
+        _post("late", publish_at="2026-02-20T15:00:00Z"),
+        _post("early", publish_at="2026-02-20T09:00:00+00:00"),
+        _post("other", client="c2", publish_at="2026-02-20T10:00:00Z"),
+        _post("future", publish_at="2026-03-01T00:00:00Z"),
+        _post("draft", status="preview", publish_at="2026-02-01T00:00:00Z"),
+        _post("no_time", publish_at=None),
+    ])
+    now = datetime(2026, 2, 21, tzinfo=timezone.utc)
+
+    assert [p["id"] for p in store.get_due_posts(now)] == ["early", "other", "late"]
+    assert [p["id"] for p in store.get_due_posts(now, limit=2)] == ["early", "other"]
+    assert [p["id"] for p in store.get_due_posts(now, client="c1")] == ["early", "late"]
+
+    store.update_status("early", "published")
+    store.update_post("late", {"publish_at": "2026-02-20T08:00:00Z"})
+
+    assert [p["id"] for p in store.get_due_posts(now)] == ["late", "other"]
+    assert store.next_due_at() == datetime(2026, 2, 20, 8, tzinfo=timezone.utc)
+    assert store.next_due_at(client="c2") == datetime(2026, 2, 20, 10, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_claims_are_exclusive_and_expired_leases_recover(backend, json_store, sqlite_store):
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    store = post_store if backend == "json" else sqlite_store
+    ids = [f"d{i}" for i in range(10)]
+    store.add_posts([_post(pid) for pid in ids])
+
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda w: store.claim_posts(ids, f"w{w}", 60), range(4)))
+
+    won = [p["id"] for r in results for p in r]
+    assert sorted(won) == sorted(ids)  # jeder Post genau einmal
+    assert store.get_due_posts(1.9e9) == []
+
+    owner = next(r for r in results if r)[0]["lease"]["owner"]
+    post_id = next(r for r in results if r)[0]["id"]
+    assert store.release_post(post_id, "someone-else") is False
+    assert store.release_post(post_id, owner) is True
+    assert store.get_post_by_id(post_id)["status"] == "scheduled"
+
+    # abgelaufene Leases → Recovery setzt den alten Status zurück
+    store.claim_posts(ids, "crashed", 0.01)
+    time.sleep(0.02)
+    assert store.recover_expired_leases() == 1
+    assert store.claim_posts([post_id], "w9", 60)[0]["lease"]["owner"] == "w9"
+
+
+def test_sqlite_exports_platform_status_and_rejects_json_only(sqlite_store):
+    assert all(hasattr(sqlite_store, name) for name in sqlite_store.__all__)
+
+    sqlite_store.add_post(_post("m1"))
+    sqlite_store.mark_manual_required("m1", "linkedin")
+    assert sqlite_store.get_post_by_id("m1")["status"] == "scheduled_manual"
+    assert not sqlite_store.finalize_post_if_done("m1")
+
+    sqlite_store.update_post("m1", {"platform_status": {"linkedin": "posted"}})
+    assert sqlite_store.finalize_post_if_done("m1", status="published")
+    assert sqlite_store.get_post_by_id("m1")["status"] == "published"
+
+    for name in ("shard_clients", "store_version", "cache_stats", "migrate_legacy_store"):
+        with pytest.raises(NotImplementedError):
+            getattr(sqlite_store, name)()
+
+
+def test_week_mode_commits_completed_days(json_store, monkeypatch):
+    from master_agent import master
+
+    plan = {
+        day: [{"content_category": cat}]
+        for day, cat in (("monday", "finished_work"), ("tuesday", "work_action"), ("wednesday", "team_vehicle"))
+    }
+    monkeypatch.setattr(master, "load_weekly_plan", lambda client: plan)
+
+    def create(client, category):
+        if category == "work_action":
+            raise RuntimeError("Design-Agent down")
+        post_store.add_post(_post(f"wk_{category}", status="preview"))
+        return f"wk_{category}"
+
+    monkeypatch.setattr(master, "create_single_post", create)
+    with pytest.raises(RuntimeError):
+        master.run_workflow("c1", "week")
+
+    # Montag ist committet, Dienstag verworfen, Mittwoch nie erreicht
+    assert [p["id"] for p in post_store.get_posts("c1", sync=False)] == ["wk_finished_work"]
@@ -0,0 +1,110 @@
+import threading
+import time
+
+from core import post_store, publish_executor
+
+
+def _tracking_task(state, delay=0.05):
+    def task():
+        with state["lock"]:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(delay)
+        with state["lock"]:
+            state["running"] -= 1
+        return "ok"
+    return task
+
+
+def _state():
+    return {"lock": threading.Lock(), "running": 0, "peak": 0}
+
+
+def test_platform_cap_limits_parallelism(monkeypatch):
+    monkeypatch.setenv("PUBLISH_CONCURRENCY_TESTPF", "2")
+    monkeypatch.setattr(publish_executor, "ACCOUNT_CONCURRENCY", 10)
+    state = _state()
+
+    out = publish_executor.publish_many(
+        lambda pid: publish_executor.run_platforms(pid, {"testpf": _tracking_task(state)}),
+        [f"p{i}" for i in range(6)],
+    )
+
+    assert all(r == {"testpf": "ok"} for r in out.values())
+    assert state["peak"] == 2
+
+
+def test_errors_are_returned_per_task():
+    def boom():
+        raise RuntimeError("graph down")
+
+    out = publish_executor.run_platforms("acc", {"instagram": boom, "facebook": lambda: 1})
+
+    assert isinstance(out["instagram"], RuntimeError)
+    assert out["facebook"] == 1
+
+
+def test_publish_post_runs_platforms_in_parallel_with_one_write(monkeypatch, store, adapters):
+    from agents.publish_agent import agent
+    monkeypatch.setattr(agent, "_notify_client", lambda *a: None)
+
+    state = _state()
+    task = _tracking_task(state, delay=0.2)
+    adapters(lambda pf: lambda post: task())
+
+    post_store.add_post({
+        "id": "p1",
+        "client": "c1",
+        "status": "scheduled",
+        "publish_at": "2026-01-01T00:00:00Z",
+        "platforms": ["instagram", "facebook"],
+        "results": {},
+    })
+    saves = post_store.cache_stats()["saves"]
+
+    res = agent.publish_post("p1")
+
+    assert res["status"] == "published"
+    assert state["peak"] == 2
+    assert post_store.cache_stats()["saves"] == saves + 1
+    assert set(post_store.get_post_by_id("p1")["results"]) == {"instagram", "facebook"}
+
+
+def test_fair_order_interleaves_clients_with_weights_and_quota(monkeypatch):
+    monkeypatch.setenv("PUBLISH_CLIENT_WEIGHTS", "big:2")
+    groups = {"big": [f"b{i}" for i in range(100)], "small": ["s0", "s1"], "tiny": ["t0"]}
+
+    out = publish_executor.fair_order(groups, quota=2)
+
+    assert out == ["b0", "b1", "s0", "t0", "b2", "b3", "s1"]
+    assert publish_executor.fair_order(groups, quota=1, start=1) == ["s0", "t0", "b0", "b1"]
+
+
+def test_priority_lane_gets_next_platform_slot(monkeypatch):
+    monkeypatch.setenv("PUBLISH_CONCURRENCY_PRIOPF", "1")
+    monkeypatch.setattr(publish_executor, "ACCOUNT_CONCURRENCY", 10)
+    order = []
+    release = threading.Event()
+
+    def hold():
+        release.wait(2)
+
+    def task(name):
+        return lambda: publish_executor.run_platforms(name, {"priopf": lambda: order.append(name)})
+
+    blocker = threading.Thread(target=publish_executor.run_platforms, args=("x", {"priopf": hold}))
+    blocker.start()
+    time.sleep(0.05)
+
+    normal = threading.Thread(target=task("normal"))
+    normal.start()
+    time.sleep(0.05)
+    prio = threading.Thread(target=publish_executor.publish_now, args=(task("priority"),))
+    prio.start()
+    time.sleep(0.05)
+
+    release.set()
+    for t in (blocker, normal, prio):
+        t.join(2)
+
+    assert order == ["priority", "normal"]
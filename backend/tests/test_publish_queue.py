@@ -0,0 +1,74 @@
+import json
+
+import pytest
+import requests
+
+from core import post_store, publish_queue
+
+
+@pytest.fixture
+def queue(store):
+    return publish_queue
+
+
+def _graph(code, transient=False):
+    return RuntimeError(json.dumps({"error": {"code": code, "is_transient": transient, "message": "x"}}))
+
+
+def test_classifies_graph_errors():
+    assert publish_queue.is_retryable(_graph(4))
+    assert publish_queue.is_retryable(_graph(999, transient=True))
+    assert publish_queue.is_retryable(requests.ConnectionError("reset"))
+    assert not publish_queue.is_retryable(_graph(190))
+    assert not publish_queue.is_retryable(RuntimeError("ENV variable missing: META_PAGE_TOKEN"))
+
+
+def test_backoff_until_dead_letter_and_redrive(queue, monkeypatch):
+    monkeypatch.setattr(queue, "MAX_ATTEMPTS", 3)
+
+    first = queue.record_failure("p1", "instagram", "c1", _graph(2))
+    second = queue.record_failure("p1", "instagram", "c1", _graph(2))
+    assert first["state"] == second["state"] == "pending"
+    assert second["next_attempt_ts"] > first["next_attempt_ts"] - 1
+
+    assert queue.record_failure("p1", "instagram", "c1", _graph(2))["state"] == "dead"
+    assert [j["id"] for j in queue.list_jobs("dead")] == ["p1:instagram"]
+    assert queue.due_jobs() == []
+
+    assert queue.redrive() == ["p1:instagram"]
+    assert [j["id"] for j in queue.due_jobs()] == ["p1:instagram"]
+
+    queue.record_success("p1", "instagram")
+    assert queue.list_jobs() == []
+
+
+def test_publish_post_retries_only_failed_platform(queue, adapters, monkeypatch):
+    from agents.publish_agent import agent
+
+    calls = []
+    fail = {"facebook": True}
+
+    def adapter_for(pf):
+        def adapter(post):
+            calls.append(pf)
+            if fail.get(pf):
+                raise _graph(2)
+        return adapter
+
+    adapters(adapter_for)
+    monkeypatch.setattr(agent, "_notify_client", lambda *a: None)
+    post_store.add_post({
+        "id": "p1", "client": "c1", "status": "scheduled",
+        "publish_at": "2026-01-01T00:00:00Z",
+        "platforms": ["instagram", "facebook"], "results": {},
+    })
+
+    assert agent.publish_post("p1")["status"] == "retrying"
+    assert queue.job_state("p1", "facebook") == "pending"
+
+    fail["facebook"] = False
+    assert agent.publish_post("p1", platforms=["facebook"])["status"] == "published"
+    assert sorted(calls[:2]) == ["facebook", "instagram"]
+    assert calls[2:] == ["facebook"]
+    assert queue.list_jobs() == []
+    assert post_store.get_post_by_id("p1")["results"]["instagram"]["status"] == "ok"
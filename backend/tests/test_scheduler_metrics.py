@@ -0,0 +1,68 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from core import post_store, scheduler_metrics
+from scheduler import catchup, worker
+
+
+def test_histograms_and_prometheus_text(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler_metrics, "METRICS_DIR", tmp_path)
+    scheduler_metrics.reset()
+
+    scheduler_metrics.observe_publish("instagram", 0.3)
+    scheduler_metrics.observe_publish("instagram", 200)
+    scheduler_metrics.count_error(RuntimeError("x"))
+    scheduler_metrics.count_error("load_posts")
+    scheduler_metrics.observe_tick(0.2, 3, {"c1": 2})
+    scheduler_metrics.write("host:1")
+
+    [snap] = scheduler_metrics.read_all()
+    hist = snap["publish_seconds"]["instagram"]
+    assert hist["count"] == 2 and hist["counts"][1] == 1 and hist["counts"][-1] == 1
+
+    text = scheduler_metrics.render_prometheus()
+    assert 'scheduler_publish_seconds_bucket{worker="host:1",platform="instagram",le="0.5"} 1' in text
+    assert 'scheduler_publish_seconds_bucket{worker="host:1",platform="instagram",le="+Inf"} 2' in text
+    assert 'scheduler_due_backlog{worker="host:1",client="c1"} 2' in text
+    assert 'scheduler_errors_total{worker="host:1",error_class="RuntimeError"} 1' in text
+    assert 'scheduler_clients_scanned{worker="host:1"} 3' in text
+
+
+def test_run_once_records_tick_backlog_and_lag(monkeypatch, store, adapters):
+    from agents.publish_agent import agent
+    adapters(lambda pf: lambda post: None)
+    monkeypatch.setattr(agent, "_notify_client", lambda *a: None)
+    scheduler_metrics.reset()
+    catchup.reset()
+
+    late = datetime.now(timezone.utc) - timedelta(minutes=2)
+    post_store.add_post({
+        "id": "p1", "client": "c1", "status": "scheduled",
+        "publish_at": late.isoformat(), "platforms": ["instagram"], "results": {},
+    })
+
+    worker.run_once()
+
+    snap = scheduler_metrics.snapshot()
+    assert snap["ticks_total"] == 1
+    assert snap["clients_scanned"] == 1
+    assert snap["due_backlog"] == {"c1": 1}
+    lag = snap["schedule_lag_seconds"]["instagram"]
+    assert lag["count"] == 1 and lag["sum"] >= 120
+    assert snap["publish_seconds"]["instagram"]["count"] == 1
+
+
+def test_stale_worker_files_are_skipped_and_pruned(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler_metrics, "METRICS_DIR", tmp_path)
+    monkeypatch.setattr(scheduler_metrics, "TTL_SECONDS", 300)
+    scheduler_metrics.reset()
+
+    old = scheduler_metrics.write("host:1")
+    data = json.loads(old.read_text(encoding="utf-8"))
+    data["written_at"] -= 600
+    old.write_text(json.dumps(data), encoding="utf-8")
+    scheduler_metrics.write("host:2")
+
+    assert [s["worker"] for s in scheduler_metrics.read_all()] == ["host:2"]
+    assert not old.exists()
+    assert 'worker="host:1"' not in scheduler_metrics.render_prometheus()
@@ -0,0 +1,62 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core import post_store, wakeup
+from scheduler import worker
+
+
+@pytest.fixture
+def wake(tmp_path, monkeypatch):
+    monkeypatch.setattr(wakeup, "SOCKET_PATH", tmp_path / "s.sock")
+    assert wakeup.listen()
+    yield
+    wakeup.close()
+
+
+def test_notify_wakes_waiter_early(wake):
+    threading.Timer(0.05, wakeup.notify).start()
+    assert wakeup.wait(5) is True
+    assert wakeup.wait(0.01) is False
+
+
+def test_store_notifies_when_next_due_changes(store, wake):
+
+    post_store.add_post({"id": "a", "client": "c1", "status": "scheduled", "publish_at": "2030-01-01T10:00:00Z"})
+    assert wakeup.wait(0) is True
+
+    post_store.update_post("a", {"caption": "no reschedule"})
+    assert wakeup.wait(0) is False
+
+    post_store.update_post("a", {"publish_at": "2030-01-01T09:00:00Z"})
+    assert wakeup.wait(0) is True
+
+
+def test_sleep_until_next_due():
+    now = datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+    assert worker._sleep_seconds(now, None, 300) == 300
+    assert worker._sleep_seconds(now, now + timedelta(seconds=12.5), 300) == 12.5
+    assert worker._sleep_seconds(now, now + timedelta(hours=5), 300) == 300
+    assert worker._sleep_seconds(now, now - timedelta(seconds=1), 300) == worker.RETRY_SECONDS
+
+
+def test_second_listener_does_not_steal_socket(tmp_path, monkeypatch):
+    import socket
+
+    path = tmp_path / "s.sock"
+    monkeypatch.setattr(wakeup, "SOCKET_PATH", path)
+    other = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    other.bind(str(path))
+    try:
+        assert wakeup.listen() is False  # anderer Worker hört → nicht übernehmen
+        wakeup.notify()
+        assert other.recv(8) == b"1"
+    finally:
+        other.close()
+
+    # verwaiste Datei (Listener weg) → wird ersetzt
+    assert path.exists()
+    assert wakeup.listen() is True
+    wakeup.close()
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core import scheduler_metrics, wakeup
+from scheduler import supervisor
+
+
+@pytest.fixture
+def jobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(wakeup, "SOCKET_PATH", tmp_path / "s.sock")
+    monkeypatch.setattr(supervisor, "_jobs", {})
+    scheduler_metrics.reset()
+    return supervisor
+
+
+def _run_for(seconds, jobs):
+    async def main():
+        stop = asyncio.Event()
+        asyncio.get_running_loop().call_later(seconds, stop.set)
+        await supervisor._run(jobs, stop)
+
+    asyncio.run(main())
+
+
+def test_interval_job_never_overlaps_and_times_out(jobs):
+    active, peak, runs = [0], [0], []
+    lock = threading.Lock()
+
+    def slow():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.15)
+        with lock:
+            active[0] -= 1
+        runs.append(1)
+
+    job = jobs.register_job("slow", slow, interval=0.01, timeout=0.05)
+    _run_for(0.5, [job])
+
+    assert peak[0] == 1
+    assert 2 <= len(runs) <= 4
+    assert scheduler_metrics.snapshot()["errors_total"]["timeout:slow"] >= 2
+
+
+def test_failing_job_is_rescheduled(jobs):
+    calls = []
+
+    def boom():
+        calls.append(1)
+        raise RuntimeError("kaputt")
+
+    job = jobs.register_job("boom", boom, interval=0.05)
+    _run_for(0.3, [job])
+
+    assert len(calls) >= 2
+    assert job["last_error"] == "kaputt"
+    assert scheduler_metrics.snapshot()["errors_total"]["RuntimeError"] >= 2
+
+
+def test_notify_triggers_publish_job(jobs):
+    calls = []
+    job = jobs.register_job("publish", lambda: calls.append(time.monotonic()), next_in=lambda: 3600)
+    threading.Timer(0.2, wakeup.notify).start()
+    _run_for(0.5, [job])
+
+    assert len(calls) == 2  # Start + Notify
+
+
+def test_daily_at_is_next_occurrence():
+    from datetime import datetime, timezone
+
+    now = datetime(2030, 1, 1, 4, 0, tzinfo=timezone.utc)
+    assert supervisor._seconds_until_daily("03:00", now) == 23 * 3600
+    assert supervisor._seconds_until_daily("05:30", now) == 1.5 * 3600
+
+
+def test_unknown_job_name_exits_and_empty_run_idles(jobs, monkeypatch):
+    from agents.publish_agent import platforms
+
+    monkeypatch.setattr(platforms, "load_adapters", lambda: {})
+    monkeypatch.setattr(
+        supervisor, "register_default_jobs",
+        lambda: supervisor.register_job("publish", lambda: None, interval=60),
+    )
+    monkeypatch.setenv("SUPERVISOR_JOBS", "pubilsh")
+    with pytest.raises(SystemExit):
+        supervisor.main()
+
+    _run_for(0.05, [])  # keine Jobs → kein ValueError
+
+
+def test_legacy_post_scheduler_runs_the_lease_based_worker(monkeypatch):
+    from scheduler import post_scheduler, worker
+
+    calls = []
+    monkeypatch.setattr(worker, "loop", lambda poll_seconds: calls.append(poll_seconds))
+    post_scheduler.scheduler_loop()
+    assert calls == [post_scheduler.POLL_INTERVAL_SECONDS]
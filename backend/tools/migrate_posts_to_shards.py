@@ -0,0 +1,33 @@
+"""
+🚚 Einmal-Migration: runtime/posts.json → clients/<client>/state/posts.json
+-------------------------------------------------------------------------
+Usage: python -m tools.migrate_posts_to_shards [pfad/zu/posts.json]
+
+Idempotent. Danach wird die alte Datei in posts.json.migrated umbenannt,
+damit keine Lazy-Migration mehr aus ihr liest.
+"""
+
+import sys
+from pathlib import Path
+
+from core import post_store
+
+
+def run(json_path: Path = post_store.LEGACY_STORE_PATH):
+    if not json_path.exists():
+        print(f"❌ posts.json fehlt: {json_path}")
+        return
+
+    counts = post_store.migrate_legacy_store(json_path)
+
+    done = json_path.with_name(json_path.name + ".migrated")
+    json_path.replace(done)
+
+    print("✅ MIGRATION DONE")
+    for client, count in sorted(counts.items()):
+        print(f"→ {client}: {count} posts → {post_store.shard_path(client)}")
+    print("→ legacy:", done)
+
+
+if __name__ == "__main__":
+    run(Path(sys.argv[1]) if len(sys.argv) > 1 else post_store.LEGACY_STORE_PATH)
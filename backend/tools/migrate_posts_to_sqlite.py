@@ -0,0 +1,41 @@
+"""
+🚚 Einmal-Migration: JSON-Store → db/posts.sqlite
+------------------------------------------------
+Usage: python -m tools.migrate_posts_to_sqlite [pfad/zu/posts.json]
+
+Ohne Pfad: alle Client-Shards (clients/<client>/state/posts.json)
+plus ein noch nicht migriertes runtime/posts.json.
+Danach POST_STORE_BACKEND=sqlite setzen (Web + Scheduler).
+"""
+
+import sys
+from pathlib import Path
+
+from core import post_store, post_store_sqlite
+
+
+def _sources():
+    # direkt aus den Dateien: unter POST_STORE_BACKEND=sqlite gibt es
+    # post_store.shard_clients() nicht
+    if post_store.LEGACY_STORE_PATH.exists():
+        yield post_store.LEGACY_STORE_PATH
+    yield from sorted(post_store.CLIENTS_DIR.glob(f"*/{post_store.SHARD_DIR}/{post_store.SHARD_FILE}"))
+
+
+def run(json_path: Path = None):
+    sources = [json_path] if json_path else list(_sources())
+    missing = [p for p in sources if not p.exists()]
+    if not sources or missing:
+        print(f"❌ posts.json fehlt: {missing or 'keine Shards gefunden'}")
+        return
+
+    # Shards nach dem Legacy-Store → neuerer Stand gewinnt (UPSERT)
+    count = sum(post_store_sqlite.migrate_from_json(p) for p in sources)
+
+    print("✅ MIGRATION DONE")
+    print("→ posts:", count)
+    print("→ db:", post_store_sqlite.DB_PATH)
+
+
+if __name__ == "__main__":
+    run(Path(sys.argv[1]) if len(sys.argv) > 1 else None)
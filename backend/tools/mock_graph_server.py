@@ -0,0 +1,231 @@
+"""
+🧪 Mock Meta Graph API (lokaler Ersatz für graph.facebook.com)
+------------------------------------------------------------
+- Endpunkte (mit Versions-Präfix, z.B. /v24.0/...):
+    POST {page}/photos, POST {page}/feed
+    POST {ig_user}/media → Container, GET {container}?fields=status_code,
+    POST {ig_user}/media_publish (Container muss FINISHED sein)
+    GET oauth/access_token (fb_exchange_token)
+    GET {object}/insights?metric=a,b
+    POST / (Batch: batch=[{method, relative_url, body}])
+- Konfigurierbar (ENV oder create_app(config)):
+    MOCK_GRAPH_LATENCY_MS / MOCK_GRAPH_JITTER_MS  Antwortzeit pro Request
+    MOCK_GRAPH_ERROR_RATE                          Anteil transienter Fehler (code 2)
+    MOCK_GRAPH_RATE_LIMIT / MOCK_GRAPH_RATE_WINDOW Calls pro Fenster (Sekunden)
+                                                   → danach code 4 (Rate Limit)
+    MOCK_GRAPH_CONTAINER_SECONDS                   Verarbeitungszeit IG-Container
+- Jede Antwort trägt X-App-Usage (call_count in % des Limits) wie Meta
+- GET /__stats → Zähler (Requests, Operationen, Fehler, Rate-Limits)
+- Start: python -m tools.mock_graph_server (Port MOCK_GRAPH_PORT, 8900)
+  → Backend mit GRAPH_BASE_URL=http://127.0.0.1:8900
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def default_config() -> Dict[str, Any]:
+    return {
+        "latency_ms": float(os.getenv("MOCK_GRAPH_LATENCY_MS", "80")),
+        "jitter_ms": float(os.getenv("MOCK_GRAPH_JITTER_MS", "40")),
+        "error_rate": float(os.getenv("MOCK_GRAPH_ERROR_RATE", "0")),
+        "rate_limit": int(os.getenv("MOCK_GRAPH_RATE_LIMIT", "0")),  # 0 = aus
+        "rate_window": float(os.getenv("MOCK_GRAPH_RATE_WINDOW", "3600")),
+        "container_seconds": float(os.getenv("MOCK_GRAPH_CONTAINER_SECONDS", "0.5")),
+    }
+
+
+def _graph_error(code: int, message: str, status: int = 400, transient: bool = False) -> Tuple[int, Dict[str, Any]]:
+    return status, {"error": {
+        "message": message, "type": "OAuthException" if code == 190 else "GraphMethodException",
+        "code": code, "is_transient": transient, "fbtrace_id": "mock",
+    }}
+
+
+# ============================================================
+# 🧠 HANDLER (HTTP + Batch teilen sich die Logik)
+# ============================================================
+
+def _handle(state: Dict[str, Any], method: str, path: str, params: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+    cfg = state["config"]
+    parts = [p for p in path.strip("/").split("/") if p]
+
+    with state["lock"]:
+        state["stats"]["operations"] += 1
+
+        # 🚦 Rate-Limit (gleitendes Fenster über alle Operationen)
+        now = time.monotonic()
+        calls = state["calls"]
+        while calls and now - calls[0] >= cfg["rate_window"]:
+            calls.popleft()
+        if cfg["rate_limit"] and len(calls) >= cfg["rate_limit"]:
+            state["stats"]["rate_limited"] += 1
+            return _graph_error(4, "Application request limit reached", transient=True)
+        calls.append(now)
+
+        if cfg["error_rate"] and state["random"].random() < cfg["error_rate"]:
+            state["stats"]["errors"] += 1
+            return _graph_error(2, "An unexpected error has occurred. Please retry.", status=500, transient=True)
+
+        if parts == ["oauth", "access_token"]:
+            if params.get("grant_type") != "fb_exchange_token" or not params.get("fb_exchange_token"):
+                return _graph_error(100, "Invalid parameter")
+            return 200, {"access_token": f"mock-long-lived-{next(state['ids'])}",
+                         "token_type": "bearer", "expires_in": 60 * 60 * 24 * 60}
+
+        if not params.get("access_token"):
+            return _graph_error(190, "An active access token must be used")
+
+        key = (method, parts[1] if len(parts) == 2 else None)
+
+        if key == ("POST", "photos") or key == ("POST", "feed"):
+            n = next(state["ids"])
+            state["stats"]["published"] += 1
+            return 200, {"id": f"{parts[0]}_{n}", "post_id": f"{parts[0]}_{n}"}
+
+        if key == ("POST", "media"):
+            if not params.get("image_url"):
+                return _graph_error(100, "The parameter image_url is required")
+            container = f"17{next(state['ids']):012d}"
+            state["containers"][container] = {"created": now, "published": False}
+            return 200, {"id": container}
+
+        if key == ("POST", "media_publish"):
+            container = state["containers"].get(params.get("creation_id") or "")
+            if container is None:
+                return _graph_error(100, "Invalid creation_id")
+            if now - container["created"] < cfg["container_seconds"]:
+                return _graph_error(9007, "Media ID is not available", transient=True)
+            if container["published"]:
+                return _graph_error(100, "Media already published")
+            container["published"] = True
+            state["stats"]["published"] += 1
+            return 200, {"id": f"18{next(state['ids']):012d}"}
+
+        if key == ("GET", "insights"):
+            metrics = [m for m in (params.get("metric") or "").split(",") if m]
+            if not metrics:
+                return _graph_error(100, "The parameter metric is required")
+            rnd = state["random"]
+            return 200, {"data": [
+                {"name": m, "period": params.get("period", "day"),
+                 "values": [{"value": rnd.randint(0, 500)}], "id": f"{parts[0]}/insights/{m}"}
+                for m in metrics
+            ]}
+
+        if method == "GET" and len(parts) == 1:
+            container = state["containers"].get(parts[0])
+            if container is None:
+                return 200, {"id": parts[0]}
+            if container["published"]:
+                status = "PUBLISHED"
+            elif now - container["created"] >= cfg["container_seconds"]:
+                status = "FINISHED"
+            else:
+                status = "IN_PROGRESS"
+            return 200, {"id": parts[0], "status_code": status}
+
+    return _graph_error(100, f"Unsupported {method} request", status=400)
+
+
+def _usage_header(state: Dict[str, Any]) -> str:
+    cfg = state["config"]
+    pct = 0
+    if cfg["rate_limit"]:
+        pct = min(100, int(100 * len(state["calls"]) / cfg["rate_limit"]))
+    return json.dumps({"call_count": pct, "total_cputime": pct, "total_time": pct})
+
+
+# ============================================================
+# 🌐 APP
+# ============================================================
+
+def create_app(config: Optional[Dict[str, Any]] = None, seed: Optional[int] = None) -> FastAPI:
+    app = FastAPI(title="Mock Graph API")
+    state = {
+        "config": {**default_config(), **(config or {})},
+        "lock": threading.Lock(),
+        "calls": deque(),
+        "containers": {},
+        "ids": itertools.count(1),
+        "random": random.Random(seed),
+        "stats": {"requests": 0, "operations": 0, "errors": 0, "rate_limited": 0, "published": 0},
+    }
+    app.state.graph = state
+
+    async def _delay():
+        cfg = state["config"]
+        ms = cfg["latency_ms"] + state["random"].uniform(0, cfg["jitter_ms"])
+        if ms > 0:
+            await asyncio.sleep(ms / 1000)
+
+    def _respond(status: int, body: Dict[str, Any]) -> JSONResponse:
+        return JSONResponse(body, status_code=status, headers={"X-App-Usage": _usage_header(state)})
+
+    async def _params(request: Request) -> Dict[str, str]:
+        params = dict(request.query_params)
+        if request.method == "POST":
+            params.update(parse_qsl((await request.body()).decode(), keep_blank_values=True))
+        return params
+
+    @app.get("/__stats")
+    async def stats():
+        with state["lock"]:
+            return dict(state["stats"])
+
+    @app.post("/{version}/")
+    @app.post("/{version}")
+    async def batch(version: str, request: Request):
+        state["stats"]["requests"] += 1
+        params = await _params(request)
+        await _delay()
+        if not params.get("access_token"):
+            return _respond(*_graph_error(190, "An active access token must be used"))
+        try:
+            ops = json.loads(params.get("batch") or "")
+        except ValueError:
+            return _respond(*_graph_error(100, "The parameter batch is required"))
+        if not isinstance(ops, list) or len(ops) > 50:
+            return _respond(*_graph_error(100, "Batch must contain 1-50 operations"))
+
+        out = []
+        for op in ops:
+            path, _, query = str(op.get("relative_url") or "").partition("?")
+            op_params = {"access_token": params["access_token"], **dict(parse_qsl(query)),
+                         **dict(parse_qsl(op.get("body") or ""))}
+            status, body = _handle(state, str(op.get("method") or "GET").upper(), path, op_params)
+            out.append({"code": status, "headers": [], "body": json.dumps(body)})
+        return _respond(200, out)
+
+    @app.api_route("/{version}/{path:path}", methods=["GET", "POST"])
+    async def graph(version: str, path: str, request: Request):
+        state["stats"]["requests"] += 1
+        params = await _params(request)
+        await _delay()
+        return _respond(*_handle(state, request.method, path, params))
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    port = int(os.getenv("MOCK_GRAPH_PORT", "8900"))
+    uvicorn.run(create_app(), host="127.0.0.1", port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
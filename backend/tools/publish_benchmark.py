@@ -0,0 +1,315 @@
+"""
+📈 Publish-Pipeline Benchmark (gegen tools/mock_graph_server.py)
+---------------------------------------------------------------
+- Legt N Clients × M fällige Posts (instagram + facebook) in einem
+  temporären Store an und treibt sie über scheduler/worker.run_once()
+  durch die echten Adapter (Graph-Calls gehen an den Mock-Server)
+- Misst: Gesamtdauer, Posts/s, Latenz pro Post (Termin → published_at)
+  als p50/p95/p99, Ticks, Fehler + Zähler des Mock-Servers
+- Ohne --graph-url startet der Mock-Server im Prozess (freier Port)
+- Catch-up-Drossel und Client-Quote sind für den Durchsatz aus;
+  --throttled misst mit den Produktions-Einstellungen
+- Zusätzlich: token_scheduler.refresh_meta gegen den Mock (Smoke-Check)
+- Beispiel:
+    python -m tools.publish_benchmark --clients 5 --posts 20 --latency-ms 120
+    python -m tools.publish_benchmark --error-rate 0.05 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BASE_DIR = Path(__file__).resolve().parents[1]  # backend/
+sys.path.insert(0, str(BASE_DIR))
+
+PLATFORMS = ["instagram", "facebook"]
+
+
+# ============================================================
+# 🧪 MOCK-SERVER IM PROZESS
+# ============================================================
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_mock_server(config: Dict[str, Any]) -> str:
+    import uvicorn
+
+    from tools.mock_graph_server import create_app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(
+        create_app(config), host="127.0.0.1", port=port, log_level="warning",
+    ))
+    threading.Thread(target=server.run, name="mock-graph", daemon=True).start()
+
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("Mock Graph Server startet nicht")
+        time.sleep(0.02)
+    return f"http://127.0.0.1:{port}"
+
+
+# ============================================================
+# 🔧 SETUP
+# ============================================================
+
+@contextmanager
+def _isolated(tmp: Path, graph_url: str, throttled: bool):
+    """
+    Store, Queues und Metriken in ein Temp-Verzeichnis, Graph-Calls an den
+    Mock. Alle Modul-Einstellungen + ENV werden danach wiederhergestellt.
+    """
+    from agents.publish_agent.platforms import instagram
+    from core import (
+        graph_client,
+        notify_outbox,
+        post_store,
+        post_sync,
+        publish_executor,
+        publish_queue,
+        scheduler_metrics,
+    )
+    from scheduler import catchup
+
+    overrides = [
+        (post_store, "CLIENTS_DIR", tmp / "clients"),
+        (post_store, "LEGACY_STORE_PATH", tmp / "runtime" / "posts.json"),
+        (post_sync, "CLIENTS_DIR", tmp / "clients"),
+        (publish_queue, "QUEUE_PATH", tmp / "runtime" / "publish_queue.json"),
+        (notify_outbox, "OUTBOX_PATH", tmp / "runtime" / "notify_outbox.json"),
+        (scheduler_metrics, "METRICS_DIR", tmp / "runtime" / "metrics"),
+        (graph_client, "GRAPH_BASE_URL", graph_url.rstrip("/")),
+        # Retries im Benchmark nicht minutenlang aufschieben
+        (publish_queue, "BACKOFF_BASE_SECONDS", 0.2),
+        (publish_queue, "BACKOFF_MAX_SECONDS", 2),
+        (instagram, "POLL_SECONDS", 0.1),
+    ]
+    if not throttled:
+        overrides += [
+            (catchup, "MAX_BURST", 10 ** 9),
+            (catchup, "ACCOUNT_SPACING_SECONDS", 0),
+            (publish_executor, "CLIENT_QUOTA", 10 ** 9),
+        ]
+    env = {
+        "INSTAGRAM_BUSINESS_ID": "17840000000000000",
+        "META_PAGE_ID": "100000000000000",
+        "META_PAGE_TOKEN": "mock-token",
+    }
+
+    saved = [(obj, attr, getattr(obj, attr)) for obj, attr, _ in overrides]
+    saved_env = {k: os.environ.get(k) for k in env}
+    for obj, attr, value in overrides:
+        setattr(obj, attr, value)
+    os.environ.update(env)
+    graph_client.close()
+    catchup.reset()
+    scheduler_metrics.reset()
+
+    try:
+        yield
+    finally:
+        for obj, attr, value in saved:
+            setattr(obj, attr, value)
+        for k, v in saved_env.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+        graph_client.close()
+        catchup.reset()
+
+
+def _seed(clients: int, posts: int, due: datetime) -> List[str]:
+    from core import post_store
+
+    due_iso = due.isoformat()
+    batch = []
+    for c in range(clients):
+        for p in range(posts):
+            post_id = f"bench_c{c}_p{p}"
+            batch.append({
+                "id": post_id,
+                "client": f"bench_client_{c}",
+                "status": "scheduled",
+                "publish_at": due_iso,
+                "platform_times": {pf: due_iso for pf in PLATFORMS},
+                "platforms": list(PLATFORMS),
+                "results": {pf: {"preview_url": f"/bench/{post_id}_{pf}.png", "caption": f"Bench {post_id}"}
+                            for pf in PLATFORMS},
+            })
+    post_store.add_posts(batch)
+    return [p["id"] for p in batch]
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """
+    Nearest-Rank-Perzentil (pct in 0..100).
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+# ============================================================
+# ▶️ RUN
+# ============================================================
+
+def run_benchmark(
+    clients: int,
+    posts: int,
+    graph_url: str,
+    throttled: bool = False,
+    max_seconds: float = 600,
+) -> Dict[str, Any]:
+    from core import post_store, publish_queue
+    from core.post_model import iso_to_ts
+    from scheduler import worker
+
+    with tempfile.TemporaryDirectory(prefix="publish-bench-") as tmp, _isolated(Path(tmp), graph_url, throttled):
+
+        due = datetime.now(timezone.utc)
+        post_ids = _seed(clients, posts, due)
+
+        started = time.monotonic()
+        ticks = 0
+        while time.monotonic() - started < max_seconds:
+            summary = worker.run_once()
+            ticks += 1
+            if not post_store.get_due_posts() and not publish_queue.list_jobs("pending"):
+                break
+            if summary["claimed"] == 0:
+                # Retry-Backoff / Catch-up-Slot abwarten wie der Worker-Loop
+                time.sleep(max(0.05, worker.next_sleep_seconds(1.0)))
+        elapsed = time.monotonic() - started
+
+        latencies = []
+        statuses: Dict[str, int] = {}
+        for post_id in post_ids:
+            post = post_store.get_post_by_id(post_id) or {}
+            status = post.get("status") or "missing"
+            statuses[status] = statuses.get(status, 0) + 1
+            done_ts = iso_to_ts(post.get("published_at"))
+            if status == "published" and done_ts is not None:
+                latencies.append(done_ts - due.timestamp())
+
+    published = statuses.get("published", 0)
+    return {
+        "clients": clients,
+        "posts_per_client": posts,
+        "posts": len(post_ids),
+        "published": published,
+        "statuses": statuses,
+        "ticks": ticks,
+        "elapsed_seconds": round(elapsed, 3),
+        "posts_per_second": round(published / elapsed, 2) if elapsed > 0 else None,
+        "latency_seconds": {
+            f"p{p}": round(v, 3) if v is not None else None
+            for p, v in ((p, percentile(latencies, p)) for p in (50, 95, 99))
+        },
+    }
+
+
+def check_token_refresh(graph_url: str) -> bool:
+    """
+    token_scheduler.refresh_meta gegen den Mock (Token landet im Temp-Verzeichnis).
+    """
+    from core import graph_client
+    from scheduler import token_scheduler
+
+    env = {"META_APP_ID": "mock-app", "META_APP_SECRET": "mock-secret", "META_ACCESS_TOKEN": "mock-short"}
+    saved_env = {k: os.environ.get(k) for k in env}
+    saved = (token_scheduler.TOKENS_DIR, graph_client.GRAPH_BASE_URL)
+
+    with tempfile.TemporaryDirectory(prefix="publish-bench-tokens-") as tmp:
+        token_scheduler.TOKENS_DIR = Path(tmp)
+        graph_client.GRAPH_BASE_URL = graph_url.rstrip("/")
+        os.environ.update(env)
+        try:
+            token_scheduler.refresh_meta()
+            return (Path(tmp) / "meta.json").exists()
+        finally:
+            token_scheduler.TOKENS_DIR, graph_client.GRAPH_BASE_URL = saved
+            for k, v in saved_env.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
+
+
+def _mock_stats(graph_url: str) -> Optional[Dict[str, Any]]:
+    import requests
+
+    try:
+        return requests.get(f"{graph_url.rstrip('/')}/__stats", timeout=5).json()
+    except (requests.RequestException, ValueError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Publish-Pipeline Benchmark gegen Mock Graph API")
+    parser.add_argument("--clients", type=int, default=3)
+    parser.add_argument("--posts", type=int, default=10, help="fällige Posts pro Client")
+    parser.add_argument("--graph-url", help="laufender Mock-Server (sonst im Prozess gestartet)")
+    parser.add_argument("--latency-ms", type=float, default=80)
+    parser.add_argument("--jitter-ms", type=float, default=40)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=0, help="Calls pro --rate-window (0 = aus)")
+    parser.add_argument("--rate-window", type=float, default=3600)
+    parser.add_argument("--container-seconds", type=float, default=0.5)
+    parser.add_argument("--throttled", action="store_true", help="Catch-up-Drossel + Client-Quote aktiv lassen")
+    parser.add_argument("--max-seconds", type=float, default=600)
+    parser.add_argument("--json", action="store_true", help="Ergebnis als JSON ausgeben")
+    parser.add_argument("--verbose", action="store_true", help="Worker-/HTTP-Logs anzeigen")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        for name in (None, "backend", "httpx"):
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+    graph_url = args.graph_url or start_mock_server({
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "error_rate": args.error_rate,
+        "rate_limit": args.rate_limit,
+        "rate_window": args.rate_window,
+        "container_seconds": args.container_seconds,
+    })
+
+    result = run_benchmark(args.clients, args.posts, graph_url, args.throttled, args.max_seconds)
+    result["token_refresh_ok"] = check_token_refresh(graph_url)
+    result["mock"] = _mock_stats(graph_url)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        lat = result["latency_seconds"]
+        print(f"📈 {result['published']}/{result['posts']} published in {result['elapsed_seconds']}s "
+              f"({result['posts_per_second']} posts/s, {result['ticks']} Ticks)")
+        print(f"   Latenz p50={lat['p50']}s p95={lat['p95']}s p99={lat['p99']}s")
+        print(f"   Status: {result['statuses']} | refresh_meta ok={result['token_refresh_ok']}")
+        if result["mock"]:
+            print(f"   Mock: {result['mock']}")
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,10 @@
-import requests
 import os
 
-GRAPH_BASE = "https://graph.facebook.com/v19.0"
+from core import graph_client
 
 def upload_product_to_meta(product: dict):
     token = os.getenv("META_ACCESS_TOKEN")
     catalog_id = os.getenv("META_CATALOG_ID")
-    url = f"{GRAPH_BASE}/{catalog_id}/items"
     
     payload = {
         "retailer_id": str(product["id"]),
@@ -20,9 +18,10 @@ def upload_product_to_meta(product: dict):
         "brand": "MTM"
     }
     
-    r = requests.post(url, params={"access_token": token}, data=payload)
-    if r.status_code != 200:
-        print(f"❌ Fehler bei {product['title']}: {r.text}")
-    else:
-        print(f"✅ Produkt '{product['title']}' erfolgreich hochgeladen.")
-    return r.json()
+    try:
+        data = graph_client.post(f"{catalog_id}/items", params={"access_token": token}, data=payload)
+    except graph_client.GraphAPIError as e:
+        print(f"❌ Fehler bei {product['title']}: {e}")
+        return {"error": e.error} if e.error else {}
+    print(f"✅ Produkt '{product['title']}' erfolgreich hochgeladen.")
+    return data